@@ -0,0 +1,66 @@
+"""
+    Per-step cost of the bounds handling of every registered task: containment
+    check, clipping of the terminal observation and clamping of the actions,
+    with the gym spaces and per-property Python code, and with the bounds arrays
+    precomputed by the task.
+
+    Run from the repository root with: python -m benchmarks.bench_bounds
+"""
+import argparse
+import timeit
+import numpy as np
+import gym_jsbsim
+
+
+def per_property(task):
+    """ The bounds handling with the observation space and one Python operation per property. """
+    space = task.get_observation_space()
+    observation = task.split_observation(np.array([(prop.min + prop.max) / 2 for prop in task.state_var]))
+    action = [(prop.min + prop.max) / 2 for prop in task.action_var]
+    return {
+        "contains": lambda: space.contains(observation),
+        "clip": lambda: tuple(
+            np.clip(observation[i], o.low, o.high) if task.state_var[i].clipped else observation[i]
+            for i, o in enumerate(space)
+        ),
+        "clamp": lambda: [min(max(value, prop.min), prop.max) for value, prop in zip(action, task.action_var)],
+    }
+
+
+def vectorized(task):
+    """ The bounds handling with the arrays of the task. """
+    observation = np.array([(prop.min + prop.max) / 2 for prop in task.state_var])
+    action = [(prop.min + prop.max) / 2 for prop in task.action_var]
+    return {
+        "contains": lambda: task.contains(observation),
+        "clip": lambda: task.clip_observation(observation),
+        "clamp": lambda: task.clip_action(action),
+    }
+
+
+def best_time(func, number):
+    """ Best time of a call over 5 rounds of number calls, in seconds. """
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", nargs="*", default=sorted(gym_jsbsim.TASKS), help="defaults to all the tasks")
+    parser.add_argument("--number", type=int, default=2000, help="calls per round")
+    args = parser.parse_args()
+
+    print(f"{'task':30s} {'operation':10s} {'per property':>14s} {'arrays':>10s}")
+    for name in args.tasks:
+        task = gym_jsbsim.TASKS[name]()
+        before, after = per_property(task), vectorized(task)
+        saved = 0
+        for operation in ("contains", "clip", "clamp"):
+            old, new = best_time(before[operation], args.number), best_time(after[operation], args.number)
+            if operation != "clip":  # the terminal observation is only clipped at the end of an episode
+                saved += old - new
+            print(f"{name:30s} {operation:10s} {old * 1e6:11.2f} us {new * 1e6:7.2f} us")
+        print(f"{name:30s} {'saved':10s} {saved * 1e6:11.2f} us/step")
+
+
+if __name__ == "__main__":
+    main()
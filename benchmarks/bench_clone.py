@@ -0,0 +1,53 @@
+"""
+    Time to clone an environment in the middle of an episode, with
+    JSBSimEnv.clone and a prewarmed simulation pool, and by building a new
+    environment restored with get_state/set_state.
+
+    Run from the repository root with: python -m benchmarks.bench_clone
+"""
+import argparse
+import time
+import gym_jsbsim
+from gym_jsbsim.simulation_pool import simulation_pool
+
+
+def state_clone(env):
+    clone = gym_jsbsim.make(env.spec.id).unwrapped
+    clone.reset()
+    clone.set_state(env.get_state())
+    return clone
+
+
+def clone_time(env, clone, repeat):
+    start = time.perf_counter()
+    clones = [clone(env) for _ in range(repeat)]
+    elapsed = (time.perf_counter() - start) / repeat
+    for c in clones:
+        c.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    env = gym_jsbsim.make(f"GymJsbsim-{args.task}-v0").unwrapped
+    env.reset()
+    for _ in range(20):
+        env.step(env.action_space.sample())
+
+    simulation_pool.prewarm(args.repeat, env.task.aircraft_name, env.task.jsbsim_freq, env.task.catalog)
+    clone_time(env, lambda e: e.clone(), args.repeat)  # first use of the pooled simulations
+    pooled = clone_time(env, lambda e: e.clone(), args.repeat)
+    rebuilt = clone_time(env, state_clone, args.repeat)
+    env.close()
+
+    print(f"{args.task}: {args.repeat} clones")
+    print(f"  new env + set_state:      {rebuilt * 1e3:8.2f} ms/clone")
+    print(f"  JSBSimEnv.clone (pooled): {pooled * 1e3:8.2f} ms/clone ({rebuilt / pooled:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
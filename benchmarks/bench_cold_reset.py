@@ -0,0 +1,53 @@
+"""
+    Time of the first reset of new environments, which loads the aircraft,
+    with and without templates prewarmed in the simulation pool, and time to
+    check the cached manifest of the aircraft files.
+
+    Run from the repository root with: python -m benchmarks.bench_cold_reset
+"""
+import argparse
+import os
+import time
+import gym_jsbsim
+from gym_jsbsim import cache
+from gym_jsbsim.simulation_pool import simulation_pool
+
+
+def reset_time(task, repeat):
+    envs = [gym_jsbsim.make(f"GymJsbsim-{task}-v0").unwrapped for _ in range(repeat)]
+    start = time.perf_counter()
+    for env in envs:
+        env.reset()
+    elapsed = (time.perf_counter() - start) / repeat
+    for env in envs:
+        env.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    task = gym_jsbsim.TASKS[args.task]()
+    reset_time(args.task, 1)  # first use of the aircraft files and of the task module
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        cache._manifests.clear()
+        cache.get_aircraft_manifest(os.environ["JSBSIM_ROOT_DIR"], task.aircraft_name)
+    manifest = (time.perf_counter() - start) / args.repeat
+
+    cold = reset_time(args.task, args.repeat)
+    simulation_pool.prewarm(args.repeat, task.aircraft_name, task.jsbsim_freq)
+    prewarmed = reset_time(args.task, args.repeat)
+
+    print(f"{args.task}: {args.repeat} environments")
+    print(f"  cached manifest check:      {manifest * 1e3:8.2f} ms")
+    print(f"  first reset:                {cold * 1e3:8.2f} ms/env")
+    print(f"  first reset (prewarmed):    {prewarmed * 1e3:8.2f} ms/env ({cold / prewarmed:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+    Time to import gym_jsbsim, and to make the first environment of a task, in
+    new interpreters. The task modules, the catalogs, jsbsim and shapely are
+    loaded by the first make only, not by the import.
+
+    Run from the repository root with: python -m benchmarks.bench_import
+"""
+import argparse
+import json
+import subprocess
+import sys
+import numpy as np
+
+# run in a new interpreter, prints the import and first make times and the heavy modules loaded by the import
+CODE = """
+import json, sys, time
+start = time.perf_counter()
+import gym_jsbsim
+imported = time.perf_counter()
+loaded = sorted(m for m in ("jsbsim", "shapely", "gym_jsbsim.catalogs", "gym_jsbsim.task") if m in sys.modules)
+env = gym_jsbsim.make(f"GymJsbsim-{sys.argv[1]}-v0")
+made = time.perf_counter()
+print(json.dumps([imported - start, made - imported, loaded]))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", CODE, args.task], capture_output=True, text=True, check=True
+            ).stdout.splitlines()[-1]
+        )
+        for _ in range(args.repeat)
+    ]
+    import_time = np.median([run[0] for run in runs])
+    make_time = np.median([run[1] for run in runs])
+
+    print(f"median of {args.repeat} new interpreters")
+    print(f"  import gym_jsbsim:    {import_time * 1e3:8.1f} ms")
+    print(f"  first make of {args.task}: {make_time * 1e3:8.1f} ms")
+    print(f"  heavy modules loaded by the import: {', '.join(runs[0][2]) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
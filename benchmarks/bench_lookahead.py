@@ -0,0 +1,42 @@
+"""
+    Cost of the distances and bearings of the taxi lookahead points, with one
+    geographiclib call per point (as taxi_path used to do) and with the
+    vectorized geodesic_inverse kernel, for growing numbers of points.
+
+    Run from the repository root with: python -m benchmarks.bench_lookahead
+"""
+import argparse
+import time
+import numpy as np
+from gym_jsbsim.envs.taxi_utils import taxi_path, get_bearing, geodesic_inverse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, nargs="+", default=[8, 16, 32, 64], help="lookahead sizes")
+    parser.add_argument("--repeat", type=int, default=500, help="calls per measure")
+    args = parser.parse_args()
+
+    path = taxi_path()
+    loc = (1.3700, 43.6250)
+    for nb_point in args.points:
+        points = np.resize(path.points, (nb_point, 2))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            [get_bearing(loc, p) for p in points]
+        geographiclib_time = (time.perf_counter() - start) / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            geodesic_inverse(loc, points)
+        kernel_time = (time.perf_counter() - start) / args.repeat
+
+        print(
+            f"{nb_point:3d} points: geographiclib {geographiclib_time * 1e6:8.1f} us, "
+            f"geodesic_inverse {kernel_time * 1e6:6.1f} us ({geographiclib_time / kernel_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+    Where the steps of a task spend their time, measured with
+    JSBSimEnv.enable_profiling, and the overhead of the profiling.
+
+    The --flamegraph option writes the collapsed stacks, to be rendered with
+    flamegraph.pl or loaded in speedscope.
+
+    Run from the repository root with: python -m benchmarks.bench_profiler
+"""
+import argparse
+import time
+import gym_jsbsim
+
+
+def step_time(env, steps):
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _ = env.step(env.action_space.sample())
+        if done:
+            env.reset()
+    return (time.perf_counter() - start) / steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--flamegraph", help="file of the collapsed stacks")
+    args = parser.parse_args()
+
+    env = gym_jsbsim.make(f"GymJsbsim-{args.task}-v0").unwrapped
+    plain = step_time(env, args.steps)
+    env.enable_profiling()
+    profiled = step_time(env, args.steps)
+    report = env.profile_report()
+    collapsed = env.profiler.collapsed()
+    env.close()
+
+    print(f"{args.task}: {args.steps} steps")
+    print(f"  step:          {plain * 1e6:8.1f} us")
+    print(f"  profiled step: {profiled * 1e6:8.1f} us ({profiled / plain - 1:+.0%})")
+    print(f"  {'section':30s} {'count':>8s} {'mean us':>9s} {'p50 us':>9s} {'p99 us':>9s} {'max us':>9s}")
+    for name, stats in sorted(report.items(), key=lambda item: -item[1]["total"]):
+        print(
+            f"  {name:30s} {stats['count']:8d} {stats['mean'] * 1e6:9.1f} {stats['p50'] * 1e6:9.1f}"
+            f" {stats['p99'] * 1e6:9.1f} {stats['max'] * 1e6:9.1f}"
+        )
+
+    if args.flamegraph:
+        with open(args.flamegraph, "w") as f:
+            f.write(collapsed)
+
+
+if __name__ == "__main__":
+    main()
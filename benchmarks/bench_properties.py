@@ -0,0 +1,44 @@
+"""
+    Reads per second of every observation property of a task, looked up by
+    name in the JSBSim property tree on every call (as Simulation used to do)
+    and through the property node resolved once by the Simulation.
+
+    Run from the repository root with: python -m benchmarks.bench_properties
+"""
+import argparse
+import time
+import gym_jsbsim
+from gym_jsbsim.catalogs.property import Property
+
+
+def reads_per_second(read, reads):
+    start = time.perf_counter()
+    for _ in range(reads):
+        read()
+    return reads / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--reads", type=int, default=100000, help="reads per measure")
+    args = parser.parse_args()
+
+    env = gym_jsbsim.make(f"GymJsbsim-{args.task}-v0").unwrapped
+    env.reset()
+    sim = env.sim
+
+    print(f"{args.task}: reads/s per property (update callbacks excluded)")
+    print(f"  {'property':45s} {'by name':>12s} {'node':>12s}")
+    for prop in env.task.get_observation_var():
+        if not isinstance(prop, Property):
+            continue
+        by_name = reads_per_second(lambda: sim.jsbsim_exec.get_property_value(prop.name_jsbsim), args.reads)
+        node = sim._get_node(prop.name_jsbsim)
+        by_node = reads_per_second(lambda: node.get_double_value(), args.reads)
+        print(f"  {prop.name_jsbsim:45s} {by_name:12.0f} {by_node:12.0f} ({by_node / by_name:.1f}x)")
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
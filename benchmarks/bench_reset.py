@@ -0,0 +1,55 @@
+"""
+    Episodes per second of a short episode loop, with a cold reset (a new Simulation
+    is built for every episode, as JSBSimEnv.reset used to do) and with a warm reset
+    (the loaded aircraft model is reused).
+
+    Run from the repository root with: python -m benchmarks.bench_reset
+"""
+import argparse
+import time
+import gym_jsbsim
+from gym_jsbsim.simulation import Simulation
+
+
+def cold_reset(env):
+    if env.sim:
+        env.sim.close()
+    env.sim = Simulation(
+        aircraft_name=env.task.aircraft_name,
+        init_conditions=env.task.init_conditions,
+        jsbsim_freq=env.task.jsbsim_freq,
+        agent_interaction_steps=env.task.agent_interaction_steps,
+        catalog=env.task.catalog,
+    )
+    env.state = env.get_observation()
+
+
+def episodes_per_second(env, reset, episodes, steps):
+    start = time.perf_counter()
+    for _ in range(episodes):
+        reset(env)
+        for _ in range(steps):
+            env.step(env.action_space.sample())
+    return episodes / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="TaxiControlTask")
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--steps", type=int, default=10, help="agent steps per episode")
+    args = parser.parse_args()
+
+    env = gym_jsbsim.make(f"GymJsbsim-{args.task}-v0").unwrapped
+    env.reset()
+    cold = episodes_per_second(env, cold_reset, args.episodes, args.steps)
+    warm = episodes_per_second(env, lambda e: e.reset(), args.episodes, args.steps)
+    env.close()
+
+    print(f"{args.task}: {args.episodes} episodes of {args.steps} steps")
+    print(f"  cold reset: {cold:8.2f} episodes/s")
+    print(f"  warm reset: {warm:8.2f} episodes/s ({warm / cold:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
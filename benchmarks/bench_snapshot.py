@@ -0,0 +1,58 @@
+"""
+    Snapshots and restores per second with Simulation.get_snapshot/reset_to_snapshot,
+    compared to get_sim_state/set_sim_state, and the rate of short branched
+    rollouts from a snapshot as done by a tree search.
+
+    Run from the repository root with: python -m benchmarks.bench_snapshot
+"""
+import argparse
+import time
+import gym_jsbsim
+
+
+def rate(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=5, help="agent steps per branched rollout")
+    args = parser.parse_args()
+
+    env = gym_jsbsim.make(f"GymJsbsim-{args.task}-v0").unwrapped
+    env.reset()
+    for _ in range(20):
+        env.step(env.action_space.sample())
+    sim = env.sim
+
+    snapshot = sim.get_snapshot()
+    state = sim.get_sim_state()
+    results = [
+        ("get_snapshot", rate(sim.get_snapshot, args.repeat)),
+        ("reset_to_snapshot", rate(lambda: sim.reset_to_snapshot(snapshot), args.repeat)),
+        ("get_sim_state", rate(sim.get_sim_state, args.repeat)),
+        ("set_sim_state", rate(lambda: sim.set_sim_state(state), args.repeat)),
+    ]
+
+    action = env.action_space.sample()
+
+    def branch():
+        env.reset_to_snapshot(snapshot)
+        for _ in range(args.depth):
+            env.step(action)
+
+    results.append((f"branches of {args.depth} steps", rate(branch, args.repeat // 5)))
+    env.close()
+
+    print(f"{args.task}: {len(snapshot.values)} values per snapshot")
+    for name, value in results:
+        print(f"  {name:20s} {value:10.1f} /s")
+
+
+if __name__ == "__main__":
+    main()
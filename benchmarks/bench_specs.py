@@ -0,0 +1,104 @@
+"""
+    Per-step cost of the reward and termination checks of HeadingControlTask in
+    a VecJSBSimEnv of an increasing number of environments: with the former
+    hand-written Python functions called for each environment, and with the
+    reward_spec and terminal_spec of the task read for each environment then
+    evaluated for all of them at once, or one environment at a time below
+    SCALAR_BATCH_SIZE environments.
+
+    Run from the repository root with: python -m benchmarks.bench_specs
+"""
+import argparse
+import math
+import timeit
+import numpy as np
+from gym_jsbsim import Catalog as c
+from gym_jsbsim.envs.heading_control_task import HeadingControlTask
+from gym_jsbsim.specs import SCALAR_BATCH_SIZE
+from gym_jsbsim.vec_env import VecJSBSimEnv
+
+
+def python_reward(sim):
+    """ The reward of HeadingControlTask as it was written before its reward_spec. """
+    heading_r = math.exp(-((sim.get_property_value(c.delta_heading) / 5.0) ** 2))
+    alt_r = math.exp(-((sim.get_property_value(c.delta_altitude) / 50.0) ** 2))
+    roll_r = math.exp(-((sim.get_property_value(c.attitude_roll_rad) / 0.35) ** 2))
+    speed_r = math.exp(-(((sim.get_property_value(c.velocities_u_fps) - 800) / 16) ** 2))
+    accel_r = math.exp(
+        -(
+            (sim.get_property_value(c.accelerations_n_pilot_x_norm) / 0.1) ** 2
+            + (sim.get_property_value(c.accelerations_n_pilot_y_norm) / 0.1) ** 2
+            + ((sim.get_property_value(c.accelerations_n_pilot_z_norm) + 1) / 0.5) ** 2
+        )
+    ) ** (1 / 3)
+    return (heading_r * alt_r * accel_r * roll_r * speed_r) ** (1 / 5)
+
+
+def python_terminal(sim):
+    """ The termination checks of HeadingControlTask as they were written before its terminal_spec. """
+    if sim.get_property_value(c.simulation_sim_time_sec) > 10:
+        if (
+            math.fabs(sim.get_property_value(c.accelerations_n_pilot_x_norm)) > 2.0
+            or math.fabs(sim.get_property_value(c.accelerations_n_pilot_y_norm)) > 2.0
+            or math.fabs(sim.get_property_value(c.accelerations_n_pilot_z_norm) + 1) > 2.0
+        ):
+            return True
+    return (sim.get_property_value(c.position_h_sl_ft) < 3000) or bool(sim.get_property_value(c.detect_extreme_state))
+
+
+def per_env(env):
+    rewards, dones = env.rewards, env.dones
+    for i, sim in enumerate(env.sims):
+        rewards[i] = python_reward(sim)
+        dones[i] = python_terminal(sim)
+
+
+def batched(env):
+    reward_spec, terminal_spec = env.tasks[0].get_reward_evaluator(), env.tasks[0].get_terminal_evaluator()
+    if env.num_envs < SCALAR_BATCH_SIZE:
+        # as VecJSBSimEnv.step, the few environments are evaluated one at a time
+        for i, sim in enumerate(env.sims):
+            env.rewards[i] = reward_spec.evaluate(sim)
+            env.dones[i] = terminal_spec.evaluate(sim)
+        return
+    reward_values, terminal_values = env._get_spec_values(reward_spec), env._get_spec_values(terminal_spec)
+    for i, sim in enumerate(env.sims):
+        reward_spec.read(sim, reward_values[i])
+        terminal_spec.read(sim, terminal_values[i])
+    env.rewards[:] = reward_spec(reward_values)
+    env.dones[:] = terminal_spec(terminal_values)
+
+
+def best_time(func, number):
+    """ Best time of a call over 5 rounds of number calls, in seconds. """
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-envs", type=int, nargs="*", default=[1, 4, 16, 64])
+    parser.add_argument("--number", type=int, default=200, help="calls per round")
+    args = parser.parse_args()
+
+    print(f"{'envs':>5s} {'per env':>12s} {'batched':>12s} {'speedup':>8s}")
+    for num_envs in args.num_envs:
+        env = VecJSBSimEnv(HeadingControlTask, num_envs)
+        env.seed(0)
+        env.reset()
+        for _ in range(10):
+            env.step(np.tile([0.0, 0.0, 0.0, 0.8], (num_envs, 1)))
+
+        per_env(env)
+        expected = env.rewards.copy(), env.dones.copy()
+        batched(env)
+        np.testing.assert_allclose(env.rewards, expected[0], rtol=1e-12)
+        np.testing.assert_array_equal(env.dones, expected[1])
+
+        old = best_time(lambda: per_env(env), args.number)
+        new = best_time(lambda: batched(env), args.number)
+        print(f"{num_envs:5d} {old * 1e6:9.1f} us {new * 1e6:9.1f} us {old / new:7.2f}x")
+        env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+    Steps per second of SubprocVecJSBSimEnv for an increasing number of worker
+    processes, compared with a single-process VecJSBSimEnv. On a machine with
+    enough cores the throughput should grow almost linearly with the workers.
+
+    Run from the repository root with: python -m benchmarks.bench_subproc
+"""
+import argparse
+import os
+import time
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim import VecJSBSimEnv, SubprocVecJSBSimEnv
+
+
+def steps_per_second(env, steps):
+    env.reset()
+    actions = np.stack([env.action_space.sample() for _ in range(env.num_envs)])
+    start = time.perf_counter()
+    for _ in range(steps):
+        env.step(actions)
+    return steps * env.num_envs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--task", default="HeadingControlTask")
+    parser.add_argument("--envs-per-worker", type=int, default=4)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--steps", type=int, default=200, help="batched steps per measure")
+    args = parser.parse_args()
+
+    task = gym_jsbsim.TASKS[args.task]
+
+    env = VecJSBSimEnv(task, args.envs_per_worker)
+    reference = steps_per_second(env, args.steps)
+    env.close()
+    print(f"{args.task}: {os.cpu_count()} cores, {args.envs_per_worker} envs per worker")
+    print(f"  single process: {reference:10.1f} steps/s")
+
+    num_workers = 1
+    while num_workers <= args.max_workers:
+        env = SubprocVecJSBSimEnv(task, num_workers * args.envs_per_worker, num_workers=num_workers)
+        throughput = steps_per_second(env, args.steps)
+        env.close()
+        print(f"  {num_workers:3d} workers:    {throughput:10.1f} steps/s ({throughput / reference:.2f}x)")
+        num_workers *= 2
+
+
+if __name__ == "__main__":
+    main()
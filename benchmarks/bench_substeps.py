@@ -0,0 +1,71 @@
+"""
+    Time per integration step of Simulation.run with many integration steps
+    per agent step, with and without recording properties after every
+    integration step (Simulation.record_substeps), compared to the former loop.
+
+    Run from the repository root with: python -m benchmarks.bench_substeps
+"""
+import argparse
+import time
+from gym_jsbsim.simulation import Simulation
+from gym_jsbsim.envs.heading_control_task import HeadingControlTask
+from gym_jsbsim.catalogs.catalog import Catalog as c
+
+
+def python_loop_run(sim):
+    for _ in range(sim.agent_interaction_steps):
+        result = sim.jsbsim_exec.run()
+        if not result:
+            raise RuntimeError("JSBSim failed.")
+
+
+def run_times(runs, repeat, rounds=20):
+    """
+    Best time per integration step of each (simulation, run function) of runs, their rounds being interleaved so
+    that the drifts of the machine speed affect them alike.
+    """
+    times = [[] for _ in runs]
+    for _ in range(rounds):
+        for (sim, run), run_times in zip(runs, times):
+            # each round starts from the same initial conditions
+            sim.reset(HeadingControlTask.init_conditions)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                run(sim)
+            run_times.append((time.perf_counter() - start) / (repeat * sim.agent_interaction_steps))
+    return [min(run_times) for run_times in times]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--freq", type=int, default=240)
+    parser.add_argument("--substeps", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    task = HeadingControlTask()
+    sim, recording_sim = (
+        Simulation(
+            init_conditions=task.init_conditions,
+            jsbsim_freq=args.freq,
+            agent_interaction_steps=args.substeps,
+            catalog=task.catalog,
+        )
+        for _ in range(2)
+    )
+    recording_sim.record_substeps([c.accelerations_n_pilot_z_norm, c.position_h_sl_ft])
+    python_loop, run, recording = run_times(
+        [(sim, python_loop_run), (sim, Simulation.run), (recording_sim, Simulation.run)], args.repeat, args.rounds
+    )
+    sim.close()
+    recording_sim.close()
+
+    print(f"{args.freq} Hz, {args.substeps} integration steps per agent step")
+    print(f"  former loop:              {python_loop * 1e6:8.2f} us/step")
+    print(f"  Simulation.run:           {run * 1e6:8.2f} us/step")
+    print(f"  with 2 recorded props:    {recording * 1e6:8.2f} us/step")
+
+
+if __name__ == "__main__":
+    main()
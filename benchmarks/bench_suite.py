@@ -0,0 +1,199 @@
+"""
+    Benchmark suite of every registered task: steps per second, warm resets per
+    second and memory per environment (resident memory, Linux only), with the
+    import time of gym_jsbsim and the throughput of SubprocVecJSBSimEnv for an
+    increasing number of workers.
+
+    The results are written as JSON with --output. Given the JSON results of a
+    previous run with --baseline, the metrics worse than the baseline by more
+    than --tolerance are reported and the exit status is 1.
+
+    Run from the repository root with: python -m benchmarks.bench_suite
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import jsbsim
+import gym_jsbsim
+from gym_jsbsim import SubprocVecJSBSimEnv
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+
+# metrics where a lower value is better, the others are throughputs
+LOWER_IS_BETTER = ("import_time", "memory_per_env")
+
+IMPORT_CODE = "import time; start = time.perf_counter(); import gym_jsbsim; print(time.perf_counter() - start)"
+
+
+# measured in a new interpreter, where no memory freed by the other measures is reused
+MEMORY_CODE = """
+import os, sys, gym_jsbsim
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+def get_rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+task, n = gym_jsbsim.TASKS[sys.argv[1]], int(sys.argv[2])
+JSBSimEnv(task).reset()  # first use of the aircraft files and of the task module
+rss = get_rss()
+envs = [JSBSimEnv(task) for _ in range(n)]
+for env in envs:
+    env.reset()
+print((get_rss() - rss) / n)
+"""
+
+
+def get_action(task):
+    """ Action in the middle of the action space of task, a np.array. """
+    return np.array([(prop.min + prop.max) / 2 for prop in task.get_action_var()])
+
+
+def import_time(repeat):
+    """ Median time to import gym_jsbsim in a new interpreter, in seconds. """
+    times = [
+        float(subprocess.run([sys.executable, "-c", IMPORT_CODE], capture_output=True, text=True, check=True).stdout)
+        for _ in range(repeat)
+    ]
+    return float(np.median(times))
+
+
+def task_metrics(task, steps, resets, envs):
+    env = JSBSimEnv(task)
+    action = get_action(env.task)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+    steps_per_sec = steps / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    resets_per_sec = resets / (time.perf_counter() - start)
+    env.close()
+
+    memory_per_env = float(
+        subprocess.run(
+            [sys.executable, "-c", MEMORY_CODE, task.__name__, str(envs)], capture_output=True, text=True, check=True
+        ).stdout.split()[-1]
+    )
+
+    return {"steps_per_sec": steps_per_sec, "resets_per_sec": resets_per_sec, "memory_per_env": memory_per_env}
+
+
+def scaling(task, envs_per_worker, max_workers, steps):
+    """ Steps per second of SubprocVecJSBSimEnv for 1, 2, 4... workers, a dict {workers: steps/s}. """
+    curve = {}
+    num_workers = 1
+    while num_workers <= max_workers:
+        env = SubprocVecJSBSimEnv(task, num_workers * envs_per_worker, num_workers=num_workers)
+        env.reset()
+        actions = np.tile(get_action(task()), (env.num_envs, 1))
+        start = time.perf_counter()
+        for _ in range(steps):
+            env.step(actions)
+        curve[str(num_workers)] = steps * env.num_envs / (time.perf_counter() - start)
+        env.close()
+        num_workers *= 2
+    return curve
+
+
+def flatten(results):
+    """ Flat dict {"tasks.HeadingControlTask.steps_per_sec": value, ...} of the metrics of results. """
+    flat = {}
+    for key, value in results.items():
+        if key == "environment":
+            continue
+        if isinstance(value, dict):
+            flat.update({f"{key}.{name}": metric for name, metric in flatten(value).items()})
+        else:
+            flat[key] = value
+    return flat
+
+
+def regressions(results, baseline, tolerance):
+    """
+
+    Compares results with baseline.
+
+    :return: list of (metric, baseline value, value) of the metrics worse by more than tolerance
+
+    """
+    found = []
+    current = flatten(results)
+    for metric, reference in flatten(baseline).items():
+        if metric not in current or not reference:
+            continue
+        value = current[metric]
+        if metric.endswith(LOWER_IS_BETTER):
+            worse = value > reference * (1 + tolerance)
+        else:
+            worse = value < reference * (1 - tolerance)
+        if worse:
+            found.append((metric, reference, value))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", nargs="*", default=sorted(gym_jsbsim.TASKS), help="defaults to all the tasks")
+    parser.add_argument("--steps", type=int, default=500, help="agent steps per task")
+    parser.add_argument("--resets", type=int, default=20, help="warm resets per task")
+    parser.add_argument("--envs", type=int, default=4, help="environments built to measure the memory")
+    parser.add_argument("--import-repeat", type=int, default=5)
+    parser.add_argument("--scaling-task", default="HeadingControlTask")
+    parser.add_argument("--envs-per-worker", type=int, default=4)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--scaling-steps", type=int, default=100, help="batched steps per number of workers")
+    parser.add_argument("--output", help="JSON file of the results")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative change reported as a regression")
+    args = parser.parse_args()
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jsbsim": jsbsim.__version__,
+            "numpy": np.__version__,
+        },
+        "import_time": import_time(args.import_repeat),
+        "tasks": {},
+    }
+    print(f"import gym_jsbsim: {results['import_time'] * 1e3:8.1f} ms")
+    for name in args.tasks:
+        metrics = results["tasks"][name] = task_metrics(gym_jsbsim.TASKS[name], args.steps, args.resets, args.envs)
+        print(
+            f"{name:30s} {metrics['steps_per_sec']:9.1f} steps/s {metrics['resets_per_sec']:8.1f} resets/s"
+            f" {metrics['memory_per_env'] / 2 ** 20:7.1f} MiB/env"
+        )
+    if args.max_workers:
+        curve = results["scaling"] = scaling(
+            gym_jsbsim.TASKS[args.scaling_task], args.envs_per_worker, args.max_workers, args.scaling_steps
+        )
+        for num_workers, throughput in curve.items():
+            print(f"{args.scaling_task} {int(num_workers):3d} workers: {throughput:10.1f} steps/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.tolerance)
+        for metric, reference, value in found:
+            print(f"REGRESSION {metric}: {reference:.6g} -> {value:.6g} ({value / reference - 1:+.0%})")
+        if found:
+            sys.exit(1)
+        print(f"no regression against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
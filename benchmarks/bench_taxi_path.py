@@ -0,0 +1,51 @@
+"""
+    Cost of the shortest distance to the taxi centerline along a noisy trajectory,
+    with the shapely distance to the whole LineString (as taxi_path used to do)
+    and with the CenterlineTracker. --densify splits every centerline segment to
+    emulate the centerline of a large airport.
+
+    Run from the repository root with: python -m benchmarks.bench_taxi_path
+"""
+import argparse
+import time
+import numpy as np
+from shapely.geometry import Point, LineString
+from gym_jsbsim.envs.taxi_utils import taxi_path, CenterlineTracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=1, help="shifted copies of the centerline")
+    parser.add_argument("--densify", type=int, default=1, help="sub-segments per centerline segment")
+    parser.add_argument("--steps", type=int, default=2000, help="positions along each copy")
+    args = parser.parse_args()
+
+    points = np.array(taxi_path().centerlinepoints)
+    width = points[:, 0].max() - points[:, 0].min()
+    points = np.concatenate([points + (1.5 * width * i, 0) for i in range(args.copies)])
+    t = np.linspace(0, len(points) - 1, (len(points) - 1) * args.densify + 1)
+    points = np.stack([np.interp(t, np.arange(len(points)), points[:, k]) for k in range(2)], axis=1)
+    t = np.linspace(0, len(points) - 1, args.steps * args.copies)
+    trajectory = np.stack([np.interp(t, np.arange(len(points)), points[:, k]) for k in range(2)], axis=1)
+    trajectory += np.random.RandomState(0).normal(scale=2e-5, size=trajectory.shape)
+
+    centerline = LineString(points)
+    start = time.perf_counter()
+    for loc in trajectory:
+        centerline.distance(Point(loc)) * 100000
+    shapely_time = (time.perf_counter() - start) / len(trajectory)
+
+    tracker = CenterlineTracker(points)
+    cursor = 0
+    start = time.perf_counter()
+    for loc in trajectory:
+        _, cursor = tracker.distance(loc, cursor)
+    tracker_time = (time.perf_counter() - start) / len(trajectory)
+
+    print(f"centerline of {len(points) - 1} segments, {len(trajectory)} positions")
+    print(f"  shapely LineString: {shapely_time * 1e6:8.1f} us/step")
+    print(f"  CenterlineTracker:  {tracker_time * 1e6:8.1f} us/step ({shapely_time / tracker_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
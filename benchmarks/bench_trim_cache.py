@@ -0,0 +1,48 @@
+"""
+    Cost of the warm resets of a trimmed HeadingControlTask: without trim, with
+    a trim at every reset, and with the trimmed state restored from the trim
+    cache.
+
+    Run from the repository root with: python -m benchmarks.bench_trim_cache
+"""
+import argparse
+import time
+from gym_jsbsim.envs.heading_control_task import HeadingControlTask
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.trim_cache import trim_cache
+
+
+def reset_time(env, resets):
+    """ Mean duration of a warm reset of env, in seconds. """
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(resets):
+        env.reset()
+    return (time.perf_counter() - start) / resets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resets", type=int, default=200)
+    parser.add_argument("--mode", type=int, default=1, help="JSBSim trim mode")
+    args = parser.parse_args()
+
+    env = JSBSimEnv(HeadingControlTask)
+    results = {"no trim": reset_time(env, args.resets)}
+
+    env.task.define_trim_mode(args.mode)
+    max_size = trim_cache.max_size
+    trim_cache.max_size = 0  # every trimmed state is evicted at once
+    results["trim"] = reset_time(env, args.resets)
+    trim_cache.max_size = max_size
+    trim_cache.clear()
+    results["trim cache"] = reset_time(env, args.resets)
+    env.close()
+
+    for name, duration in results.items():
+        print(f"{name:12s} {duration * 1e3:8.3f} ms/reset")
+    print(f"trim cache hits: {trim_cache.hits}, misses: {trim_cache.misses}")
+
+
+if __name__ == "__main__":
+    main()
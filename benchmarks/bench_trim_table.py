@@ -0,0 +1,52 @@
+"""
+    Time to generate the trim table of the A320 over an altitude x airspeed x
+    weight grid in a single process and with a pool of workers, and cost of an
+    interpolation in the memory-mapped table.
+
+    Run from the repository root with: python -m benchmarks.bench_trim_table
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import timeit
+import numpy as np
+from gym_jsbsim.trim_table import TrimTable, generate_trim_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--altitudes", type=int, default=8, help="grid points between 5000 and 35000 ft")
+    parser.add_argument("--airspeeds", type=int, default=8, help="grid points between 500 and 850 ft/s")
+    parser.add_argument("--weights", type=int, default=4, help="grid points between 115000 and 141000 lbs")
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, os.cpu_count()])
+    args = parser.parse_args()
+
+    grid = (
+        np.linspace(5000, 35000, args.altitudes),
+        np.linspace(500, 850, args.airspeeds),
+        np.linspace(115000, 141000, args.weights),
+    )
+    points = args.altitudes * args.airspeeds * args.weights
+    path = tempfile.mkdtemp()
+    try:
+        for num_workers in args.workers:
+            start = time.perf_counter()
+            table = generate_trim_table(path, *grid, num_workers=num_workers)
+            duration = time.perf_counter() - start
+            print(
+                f"{num_workers:3d} workers: {duration:7.2f} s, {points / duration:7.1f} points/s,"
+                f" {table.success.sum()}/{points} trimmed"
+            )
+
+        table = TrimTable(path)
+        number = 2000
+        duration = min(timeit.repeat(lambda: table.interpolate(12345, 678, 123456), number=number, repeat=5))
+        print(f"interpolate: {duration / number * 1e6:7.1f} us")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,38 @@ try:
 except ImportError:
     pass
 
-from jsbsim import __version__ as jsbsim_version
+from importlib import import_module
+from importlib.metadata import version as _dist_version, PackageNotFoundError
 
 from gym.envs.registration import registry, register, make, spec
 from gym_jsbsim.envs import TASKS
-from gym_jsbsim.catalogs import Catalog
+
+# read from the package metadata, the jsbsim module itself is only loaded by the first simulation
+try:
+    jsbsim_version = _dist_version("jsbsim")
+except PackageNotFoundError:  # e.g. jsbsim built from source without its metadata
+    import jsbsim
+
+    jsbsim_version = jsbsim.__version__
+
+# attributes imported at their first use, so that importing gym_jsbsim loads neither jsbsim nor the catalogs
+_LAZY_ATTRIBUTES = {
+    "Catalog": "gym_jsbsim.catalogs",
+    "VecJSBSimEnv": "gym_jsbsim.vec_env",
+    "SubprocVecJSBSimEnv": "gym_jsbsim.subproc_vec_env",
+    "FlightRecorder": "gym_jsbsim.recorder",
+    "FlightDataset": "gym_jsbsim.recorder",
+}
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = globals()[name] = getattr(import_module(module), name)
+    return value
+
 
 """
 
@@ -31,9 +58,10 @@ if __jsbsim_version__ != jsbsim_version:
 if "JSBSIM_ROOT_DIR" not in os.environ:
     os.environ["JSBSIM_ROOT_DIR"] = os.path.join(os.path.dirname(__file__), "jsbsim-" + __jsbsim_version__)
 
+# the task module is imported by the first make of its environment, see JSBSimEnv
 for task_name in TASKS:
     register(
         id=f"GymJsbsim-{task_name}-v0",
         entry_point="gym_jsbsim.jsbsim_env:JSBSimEnv",
-        kwargs=dict(task=TASKS[task_name]),
+        kwargs=dict(task=task_name),
     )
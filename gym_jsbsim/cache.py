@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+from collections import namedtuple
+from xml.etree import ElementTree
+
+# version of the aircraft manifest files, to be increased when their content changes
+MANIFEST_VERSION = 1
+
+"""
+
+The files JSBSim reads to load an aircraft, and a hash of their content identifying the aircraft configuration
+
+"""
+AircraftManifest = namedtuple("AircraftManifest", "aircraft_name files digest")
+
+# manifests of the process, see get_aircraft_manifest
+_manifests = {}
+
+
+def get_cache_dir():
+    """
+    :return: directory of the gym_jsbsim on-disk caches, GYM_JSBSIM_CACHE_DIR or ~/.cache/gym_jsbsim, created if
+        possible: the caches are best-effort, see write_cache_file
+    """
+    cache_dir = os.environ.get("GYM_JSBSIM_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "gym_jsbsim"))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        pass
+    return cache_dir
+
+
+def write_cache_file(cache_file, write, mode="w"):
+    """
+    Write a cache file, best-effort: the file is written then renamed, so that concurrent workers never read a
+    partial file, and nothing is written if the cache directory is not writable.
+
+    :param cache_file: path of the file
+    :param write: function writing the content to the open file
+    :param mode: mode of the open file, "wb" for a binary file
+    :return: True if the file was written
+    """
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, mode) as f:
+            write(f)
+        os.replace(tmp_file, cache_file)
+        return True
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        return False
+
+
+def resolve_aircraft_files(root_dir, aircraft_name):
+    """
+    Find the files JSBSim reads to load an aircraft, searched in the directories JSBSim searches.
+
+    :param root_dir: JSBSim root directory
+    :param aircraft_name: name of the aircraft
+    :return: list of paths, the aircraft file first then the engine, thruster and system files it references
+    """
+    aircraft_dir = os.path.join(root_dir, "aircraft", aircraft_name)
+    aircraft_file = os.path.join(aircraft_dir, aircraft_name + ".xml")
+    engine_dirs = (os.path.join(root_dir, "engine"), aircraft_dir, os.path.join(aircraft_dir, "Engines"))
+    system_dirs = (aircraft_dir, os.path.join(aircraft_dir, "Systems"), os.path.join(root_dir, "systems"))
+
+    files = [aircraft_file]
+    for element in ElementTree.parse(aircraft_file).iter():
+        name = element.get("file")
+        if name is None:
+            continue
+        if not name.endswith(".xml"):
+            name += ".xml"
+        dirs = engine_dirs if element.tag in ("engine", "thruster") else system_dirs
+        for directory in dirs:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                if path not in files:
+                    files.append(path)
+                break
+    return files
+
+
+def _stat(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def get_aircraft_manifest(root_dir, aircraft_name, cache_dir=None):
+    """
+    Get the manifest of an aircraft: its files and the hash of their content.
+
+    The manifest is saved in the cache directory if it is writable, and only computed again when the size
+    or the modification time of one of its files changed. It is kept in memory for the process.
+
+    :param root_dir: JSBSim root directory
+    :param aircraft_name: name of the aircraft
+    :param cache_dir: directory of the cached manifests, defaults to get_cache_dir()
+    :return: AircraftManifest
+    """
+    key = (os.path.abspath(root_dir), aircraft_name)
+    try:
+        return _manifests[key]
+    except KeyError:
+        pass
+
+    cache_file = os.path.join(
+        cache_dir or get_cache_dir(),
+        f"aircraft-{aircraft_name}-{hashlib.sha1(key[0].encode()).hexdigest()[:12]}.json",
+    )
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached["version"] != MANIFEST_VERSION or any(_stat(path) != stat for path, stat in cached["files"]):
+            raise ValueError("outdated manifest")
+        manifest = AircraftManifest(aircraft_name, [path for path, _ in cached["files"]], cached["digest"])
+    except (OSError, ValueError, KeyError):
+        files = resolve_aircraft_files(key[0], aircraft_name)
+        digest = hashlib.sha1()
+        for path in files:
+            digest.update(os.path.relpath(path, key[0]).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        manifest = AircraftManifest(aircraft_name, files, digest.hexdigest())
+
+        files = [[path, _stat(path)] for path in files]
+        write_cache_file(
+            cache_file, lambda f: json.dump({"version": MANIFEST_VERSION, "files": files, "digest": manifest.digest}, f)
+        )
+
+    _manifests[key] = manifest
+    return manifest
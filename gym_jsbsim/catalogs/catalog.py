@@ -1,24 +1,46 @@
+import os
 import re
+import json
+from gym_jsbsim.cache import get_cache_dir, write_cache_file
 from gym_jsbsim.catalogs.property import Property
 from gym_jsbsim.catalogs.jsbsim_catalog import JsbsimCatalog
 from gym_jsbsim.catalogs.my_catalog import MyCatalog
 
+# version of the cached property catalog files, to be increased when their content changes
+JSBSIM_PROPS_VERSION = 1
+
+# whether get_jsbsim_props saves the parsed catalogs in get_cache_dir() and reads them back in the next processes
+persist_jsbsim_props = False
+
 
 class DynamicCatalog(dict):
     """
 
-    A class to store all jsbsim properties initiated and used during jsbsim simulation
+    A class to store the jsbsim properties initiated and used by a task or a simulation
+
+    Properties are immutable definitions shared between all the catalogs: a missing property
+
+    is looked up in the shared Catalog, then in MyCatalog, JsbsimCatalog and the jsbsim
+
+    properties added by add_jsbsim_props, their Property being created on first use.
 
     """
 
     def __getitem__(self, name):
         try:
             return super().__getitem__(name)
-        except KeyError:  # look for the property in MyCatalog and JsbsimCatalog
-            try:
-                self[name] = MyCatalog[name].value
-            except KeyError:
-                self[name] = JsbsimCatalog[name].value
+        except KeyError:  # look for the property in the shared definitions
+            if self is not Catalog:
+                self[name] = Catalog[name]
+            else:
+                try:
+                    self[name] = MyCatalog[name].value
+                except KeyError:
+                    try:
+                        self[name] = JsbsimCatalog[name].value
+                    except KeyError:
+                        name_jsbsim, access = _jsbsim_names[name]
+                        self[name] = Property(name_jsbsim=name_jsbsim, access=access)
         return super().__getitem__(name)
 
     def __getattr__(self, name):
@@ -27,23 +49,88 @@ class DynamicCatalog(dict):
     def add_jsbsim_props(self, jsbsim_props):
         """
 
-        Add to Catalog jsbsim properties from jbsbsim_props
+        Make the jsbsim properties of jsbsim_props available in the catalogs, see parse_jsbsim_props
 
-        :param jsbsim_props: list of 'name_jsbsim (access)' of jsbsim properties
+        :param jsbsim_props: dict mapping property names to (name_jsbsim, access), or the list of
+
+            'name_jsbsim (access)' of jsbsim properties, or a single string with one property per line
 
         """
-        for jsbsim_prop in jsbsim_props:
-            [name_jsbsim, access] = jsbsim_prop.split(" ")
-            access = re.sub(r"[\(\)]", "", access)  # remove parenthesis from the flag
-            name = re.sub(
-                r"_$", "", re.sub(r"[\-/\]\[]+", "_", name_jsbsim)
-            )  # get property name from jsbsim name
-            if name not in self:
-                try:
-                    self[name] = JsbsimCatalog[name].value
-                except KeyError:
-                    self[name] = Property(name_jsbsim=name_jsbsim, access=access)
+        if not isinstance(jsbsim_props, dict):
+            jsbsim_props = parse_jsbsim_props(jsbsim_props)
+        for name, jsbsim_prop in jsbsim_props.items():
+            _jsbsim_names.setdefault(name, jsbsim_prop)
+
+
+def parse_jsbsim_props(jsbsim_props):
+    """
+
+    Parse the property catalog returned by jsbsim
+
+    :param jsbsim_props: list of 'name_jsbsim (access)' of jsbsim properties, or a single string
+
+        with one property per line as returned by recent jsbsim versions
+
+    :return: dict mapping property names to (name_jsbsim, access)
+
+    """
+    if isinstance(jsbsim_props, str):
+        jsbsim_props = jsbsim_props.splitlines()
+    names = {}
+    for jsbsim_prop in jsbsim_props:
+        [name_jsbsim, access] = jsbsim_prop.split(" ")
+        name = re.sub(r"_$", "", re.sub(r"[\-/\]\[]+", "_", name_jsbsim))  # get property name from jsbsim name
+        names.setdefault(name, (name_jsbsim, re.sub(r"[\(\)]", "", access)))  # remove parenthesis from the flag
+    return names
+
+
+def get_jsbsim_props(key, query, cache_dir=None):
+    """
+
+    Get the parsed property catalog of an aircraft model, see parse_jsbsim_props.
+
+    The catalog is parsed once: it is kept for the process and, if persist_jsbsim_props is set or cache_dir given,
+
+    saved in the cache directory when it is writable.
+
+    :param key: str identifying the model, e.g. the digest of the aircraft files and the jsbsim version
+
+    :param query: function returning the property catalog of the model, only called if it is not cached
+
+    :param cache_dir: directory of the cached catalogs, defaults to get_cache_dir() if persist_jsbsim_props is set
+
+    :return: dict mapping property names to (name_jsbsim, access), shared by the callers
+
+    """
+    try:
+        return _parsed_props[key]
+    except KeyError:
+        pass
+
+    if cache_dir is None and not persist_jsbsim_props:
+        names = _parsed_props[key] = parse_jsbsim_props(query())
+        return names
+
+    cache_file = os.path.join(cache_dir or get_cache_dir(), f"properties-{key}.json")
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+        if cached["version"] != JSBSIM_PROPS_VERSION:
+            raise ValueError("outdated property catalog")
+        names = {name: tuple(value) for name, value in cached["properties"].items()}
+    except (OSError, ValueError, KeyError):
+        names = parse_jsbsim_props(query())
+        write_cache_file(cache_file, lambda f: json.dump({"version": JSBSIM_PROPS_VERSION, "properties": names}, f))
+
+    _parsed_props[key] = names
+    return names
+
+
+# jsbsim properties added by add_jsbsim_props: name -> (name_jsbsim, access), see DynamicCatalog.__getitem__
+_jsbsim_names = {}
 
+# parsed property catalogs of the process, see get_jsbsim_props
+_parsed_props = {}
 
-# an instantiation of DynamicCatalog used for simulation
+# an instantiation of DynamicCatalog holding the shared properties definitions, it is never pruned
 Catalog = DynamicCatalog()
@@ -1,16 +1,86 @@
+import functools
 from enum import Enum
 from gym.spaces import Box, Discrete
-from gym_jsbsim.catalogs.property import Property
+import numpy as np
+from gym_jsbsim.catalogs.property import Property, VectorProperty
 from gym_jsbsim.catalogs.jsbsim_catalog import JsbsimCatalog
-from gym_jsbsim.envs.taxi_utils import *
 from gym_jsbsim.catalogs import utils
 from numpy.linalg import norm
 
-taxiPath = taxi_path()
+# centerlines selected by the id_route property, None being the default loop of taxi_path
+taxiCenterlines = [None]
+_taxi_path_ids = {}
+
+# taxi_path of the centerlines, built with their shapely geometry when first followed
+taxiPaths = {}
+
+
+def add_taxi_path(centerlinepoints):
+    """
+    Register a taxi path, a same centerline being registered once.
+
+    :param centerlinepoints: list of (long,lat) centerline points
+    :return: the id_route value selecting it
+    """
+    key = tuple(centerlinepoints)
+    if key not in _taxi_path_ids:
+        _taxi_path_ids[key] = len(taxiCenterlines)
+        taxiCenterlines.append(list(centerlinepoints))
+    return _taxi_path_ids[key]
+
+
+def get_taxi_path(id_route):
+    """
+    :param id_route: id of a registered centerline, 0 for the default loop
+    :return: the taxi_path of the centerline
+    """
+    try:
+        return taxiPaths[id_route]
+    except KeyError:
+        # shapely is only imported by the tasks following a centerline
+        from gym_jsbsim.envs.taxi_utils import taxi_path
+
+        taxiPath = taxiPaths[id_route] = taxi_path(taxiCenterlines[id_route])
+        return taxiPath
+
+
+# aircraft properties used by update_da, all the taxi path properties are computed together from them
+TAXI_PATH_INPUTS = (
+    JsbsimCatalog.position_long_gc_deg,
+    JsbsimCatalog.position_lat_geod_deg,
+    JsbsimCatalog.attitude_psi_deg,
+)
 
 # taxi_freq_state = 30
 
 
+def follow_taxi_path(sim, nb_point):
+    """
+    Move along the followed centerline: update id_path from the aircraft position.
+
+    :param sim: Simulation
+    :param nb_point: number of next centerline points wanted
+    :return: list of [(longitude, latitude), distance, heading] of at most nb_point next points
+    """
+    taxiPath = get_taxi_path(int(sim.get_property_value(MyCatalog.id_route)))
+
+    # collect next points
+    df, next_p = taxiPath.update_path2(
+        (
+            sim.get_property_value(JsbsimCatalog.position_long_gc_deg),
+            sim.get_property_value(JsbsimCatalog.position_lat_geod_deg),
+        ),
+        sim.get_property_value(JsbsimCatalog.attitude_psi_deg),
+        int(sim.get_property_value(MyCatalog.id_path)),
+        nb_point,
+    )
+
+    # change centerline next id_path if needed
+    if next_p:
+        sim.set_property_value(MyCatalog.id_path, sim.get_property_value(MyCatalog.id_path) + 1)
+    return df
+
+
 class MyCatalog(Property, Enum):
     """
 
@@ -97,24 +167,21 @@ class MyCatalog(Property, Enum):
             extreme_altitude or extreme_rotation or extreme_velocity or extreme_acceleration,
         )
 
-    def update_da(sim):
-        # collect next points
-        df, next_p = taxiPath.update_path2(
+    def update_shortest_dist(sim):
+        taxiPath = get_taxi_path(int(sim.get_property_value(MyCatalog.id_route)))
+        # the tracker is shared by the simulations following the centerline, each one keeping its cursor
+        dist, cursor = taxiPath.tracker.distance(
             (
                 sim.get_property_value(JsbsimCatalog.position_long_gc_deg),
                 sim.get_property_value(JsbsimCatalog.position_lat_geod_deg),
             ),
-            sim.get_property_value(JsbsimCatalog.attitude_psi_deg),
-            int(sim.get_property_value(MyCatalog.id_path)),
-            8,
+            sim.get_property_value(MyCatalog.centerline_cursor),
         )
+        sim.set_property_value(MyCatalog.centerline_cursor, cursor)
+        sim.set_property_value(MyCatalog.shortest_dist, dist)
 
-        # change centerline next id_path if needed
-        if next_p:
-            sim.set_property_value(MyCatalog.id_path, sim.get_property_value(MyCatalog.id_path) + 1)
-
-        # set shortest dist
-        sim.set_property_value(MyCatalog.shortest_dist, taxiPath.shortest_dist)
+    def update_da(sim):
+        df = follow_taxi_path(sim, 8)
 
         # set next distance (di) and angles (ai) of the centerlines
         for i in range(1, len(df) + 1):
@@ -172,6 +239,27 @@ class MyCatalog(Property, Enum):
             except:
                 pass
 
+    # target conditions
+
+    target_altitude_ft = Property(
+        "tc/h-sl-ft",
+        "target altitude MSL [ft]",
+        JsbsimCatalog.position_h_sl_ft.min,
+        JsbsimCatalog.position_h_sl_ft.max,
+    )
+    target_heading_deg = Property(
+        "tc/target-heading-deg",
+        "target heading [deg]",
+        JsbsimCatalog.attitude_psi_deg.min,
+        JsbsimCatalog.attitude_psi_deg.max,
+    )
+    target_vg = Property("tc/target-vg", "target ground velocity [ft/s]")
+    target_time = Property("tc/target-time-sec", "target time [sec]", 0)
+    target_latitude_geod_deg = Property("tc/target-latitude-geod-deg", "target geocentric latitude [deg]", -90, 90)
+    target_longitude_geod_deg = Property(
+        "tc/target-longitude-geod-deg", "target geocentric longitude [deg]", -180, 180
+    )
+
     # position and attitude
 
     delta_altitude = Property(
@@ -181,6 +269,7 @@ class MyCatalog(Property, Enum):
         40000,
         access="R",
         update=update_delta_altitude,
+        depends=(target_altitude_ft, JsbsimCatalog.position_h_sl_ft),
     )
     delta_heading = Property(
         "position/delta-heading-to-target-deg",
@@ -189,6 +278,7 @@ class MyCatalog(Property, Enum):
         180,
         access="R",
         update=update_delta_heading,
+        depends=(target_heading_deg, JsbsimCatalog.attitude_psi_deg),
     )
 
     # controls command
@@ -244,27 +334,16 @@ class MyCatalog(Property, Enum):
         spaces=Discrete,
         access="R",
         update=update_detect_extreme_state,
-    )
-
-    # target conditions
-
-    target_altitude_ft = Property(
-        "tc/h-sl-ft",
-        "target altitude MSL [ft]",
-        JsbsimCatalog.position_h_sl_ft.min,
-        JsbsimCatalog.position_h_sl_ft.max,
-    )
-    target_heading_deg = Property(
-        "tc/target-heading-deg",
-        "target heading [deg]",
-        JsbsimCatalog.attitude_psi_deg.min,
-        JsbsimCatalog.attitude_psi_deg.max,
-    )
-    target_vg = Property("tc/target-vg", "target ground velocity [ft/s]")
-    target_time = Property("tc/target-time-sec", "target time [sec]", 0)
-    target_latitude_geod_deg = Property("tc/target-latitude-geod-deg", "target geocentric latitude [deg]", -90, 90)
-    target_longitude_geod_deg = Property(
-        "tc/target-longitude-geod-deg", "target geocentric longitude [deg]", -180, 180
+        depends=(
+            JsbsimCatalog.velocities_eci_velocity_mag_fps,
+            JsbsimCatalog.velocities_p_rad_sec,
+            JsbsimCatalog.velocities_q_rad_sec,
+            JsbsimCatalog.velocities_r_rad_sec,
+            JsbsimCatalog.position_h_sl_ft,
+            JsbsimCatalog.accelerations_n_pilot_x_norm,
+            JsbsimCatalog.accelerations_n_pilot_y_norm,
+            JsbsimCatalog.accelerations_n_pilot_z_norm,
+        ),
     )
 
     # following path
@@ -272,27 +351,69 @@ class MyCatalog(Property, Enum):
     steady_flight = Property("steady_flight", "steady flight mode", 0, 1000000)
     turn_flight = Property("turn_flight", "turn flight mode", 0, 1)
     id_path = Property("id_path", "where I am in the centerline path")
+    id_route = Property("id_route", "the followed centerline path in taxiCenterlines")
+    centerline_cursor = Property("centerline_cursor", "the centerline segment nearest to the aircraft")
 
     # dist_heading_centerline_matrix = Property('dist_heading_centerline_matrix', 'dist_heading_centerline_matrix', '2D matrix with dist,angle of the next point from the aircraft to 1km (max 10 points)', [0, -45, 0, -45, 0, -45, 0, -45, 0, -45, 0, -45, 0, -45, 0, -45], [1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45, 1000, 45])
-    d1 = Property("d1", "d1", 0, 1000, access="R", update=update_da)
-    d2 = Property("d2", "d2", 0, 1000, access="R")
-    d3 = Property("d3", "d3", 0, 1000, access="R")
-    d4 = Property("d4", "d4", 0, 1000, access="R")
-    d5 = Property("d5", "d5", 0, 1000, access="R")
-    d6 = Property("d6", "d6", 0, 1000, access="R")
-    d7 = Property("d7", "d7", 0, 1000, access="R")
-    d8 = Property("d8", "d8", 0, 1000, access="R")
-    a1 = Property("a1", "a1", -180, 180, access="R")
-    a2 = Property("a2", "a2", -180, 180, access="R")
-    a3 = Property("a3", "a3", -180, 180, access="R")
-    a4 = Property("a4", "a4", -180, 180, access="R")
-    a5 = Property("a5", "a5", -180, 180, access="R")
-    a6 = Property("a6", "a6", -180, 180, access="R")
-    a7 = Property("a7", "a7", -180, 180, access="R")
-    a8 = Property("a8", "a8", -180, 180, access="R")
+    d1 = Property("d1", "d1", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    d2 = Property("d2", "d2", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    d3 = Property("d3", "d3", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    d4 = Property("d4", "d4", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    d5 = Property("d5", "d5", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    d6 = Property("d6", "d6", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    d7 = Property("d7", "d7", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    d8 = Property("d8", "d8", 0, 1000, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a1 = Property("a1", "a1", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a2 = Property("a2", "a2", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a3 = Property("a3", "a3", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a4 = Property("a4", "a4", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a5 = Property("a5", "a5", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a6 = Property("a6", "a6", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a7 = Property("a7", "a7", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
+    a8 = Property("a8", "a8", -180, 180, access="R", update=update_da, depends=TAXI_PATH_INPUTS + (id_path, id_route))
 
     shortest_dist = Property(
-        "shortest_dist", "shortest distance between aircraft and path [m]", 0.0, 1000.0, access="R"
+        "shortest_dist",
+        "shortest distance between aircraft and path [m]",
+        0.0,
+        1000.0,
+        access="R",
+        update=update_shortest_dist,
+        depends=TAXI_PATH_INPUTS[:2] + (id_route,),
     )
     # taxi_freq_state = Property('taxi-freq-state','frequence to update taxi state',0)
     # nb_step = Property('nb_step', 'shortest distance between aircraft and path [m]', access = 'R')
+
+
+@functools.lru_cache(maxsize=None)
+def lookahead(nb_point=8):
+    """
+    Get the vector property of the next nb_point centerline points: their distances [m] then their angles
+
+    to the aircraft heading [deg], as d1..d8 and a1..a8 but computed in one pass. The last point is repeated
+
+    when the centerline ends before nb_point points.
+
+    :param nb_point: number of points
+    :return: VectorProperty of 2 * nb_point values
+    """
+
+    def update_lookahead(sim):
+        df = follow_taxi_path(sim, nb_point)
+        if df:
+            df += [df[-1]] * (nb_point - len(df))
+            angles = np.array([d[2] for d in df]) - sim.get_property_value(JsbsimCatalog.attitude_psi_deg)
+            angles %= 360
+            angles[angles > 180] -= 360
+            sim.set_property_value(prop, np.concatenate(([d[1] for d in df], angles)))
+
+    prop = VectorProperty(
+        f"lookahead-{nb_point}",
+        f"distances and angles of the next {nb_point} centerline points",
+        2 * nb_point,
+        (0,) * nb_point + (-180,) * nb_point,
+        (1000,) * nb_point + (180,) * nb_point,
+        update=update_lookahead,
+        depends=TAXI_PATH_INPUTS + (MyCatalog.id_path.value, MyCatalog.id_route.value),
+    )
+    return prop
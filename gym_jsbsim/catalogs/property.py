@@ -5,10 +5,28 @@ from gym.spaces import Box, Discrete
 
 A class to wrap and extend the Property object implemented in JSBSim
 
+A read-only property with an update function is a derived property: depends lists the properties
+
+its update function reads, so that it is only recomputed when one of them changes.
+
 """
 
-Property = namedtuple("Property", "name_jsbsim description min max access spaces clipped update")
-Property.__new__.__defaults__ = (None, None, float("-inf"), float("+inf"), "RW", Box, True, None)
+Property = namedtuple("Property", "name_jsbsim description min max access spaces clipped update depends")
+Property.__new__.__defaults__ = (None, None, float("-inf"), float("+inf"), "RW", Box, True, None, None)
 
 CustomProperty = namedtuple("CustomProperty", "name_jsbsim description min max access spaces clipped read write")
 CustomProperty.__new__.__defaults__ = (None, None, float("-inf"), float("+inf"), "RW", Box, False, None, None)
+
+"""
+
+A block of values computed together by its update function, e.g. the lookahead points of a taxi path.
+
+min and max are tuples of the bounds of each of its size values. The values are kept by the simulation,
+
+not in JSBSim: name_jsbsim only identifies the block, which can not be a dependency of a derived property.
+
+"""
+VectorProperty = namedtuple(
+    "VectorProperty", "name_jsbsim description size min max access spaces clipped update depends"
+)
+VectorProperty.__new__.__defaults__ = ("R", Box, True, None, None)
@@ -1,4 +1,6 @@
 import math
+import numpy as np
+from gym_jsbsim.catalogs.property import VectorProperty
 
 
 def reduce_reflex_angle_deg(angle):
@@ -37,3 +39,74 @@ def shortest_ac_dist(x, y, x1, y1, x2, y2):
     s_ac_dist = math.fabs(a * x + b * y + c) / math.sqrt(a ** 2 + b ** 2)
     # print("s_ac_dist", s_ac_dist)
     return s_ac_dist
+
+
+def is_derived(prop):
+    """ Whether prop is a read-only property computed by an update function """
+    return getattr(prop, "access", None) == "R" and getattr(prop, "update", None) is not None
+
+
+def derived_update_order(prop):
+    """
+    Topologically sort the derived properties prop depends on, directly or not.
+
+    :param prop: a derived Property
+    :return: list of derived Properties, each one after the ones it depends on, ending with prop
+    """
+    order, visiting, visited = [], set(), set()
+
+    def visit(p):
+        if p.name_jsbsim in visited:
+            return
+        if p.name_jsbsim in visiting:
+            raise ValueError(f"cyclic dependency on derived property {p.name_jsbsim}")
+        visiting.add(p.name_jsbsim)
+        for dep in p.depends or ():
+            if is_derived(dep):
+                visit(dep)
+        visiting.discard(p.name_jsbsim)
+        visited.add(p.name_jsbsim)
+        order.append(p)
+
+    visit(prop)
+    return order
+
+
+def get_size(props):
+    """ Number of values of props, a VectorProperty having size values """
+    return sum(prop.size if isinstance(prop, VectorProperty) else 1 for prop in props)
+
+
+def get_bounds(props):
+    """
+    Get the bounds of the values of props, one per value of the vector properties.
+
+    :param props: list of properties
+    :return: (low, high) float arrays of length get_size(props)
+    """
+    low, high = [], []
+    for prop in props:
+        if isinstance(prop, VectorProperty):
+            low.extend(prop.min)
+            high.extend(prop.max)
+        else:
+            low.append(prop.min)
+            high.append(prop.max)
+    return np.array(low, dtype=np.float64), np.array(high, dtype=np.float64)
+
+
+def get_clipped(props):
+    """ Whether each value of props is clipped to its bounds, a bool array of length get_size(props) """
+    sizes = [prop.size if isinstance(prop, VectorProperty) else 1 for prop in props]
+    return np.repeat([bool(prop.clipped) for prop in props], sizes).astype(bool)
+
+
+def get_names(props):
+    """ Names of the values of props, "name_jsbsim[i]" for the i-th value of a vector property """
+    names = []
+    for prop in props:
+        if isinstance(prop, VectorProperty):
+            names.extend(f"{prop.name_jsbsim}[{i}]" for i in range(prop.size))
+        else:
+            names.append(prop.name_jsbsim)
+    return names
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from os import listdir
 from os import path
 import importlib
@@ -12,8 +13,37 @@ for f in ENVS_FILES:
         name_class = name_file.title().replace("_", "")
         TASKS_NAMES[name_file] = name_class
 
-TASKS = {}
-for f in TASKS_NAMES:
-    module = importlib.import_module("gym_jsbsim.envs." + f)
-    my_class = getattr(module, TASKS_NAMES[f])
-    TASKS[TASKS_NAMES[f]] = my_class
+
+class LazyTasks(Mapping):
+
+    """
+    A mapping of the task class names to the task classes, the module of a task being
+
+    imported at its first access only: listing the tasks does not load the catalogs.
+    """
+
+    def __init__(self, tasks_names):
+        """
+
+        :param tasks_names: dict mapping the task module names to the task class names
+
+        """
+        self._modules = {name_class: name_file for name_file, name_class in tasks_names.items()}
+        self._classes = {}
+
+    def __getitem__(self, name_class):
+        try:
+            return self._classes[name_class]
+        except KeyError:
+            module = importlib.import_module("gym_jsbsim.envs." + self._modules[name_class])
+            my_class = self._classes[name_class] = getattr(module, name_class)
+            return my_class
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self):
+        return len(self._modules)
+
+
+TASKS = LazyTasks(TASKS_NAMES)
@@ -0,0 +1,314 @@
+import os
+import heapq
+import struct
+import hashlib
+import functools
+import numpy as np
+from gym_jsbsim.cache import get_cache_dir, write_cache_file
+from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.catalogs.my_catalog import add_taxi_path
+from gym_jsbsim.envs.taxi_utils import get_bearing
+from gym_jsbsim.task import Task
+
+# directory of the AMDB (Aerodrome Mapping Database) shapefiles shipped with the repository
+AMDB_DIR = os.environ.get(
+    "AMDB_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "amdb")
+)
+
+# shapefile layers the routing graph is built from
+AMDB_LAYERS = ("AM_AsrnEdge", "AM_AsrnNode")
+
+# mean earth radius (m), used to weight the graph edges
+EARTH_RADIUS = 6371008.8
+
+
+def read_dbf(filename):
+    """
+    Read the records of a dBase III table.
+
+    :param filename: path of the .dbf file
+    :return: list of dict {field name: stripped string value}, None for a deleted record
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    nb_records, header_len, record_len = struct.unpack("<IHH", data[4:12])
+    fields = []
+    pos = 32
+    while data[pos] != 0x0D:
+        name = data[pos : pos + 11].split(b"\0", 1)[0].decode("ascii")
+        fields.append((name, data[pos + 16]))
+        pos += 32
+
+    records = []
+    for i in range(nb_records):
+        pos = header_len + i * record_len
+        if data[pos : pos + 1] == b"*":  # deleted record, kept in line with the shapefile records
+            records.append(None)
+            continue
+        pos += 1
+        record = {}
+        for name, length in fields:
+            record[name] = data[pos : pos + length].decode("latin1").strip()
+            pos += length
+        records.append(record)
+    return records
+
+
+def read_shp(filename):
+    """
+    Read the geometries of a point or polyline shapefile, the z and m values are dropped.
+
+    :param filename: path of the .shp file
+    :return: list of np.array of shape (n_points, 2) with the (long,lat) of each record,
+        the parts of a multi-part polyline are concatenated
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    shapes = []
+    pos = 100
+    while pos < len(data):
+        length = struct.unpack(">i", data[pos + 4 : pos + 8])[0] * 2
+        content = data[pos + 8 : pos + 8 + length]
+        shape_type = struct.unpack("<i", content[:4])[0]
+        if shape_type in (1, 11, 21):  # Point, PointZ, PointM
+            shapes.append(np.frombuffer(content, dtype="<f8", count=2, offset=4).reshape(1, 2))
+        elif shape_type in (3, 13, 23):  # PolyLine, PolyLineZ, PolyLineM
+            nb_parts, nb_points = struct.unpack("<ii", content[36:44])
+            offset = 44 + 4 * nb_parts
+            shapes.append(np.frombuffer(content, dtype="<f8", count=2 * nb_points, offset=offset).reshape(-1, 2))
+        elif shape_type == 0:  # Null shape
+            shapes.append(np.zeros((0, 2)))
+        else:
+            raise ValueError(f"unsupported shape type {shape_type} in {filename}")
+        pos += 8 + length
+    return shapes
+
+
+def polyline_length(points):
+    """
+    :param points: np.array of shape (n_points, 2) of (long,lat)
+    :return: length of the polyline in meters, with an equirectangular approximation
+    """
+    rad = np.radians(points)
+    dlong = np.diff(rad[:, 0]) * np.cos(0.5 * (rad[1:, 1] + rad[:-1, 1]))
+    dlat = np.diff(rad[:, 1])
+    return EARTH_RADIUS * float(np.sum(np.hypot(dlong, dlat)))
+
+
+class AirportGraph(object):
+    """
+    The routing graph of an airport, built from the AMDB ASRN (Aerodrome Surface Routing Network).
+
+    Nodes are the AM_AsrnNode points and edges the AM_AsrnEdge polylines, traversable in both
+    directions and weighted by their length. The geometry of all the edges is stored in a single
+    array, edge i being edge_points[edge_offsets[i]:edge_offsets[i + 1]].
+
+    Parsing the shapefiles is done once: the graph arrays are saved in an .npz file of the cache
+    directory named after a hash of the source files, and loaded from it afterwards.
+    """
+
+    def __init__(self, node_ids, node_points, edge_ids, edge_nodes, edge_lengths, edge_offsets, edge_points):
+        self.node_ids = node_ids
+        self.node_points = node_points
+        self.edge_ids = edge_ids
+        self.edge_nodes = edge_nodes
+        self.edge_lengths = edge_lengths
+        self.edge_offsets = edge_offsets
+        self.edge_points = edge_points
+
+        self.node_index = {node_id: i for i, node_id in enumerate(node_ids.tolist())}
+        self.adjacency = [[] for _ in range(len(node_ids))]
+        for edge, (n1, n2) in enumerate(edge_nodes.tolist()):
+            self.adjacency[n1].append((n2, edge))
+            self.adjacency[n2].append((n1, edge))
+
+    @classmethod
+    def load(cls, amdb_dir=AMDB_DIR, cache_dir=None):
+        """
+        Load the graph of an airport from the cache, parsing its AMDB shapefiles if needed.
+
+        :param amdb_dir: directory of the AMDB shapefiles
+        :param cache_dir: directory of the cached graphs, defaults to get_cache_dir()
+        :return: AirportGraph
+        """
+        filenames = [os.path.join(amdb_dir, layer + ext) for layer in AMDB_LAYERS for ext in (".shp", ".dbf")]
+        digest = hashlib.sha1()
+        for filename in filenames:
+            with open(filename, "rb") as f:
+                digest.update(f.read())
+        cache_file = os.path.join(cache_dir or get_cache_dir(), f"airport-{digest.hexdigest()}.npz")
+
+        try:
+            with np.load(cache_file) as arrays:
+                return cls(**arrays)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        graph = cls.from_shapefiles(amdb_dir)
+        write_cache_file(cache_file, lambda f: np.savez(f, **graph.to_arrays()), mode="wb")
+        return graph
+
+    @classmethod
+    def from_shapefiles(cls, amdb_dir=AMDB_DIR):
+        """
+        Build the graph of an airport from its AM_AsrnNode and AM_AsrnEdge shapefiles.
+
+        :param amdb_dir: directory of the AMDB shapefiles
+        :return: AirportGraph
+        """
+        node_records = read_dbf(os.path.join(amdb_dir, "AM_AsrnNode.dbf"))
+        node_shapes = read_shp(os.path.join(amdb_dir, "AM_AsrnNode.shp"))
+        nodes = [(record, points) for record, points in zip(node_records, node_shapes) if record and len(points)]
+        node_ids = np.array([int(record["idnumber"]) for record, _ in nodes], dtype=np.int64)
+        node_points = np.concatenate([points for _, points in nodes]).reshape(-1, 2)
+        node_index = {node_id: i for i, node_id in enumerate(node_ids.tolist())}
+
+        edge_records = read_dbf(os.path.join(amdb_dir, "AM_AsrnEdge.dbf"))
+        edge_shapes = read_shp(os.path.join(amdb_dir, "AM_AsrnEdge.shp"))
+        edge_ids, edge_nodes, edge_lengths, edge_polylines = [], [], [], []
+        for record, points in zip(edge_records, edge_shapes):
+            if not record or not len(points):
+                continue
+            n1, n2 = node_index[int(record["node1ref"])], node_index[int(record["node2ref"])]
+            # store every polyline from node1 to node2
+            if np.sum((points[0] - node_points[n1]) ** 2) > np.sum((points[-1] - node_points[n1]) ** 2):
+                points = points[::-1]
+            edge_ids.append(int(record["idnumber"]))
+            edge_nodes.append((n1, n2))
+            edge_lengths.append(polyline_length(points))
+            edge_polylines.append(points)
+
+        return cls(
+            node_ids=node_ids,
+            node_points=node_points,
+            edge_ids=np.array(edge_ids, dtype=np.int64),
+            edge_nodes=np.array(edge_nodes, dtype=np.int64).reshape(-1, 2),
+            edge_lengths=np.array(edge_lengths),
+            edge_offsets=np.cumsum([0] + [len(points) for points in edge_polylines]),
+            edge_points=np.concatenate(edge_polylines).reshape(-1, 2),
+        )
+
+    def to_arrays(self):
+        """
+        :return: dict of the np.arrays defining the graph, as taken by the constructor
+        """
+        return {
+            "node_ids": self.node_ids,
+            "node_points": self.node_points,
+            "edge_ids": self.edge_ids,
+            "edge_nodes": self.edge_nodes,
+            "edge_lengths": self.edge_lengths,
+            "edge_offsets": self.edge_offsets,
+            "edge_points": self.edge_points,
+        }
+
+    def shortest_path(self, start_node, goal_node):
+        """
+        Dijkstra shortest path between two nodes.
+
+        :param start_node: AMDB idnumber of the first node
+        :param goal_node: AMDB idnumber of the last node
+        :return: (length in meters, list of (node index, edge index) from the start, the first edge being None)
+        """
+        start, goal = self.node_index[start_node], self.node_index[goal_node]
+        dist = {start: 0.0}
+        previous = {start: (None, None)}
+        queue = [(0.0, start)]
+        done = set()
+        while queue:
+            d, node = heapq.heappop(queue)
+            if node in done:
+                continue
+            if node == goal:
+                break
+            done.add(node)
+            for neighbor, edge in self.adjacency[node]:
+                nd = d + self.edge_lengths[edge]
+                if nd < dist.get(neighbor, np.inf):
+                    dist[neighbor] = nd
+                    previous[neighbor] = (node, edge)
+                    heapq.heappush(queue, (nd, neighbor))
+        else:
+            raise ValueError(f"no route from node {start_node} to node {goal_node}")
+
+        path = []
+        node = goal
+        while node is not None:
+            prev, edge = previous[node]
+            path.append((node, edge))
+            node = prev
+        return dist[goal], path[::-1]
+
+    def route(self, start_node, goal_node):
+        """
+        Centerline of the shortest route between two nodes.
+
+        :param start_node: AMDB idnumber of the first node
+        :param goal_node: AMDB idnumber of the last node
+        :return: list of (long,lat) centerline points, as taken by taxi_path
+        """
+        _, path = self.shortest_path(start_node, goal_node)
+        points = [self.node_points[path[0][0]]]
+        for node, edge in path[1:]:
+            polyline = self.edge_points[self.edge_offsets[edge] : self.edge_offsets[edge + 1]]
+            if self.edge_nodes[edge, 0] == node:  # edge travelled from node2 to node1
+                polyline = polyline[::-1]
+            points.extend(polyline[1:])
+
+        centerlinepoints = []
+        for p in points:
+            p = (float(p[0]), float(p[1]))
+            if not centerlinepoints or p != centerlinepoints[-1]:
+                centerlinepoints.append(p)
+        return centerlinepoints
+
+
+@functools.lru_cache(maxsize=None)
+def get_airport(amdb_dir=AMDB_DIR):
+    """
+    :param amdb_dir: directory of the AMDB shapefiles
+    :return: the AirportGraph of amdb_dir, loaded once per process
+    """
+    return AirportGraph.load(amdb_dir)
+
+
+def taxi_route_init_conditions(start_node, goal_node, amdb_dir=AMDB_DIR):
+    """
+    Initial conditions of a taxi task following the shortest route between two nodes.
+
+    The route centerline is registered as a taxi path of MyCatalog, selected with the id_route property.
+
+    :param start_node: AMDB idnumber of the first node
+    :param goal_node: AMDB idnumber of the last node
+    :param amdb_dir: directory of the AMDB shapefiles
+    :return: dict {Property: value}, the aircraft is at the start node heading toward the second centerline point
+    """
+    centerlinepoints = get_airport(amdb_dir).route(start_node, goal_node)
+    if len(centerlinepoints) < 2:
+        raise ValueError(f"route from {start_node} to {goal_node} shorter than 2 centerline points")
+    heading = get_bearing(centerlinepoints[0], centerlinepoints[1])
+    return {
+        c.ic_long_gc_deg: centerlinepoints[0][0],
+        c.ic_lat_geod_deg: centerlinepoints[0][1],
+        c.ic_psi_true_deg: heading,
+        c.target_heading_deg: heading,
+        c.id_path: 0,
+        c.id_route: add_taxi_path(centerlinepoints),
+    }
+
+
+class TaxiRouteTask(Task):
+    """
+
+    A task following a taxiway centerline: the default loop of taxi_path, or an AMDB route, see define_taxi_route.
+
+    """
+
+    def define_taxi_route(self, start_node, goal_node):
+        """
+        Follow the shortest AMDB route between two nodes instead of the default centerline.
+
+        :param start_node: AMDB idnumber of the first node
+        :param goal_node: AMDB idnumber of the last node
+        """
+        self.define_init_conditions({**self.init_conditions, **taxi_route_init_conditions(start_node, goal_node)})
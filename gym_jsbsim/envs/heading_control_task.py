@@ -1,7 +1,6 @@
 from gym_jsbsim.task import Task
 from gym_jsbsim.catalogs.catalog import Catalog as c
-import math
-import random
+from gym_jsbsim.specs import Gaussian, GeometricMean, Threshold, AnyOf, AllOf
 import numpy as np
 
 """
@@ -53,55 +52,57 @@ class HeadingControlTask(Task):
         c.steady_flight: 150,
     }
 
-    def get_reward(self, state, sim):
-        """
-        Compute reward for task
-        """
-        # Reward is built as a geometric mean of scaled gaussian rewards for each relevant variable
-
-        heading_error_scale = 5.0  # degrees
-        heading_r = math.exp(-((sim.get_property_value(c.delta_heading) / heading_error_scale) ** 2))
-
-        alt_error_scale = 50.0  # feet
-        alt_r = math.exp(-((sim.get_property_value(c.delta_altitude) / alt_error_scale) ** 2))
-
-        roll_error_scale = 0.35  # radians ~= 20 degrees
-        roll_r = math.exp(-((sim.get_property_value(c.attitude_roll_rad) / roll_error_scale) ** 2))
-
-        speed_error_scale = 16  # fps (~5%)
-        speed_r = math.exp(-(((sim.get_property_value(c.velocities_u_fps) - 800) / speed_error_scale) ** 2))
-
-        # accel scale in "g"s
-        accel_error_scale_x = 0.1
-        accel_error_scale_y = 0.1
-        accel_error_scale_z = 0.5
-        try:
-            accel_r = math.exp(
-                -(
-                    (sim.get_property_value(c.accelerations_n_pilot_x_norm) / accel_error_scale_x) ** 2
-                    + (sim.get_property_value(c.accelerations_n_pilot_y_norm) / accel_error_scale_y) ** 2
-                    + ((sim.get_property_value(c.accelerations_n_pilot_z_norm) + 1) / accel_error_scale_z) ** 2
-                )  # normal value for z component is -1 g
-            ) ** (
-                1 / 3
-            )  # geometric mean
-        except OverflowError:
-            accel_r = 0
-
-        reward = (heading_r * alt_r * accel_r * roll_r * speed_r) ** (1 / 5)
-        return reward
+    # Reward is built as a geometric mean of scaled gaussian rewards for each relevant variable
+    reward_spec = GeometricMean(
+        (
+            Gaussian(c.delta_heading, 5.0),  # degrees
+            Gaussian(c.delta_altitude, 50.0),  # feet
+            # accel scale in "g"s, normal value for z component is -1 g
+            GeometricMean(
+                (
+                    Gaussian(c.accelerations_n_pilot_x_norm, 0.1),
+                    Gaussian(c.accelerations_n_pilot_y_norm, 0.1),
+                    Gaussian(c.accelerations_n_pilot_z_norm, 0.5, target=-1),
+                )
+            ),
+            Gaussian(c.attitude_roll_rad, 0.35),  # radians ~= 20 degrees
+            Gaussian(c.velocities_u_fps, 16, target=800),  # fps (~5%)
+        )
+    )
+
+    terminal_spec = AnyOf(
+        (
+            # if acceleration are too high stop the simulation, z component is expected to be -1 g
+            AllOf(
+                (
+                    Threshold(c.simulation_sim_time_sec, 10),
+                    AnyOf(
+                        (
+                            Threshold(c.accelerations_n_pilot_x_norm, 2.0, absolute=True),
+                            Threshold(c.accelerations_n_pilot_y_norm, 2.0, absolute=True),
+                            Threshold(c.accelerations_n_pilot_z_norm, 2.0, offset=1, absolute=True),
+                        )
+                    ),
+                )
+            ),
+            # End up the simulation if the aircraft is on an extreme state
+            # TODO: Is an altitude check needed?
+            Threshold(c.position_h_sl_ft, 3000, above=False),
+            Threshold(c.detect_extreme_state, 0),
+        )
+    )
 
     def is_terminal(self, state, sim):
         # Change heading every 150 seconds
         if sim.get_property_value(c.simulation_sim_time_sec) >= sim.get_property_value(c.steady_flight):
             # If the target heading and altitude were not reached, we stop the simulation
-            if math.fabs(sim.get_property_value(c.delta_heading)) > 10:
+            if abs(sim.get_property_value(c.delta_heading)) > 10:
                 return True
-            if math.fabs(sim.get_property_value(c.delta_altitude)) >= 100:
+            if abs(sim.get_property_value(c.delta_altitude)) >= 100:
                 return True
 
             angle = int(sim.get_property_value(c.steady_flight) / 150) * 10
-            sign = random.choice([+1.0, -1.0])
+            sign = self.np_random.choice([+1.0, -1.0])
             new_heading = sim.get_property_value(c.target_heading_deg) + sign * angle
             new_heading = (new_heading + 360) % 360
 
@@ -111,20 +112,5 @@ class HeadingControlTask(Task):
 
             sim.set_property_value(c.steady_flight, sim.get_property_value(c.steady_flight) + 150)
 
-        # if acceleration are too high stop the simulation
-        acceleration_limit_x = 2.0  # "g"s
-        acceleration_limit_y = 2.0  # "g"s
-        acceleration_limit_z = 2.0  # "g"s
-        if sim.get_property_value(c.simulation_sim_time_sec) > 10:
-            if (
-                math.fabs(sim.get_property_value(c.accelerations_n_pilot_x_norm)) > acceleration_limit_x
-                or math.fabs(sim.get_property_value(c.accelerations_n_pilot_y_norm)) > acceleration_limit_y
-                or math.fabs(sim.get_property_value(c.accelerations_n_pilot_z_norm) + 1) > acceleration_limit_z
-            ):  # z component is expected to be -1 g
-                return True
-
-        # End up the simulation if the aircraft is on an extreme state
-        # TODO: Is an altitude check needed?
-        return (sim.get_property_value(c.position_h_sl_ft) < 3000) or bool(
-            sim.get_property_value(c.detect_extreme_state)
-        )
+        # the acceleration and extreme state checks are in terminal_spec
+        return False
@@ -1,5 +1,5 @@
-from gym_jsbsim.task import Task
 from gym_jsbsim.catalogs.catalog import Catalog as c
+from gym_jsbsim.envs.airport import TaxiRouteTask
 import random
 import math
 
@@ -9,7 +9,7 @@ import math
 """
 
 
-class TaxiControlTask(Task):
+class TaxiControlTask(TaxiRouteTask):
     state_var = [c.velocities_vc_fps, c.shortest_dist, c.d1, c.d2, c.d3, c.d4, c.a1, c.a2, c.a3, c.a4]
 
     action_var = [c.fcs_steer_cmd_norm, c.fcs_center_brake_cmd_norm, c.fcs_throttle_cmd_norm]
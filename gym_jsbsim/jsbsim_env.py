@@ -1,6 +1,11 @@
+import copy
 import gym
 import numpy as np
-from gym_jsbsim.simulation import Simulation
+from gym_jsbsim.envs import TASKS
+from gym_jsbsim.profiler import StepProfiler
+from gym_jsbsim.catalogs import utils
+from gym_jsbsim.simulation_pool import simulation_pool
+from gym_jsbsim.trim_cache import trim_cache
 
 
 class JSBSimEnv(gym.Env):
@@ -20,19 +25,34 @@ class JSBSimEnv(gym.Env):
 
     metadata = {"render.modes": ["human", "csv"]}
 
-    def __init__(self, task):
+    # whether the simulation is given back to simulation_pool when closed, see clone
+    _pooled = False
+
+    # StepProfiler of the steps, or None when profiling is disabled, see enable_profiling
+    profiler = None
+
+    def __init__(self, task, flat_observation=None):
         """
 
         Constructor. Init some internal state, but JSBSimEnv.reset() must be
 
         called first before interacting with environment.
 
-        :param task: the Task for the task agent is to perform
+        :param task: the Task for the task agent is to perform, or its name in gym_jsbsim.envs.TASKS
+
+        :param flat_observation: if True, observations are a flat float64 array in a Box space
+
+            instead of a tuple of 1-element arrays. Defaults to the task setting.
 
         """
 
         self.sim = None
+        if isinstance(task, str):
+            task = TASKS[task]
         self.task = task()
+        if flat_observation is not None:
+            self.task.define_flat_observation(flat_observation)
+        self._observation = np.zeros(utils.get_size(self.task.get_observation_var()), dtype=np.float64)
 
         self.observation_space = self.task.get_observation_space()  # None
         self.action_space = self.task.get_action_space()  # None
@@ -76,6 +96,9 @@ class JSBSimEnv(gym.Env):
             if not len(action) == len(self.action_space.spaces):
                 raise ValueError("mismatch between action and action space size")
 
+        if self.profiler is not None:
+            return self._profiled_step(action)
+
         self.state = self.make_step(action)
 
         reward, done, info = self.task.get_reward(self.state, self.sim), self.is_terminal(), {}
@@ -83,6 +106,49 @@ class JSBSimEnv(gym.Env):
 
         return state, reward, done, info
 
+    def _profiled_step(self, action):
+        """ step, timing each of its phases with the profiler. """
+        profiler = self.profiler
+        depth = profiler.depth
+        try:
+            profiler.push("step")
+
+            profiler.push("action")
+            if action is not None:
+                self.sim.set_property_values(self.task.get_action_var(), self.task.clip_action(action), clamped=True)
+            profiler.pop()
+
+            profiler.push("integration")
+            self.sim.run()
+            profiler.pop()
+
+            profiler.push("observation")
+            self.state = self.get_observation()
+            profiler.pop()
+
+            profiler.push("reward")
+            reward = self.task.get_reward(self.state, self.sim)
+            profiler.pop()
+
+            profiler.push("contains")
+            is_not_contained = not self.task.contains(self._observation)
+            profiler.pop()
+
+            profiler.push("is_terminal")
+            done = (
+                is_not_contained
+                or self.task.is_terminal(self.state, self.sim)
+                or self.task.check_terminal_spec(self.sim)
+            )
+            profiler.pop()
+
+            state = self.state if not done else self._get_clipped_state()
+            profiler.pop()
+        finally:
+            profiler.unwind(depth)
+
+        return state, reward, done, {}
+
     def make_step(self, action=None):
         """
 
@@ -95,32 +161,59 @@ class JSBSimEnv(gym.Env):
 
 
         """
-        # take actions
+        # take actions, clamped to their bounds at once
         if action is not None:
-            self.sim.set_property_values(self.task.get_action_var(), action)
+            self.sim.set_property_values(self.task.get_action_var(), self.task.clip_action(action), clamped=True)
 
         # run simulation
         self.sim.run()
 
         return self.get_observation()
 
-    def reset(self):
+    def reset(self, seed=None):
         """
 
         Resets the state of the environment and returns an initial observation.
 
+        :param seed: if not None, the environment is seeded first, see seed
+
         :return: array, the initial observation of the space.
 
         """
-        if self.sim:
-            self.sim.close()
-
-        self.sim = Simulation(
-            aircraft_name=self.task.aircraft_name,
-            init_conditions=self.task.init_conditions,
-            jsbsim_freq=self.task.jsbsim_freq,
-            agent_interaction_steps=self.task.agent_interaction_steps,
-        )
+        if seed is not None:
+            self.seed(seed)
+
+        size = utils.get_size(self.task.get_observation_var())
+        if self._observation.shape[0] != size:  # state_var changed since the last reset
+            self._observation = np.zeros(size, dtype=np.float64)
+
+        if self.sim and self.sim.can_reset(self.task.aircraft_name, self.task.jsbsim_freq):
+            # warm reset: keep the loaded aircraft model
+            if self.task.trim_mode is None:
+                self.sim.reset(self.task.init_conditions, self.task.agent_interaction_steps)
+            else:
+                trim_cache.reset(
+                    self.sim, self.task.init_conditions, self.task.trim_mode, self.task.agent_interaction_steps
+                )
+        else:
+            if self.sim:
+                self.close()
+
+            # a template of simulation_pool is used if prewarmed, see SimulationPool.prewarm
+            self.sim = simulation_pool.acquire(
+                aircraft_name=self.task.aircraft_name,
+                jsbsim_freq=self.task.jsbsim_freq,
+                agent_interaction_steps=self.task.agent_interaction_steps,
+                catalog=self.task.catalog,
+                init_conditions=self.task.init_conditions,
+                fresh=True,
+            )
+            self._pooled = False
+            if self.task.trim_mode is not None:
+                trim_cache.trim(self.sim, self.task.init_conditions, self.task.trim_mode)
+        self.sim.profiler = self.profiler
+        self.sim.set_random_seed(self.task.draw_jsbsim_seed())
+        self.sim.record_substeps(self.task.substep_var or ())
 
         self.state = self.get_observation()
 
@@ -138,9 +231,15 @@ class JSBSimEnv(gym.Env):
         :return: bool
 
         """
-        is_not_contained = not self.observation_space.contains(self.state)
-
-        return is_not_contained or self.task.is_terminal(self.state, self.sim)
+        # self._observation holds the values of self.state, checked against the bounds arrays of the task
+        is_not_contained = not self.task.contains(self._observation)
+
+        # is_terminal is called first, it may change the task targets, e.g. HeadingControlTask
+        return (
+            is_not_contained
+            or self.task.is_terminal(self.state, self.sim)
+            or self.task.check_terminal_spec(self.sim)
+        )
 
     def render(self, mode="human", **kwargs):
         """Renders the environment.
@@ -193,8 +292,16 @@ class JSBSimEnv(gym.Env):
 
               this won't be true if seed=None, for example.
 
+        The seed initializes the random number generator of the task, which also draws the
+
+        seed of the JSBSim random number generator at every reset.
+
+        :param seed: int, or None for a seed taken from the OS entropy
+
         """
-        return
+        seed_seq = np.random.SeedSequence(seed)
+        self.task.seed(seed_seq)
+        return [seed_seq.entropy]
 
     def close(self):
         """Cleans up this environment's objects
@@ -207,17 +314,92 @@ class JSBSimEnv(gym.Env):
 
         """
         if self.sim:
-            self.sim.close()
+            if self._pooled:
+                simulation_pool.release(self.sim)
+                self.sim = None
+            else:
+                self.sim.close()
+
+    def clone(self):
+        """
+
+        Clones the environment in the middle of an episode, e.g. to expand a search tree.
+
+        The clone has its own copy of the task and a simulation taken from simulation_pool,
+
+        reset to a snapshot of this environment (see Simulation.reset_to_snapshot): no aircraft
+
+        model is loaded when the pool holds idle simulations, see SimulationPool.prewarm.
+
+        Closing the clone gives its simulation back to the pool.
+
+        :return: JSBSimEnv
+
+        """
+        clone = copy.copy(self)
+        clone.task = copy.copy(self.task)
+        # the clone draws the same random values as this environment from now on
+        clone.task.np_random = copy.deepcopy(self.task.np_random)
+        clone._observation = np.zeros_like(self._observation)
+        clone.sim = simulation_pool.acquire(
+            aircraft_name=self.sim.aircraft_name,
+            jsbsim_freq=self.sim.jsbsim_freq,
+            agent_interaction_steps=self.sim.agent_interaction_steps,
+            catalog=self.task.catalog,
+        )
+        clone._pooled = True
+        clone.sim.profiler = self.profiler
+        clone.sim.record_substeps(self.sim.substep_props)
+        clone.reset_to_snapshot(self.get_snapshot())
+        return clone
+
+    def enable_profiling(self, enabled=True):
+        """
+
+        Starts or stops timing the phases of the steps (action, integration, observation, reward,
+
+        contains, is_terminal) and the property update functions called in them, see profile_report.
+
+        Profiling is disabled by default: step then runs without any timing code.
+
+        :param enabled: bool, a new profiler is started if True
+
+        """
+        self.profiler = StepProfiler() if enabled else None
+        if self.sim:
+            self.sim.profiler = self.profiler
+
+    def profile_report(self):
+        """
+
+        Statistics of the profiled steps, see enable_profiling.
+
+        :return: dict mapping the phases and the update function names to dicts with their count,
+
+            total, mean, max, p50, p90 and p99 durations in seconds, and histogram, the counts
+
+            of the durations over the log-spaced bins of profiler.bin_edges
+
+        """
+        if self.profiler is None:
+            raise RuntimeError("profiling is not enabled, see enable_profiling")
+        return self.profiler.report()
 
     def get_observation(self):
         """
         get state observation from sim.
 
-        :return: NamedTuple, the first state observation of the episode
+        In flat observation mode, the same preallocated array is filled and returned at
+
+        every call: copy it to keep an observation across steps.
+
+        :return: tuple of 1-element arrays, and of arrays of the values of the vector properties,
+
+            or flat float64 array in flat observation mode
 
         """
-        obs_list = self.sim.get_property_values(self.task.get_observation_var())
-        return tuple([np.array([obs]) for obs in obs_list])
+        observation = self.sim.get_property_values(self.task.get_observation_var(), out=self._observation)
+        return observation if self.task.flat_observation else self.task.split_observation(observation)
 
     def get_sim_time(self):
         """ Gets the simulation time from sim, a float. """
@@ -227,12 +409,27 @@ class JSBSimEnv(gym.Env):
         return self.sim.get_sim_state()
 
     def _get_clipped_state(self):
-        clipped = [
-            np.clip(self.state[i], o.low, o.high) if self.task.state_var[i].clipped else self.state[i]
-            for i, o in enumerate(self.observation_space)
-        ]
-        return tuple(clipped)
+        clipped = self.task.clip_observation(self._observation)
+        return clipped if self.task.flat_observation else self.task.split_observation(clipped)
 
     def set_state(self, state):
         self.sim.set_sim_state(state)
         self.state = self.get_observation()
+
+    def get_snapshot(self):
+        """ Captures the simulation state in a SimSnapshot, see Simulation.get_snapshot. """
+        return self.sim.get_snapshot()
+
+    def reset_to_snapshot(self, snapshot):
+        """
+
+        Resets the environment to a SimSnapshot taken by get_snapshot, the restore being approximate,
+
+        see Simulation.reset_to_snapshot.
+
+        :return: the observation of the restored state
+
+        """
+        self.sim.reset_to_snapshot(snapshot)
+        self.state = self.get_observation()
+        return self.state
@@ -0,0 +1,140 @@
+import math
+from collections import defaultdict
+from time import perf_counter
+import numpy as np
+
+# latency histogram bins: log-spaced from 10**HISTOGRAM_MIN_EXP s, HISTOGRAM_BINS_PER_DECADE bins per decade
+HISTOGRAM_MIN_EXP = -7
+HISTOGRAM_BINS_PER_DECADE = 8
+HISTOGRAM_BINS = 64
+
+
+class StepProfiler:
+
+    """
+    A class timing the phases of the environment steps and the property update functions.
+
+    Timed sections are nested with push and pop. For every section name, the number of calls,
+    the total and maximum time and a histogram of the durations over log-spaced bins are kept.
+    The time spent in each stack of sections, minus the time of the nested sections, is kept
+    as well to export a flame graph, see collapsed.
+    """
+
+    def __init__(self):
+        self.bin_edges = 10.0 ** (HISTOGRAM_MIN_EXP + np.arange(HISTOGRAM_BINS + 1) / HISTOGRAM_BINS_PER_DECADE)
+        self.histograms = defaultdict(lambda: np.zeros(HISTOGRAM_BINS, dtype=np.int64))
+        self.totals = defaultdict(float)
+        self.maxima = defaultdict(float)
+        self.self_times = defaultdict(float)
+        # open sections: [name, start time, time spent in the nested sections]
+        self._stack = []
+
+    def push(self, name):
+        """ Opens the section name, nested in the current one. """
+        self._stack.append([name, 0.0, perf_counter()])
+
+    def pop(self):
+        """
+
+        Closes the current section.
+
+        :return: duration of the section, in seconds
+
+        """
+        end = perf_counter()
+        name, nested, start = self._stack.pop()
+        elapsed = end - start
+        self.record(name, elapsed)
+        self.self_times[tuple(frame[0] for frame in self._stack) + (name,)] += elapsed - nested
+        if self._stack:
+            self._stack[-1][1] += elapsed
+        return elapsed
+
+    def unwind(self, depth):
+        """ Drops the sections left open above depth, e.g. by an exception. """
+        del self._stack[depth:]
+
+    @property
+    def depth(self):
+        return len(self._stack)
+
+    def record(self, name, elapsed):
+        """
+
+        Records a duration of the section name.
+
+        :param name: name of the section
+
+        :param elapsed: duration, in seconds
+
+        """
+        if elapsed > 0:
+            index = int((math.log10(elapsed) - HISTOGRAM_MIN_EXP) * HISTOGRAM_BINS_PER_DECADE)
+            index = min(max(index, 0), HISTOGRAM_BINS - 1)
+        else:
+            index = 0
+        self.histograms[name][index] += 1
+        self.totals[name] += elapsed
+        if elapsed > self.maxima[name]:
+            self.maxima[name] = elapsed
+
+    def percentile(self, name, q):
+        """
+
+        Estimates a percentile of the durations of a section from its histogram.
+
+        :param name: name of the section
+
+        :param q: percentile, in [0, 100]
+
+        :return: upper edge of the histogram bin of the percentile, in seconds
+
+        """
+        counts = np.cumsum(self.histograms[name])
+        index = int(np.searchsorted(counts, q / 100 * counts[-1]))
+        return min(float(self.bin_edges[index + 1]), self.maxima[name])
+
+    def report(self):
+        """
+
+        :return: dict mapping the section names to dicts of statistics: count, total, mean, max,
+
+            p50, p90 and p99 in seconds, and histogram, the counts over the bins of bin_edges
+
+        """
+        report = {}
+        for name, histogram in self.histograms.items():
+            count = int(histogram.sum())
+            report[name] = {
+                "count": count,
+                "total": self.totals[name],
+                "mean": self.totals[name] / count,
+                "max": self.maxima[name],
+                "p50": self.percentile(name, 50),
+                "p90": self.percentile(name, 90),
+                "p99": self.percentile(name, 99),
+                "histogram": histogram.copy(),
+            }
+        return report
+
+    def collapsed(self):
+        """
+
+        Exports the time spent in each stack of sections in the collapsed stack format of
+
+        flamegraph.pl and speedscope: one "step;reward;update_delta_heading 42" line per stack.
+
+        :return: str, the times being in microseconds
+
+        """
+        return "".join(
+            f"{';'.join(stack)} {round(seconds * 1e6)}\n" for stack, seconds in sorted(self.self_times.items())
+        )
+
+    def clear(self):
+        """ Forgets all the recorded durations. """
+        self.histograms.clear()
+        self.totals.clear()
+        self.maxima.clear()
+        self.self_times.clear()
+        self._stack.clear()
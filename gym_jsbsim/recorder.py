@@ -0,0 +1,207 @@
+import os
+import json
+import gym
+import numpy as np
+from gym_jsbsim.catalogs import utils
+
+METADATA_FILE = "metadata.json"
+
+
+class FlightRecorder(gym.Wrapper):
+
+    """
+    A wrapper of JSBSimEnv recording flights in a directory of columnar .npy files.
+
+    Every reset and step appends a row: the episode number, the step in the episode,
+    the simulation time, the values of the task output properties, the action, the
+    reward and the done flag (the action and reward of a reset row are NaN).
+
+    Rows are buffered in preallocated chunks of chunk_size rows, each column of a full
+    chunk being saved in its own .npy file, so that the memory used does not grow with
+    the length of the recording. The chunks are only appended: recording again in the
+    same directory adds new episodes. Recorded flights are read with FlightDataset.
+    """
+
+    def __init__(self, env, directory, chunk_size=4096):
+        """
+
+        :param env: JSBSimEnv, possibly wrapped
+
+        :param directory: directory of the recording, created if needed
+
+        :param chunk_size: number of rows of a chunk
+
+        """
+        super().__init__(env)
+        self.directory = directory
+        self.chunk_size = chunk_size
+
+        task = self.env.unwrapped.task
+        self.output_var = task.get_output()
+        self.action_var = task.get_action_var()
+        self.columns = {
+            "episode": (np.int64, ()),
+            "step": (np.int64, ()),
+            "sim_time": (np.float64, ()),
+            "output": (np.float64, (utils.get_size(self.output_var),)),
+            "action": (np.float64, (len(self.action_var),)),
+            "reward": (np.float64, ()),
+            "done": (np.bool_, ()),
+        }
+        self._buffers = {name: np.zeros((chunk_size,) + shape, dtype) for name, (dtype, shape) in self.columns.items()}
+        self._row = 0
+
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(os.path.join(directory, METADATA_FILE)) as f:
+                self.metadata = json.load(f)
+        except FileNotFoundError:
+            self.metadata = {
+                "task": type(task).__name__,
+                "output": utils.get_names(self.output_var),
+                "action": [prop.name_jsbsim for prop in self.action_var],
+                "columns": {name: [np.dtype(dtype).str, list(shape)] for name, (dtype, shape) in self.columns.items()},
+                "chunks": [],
+                "episodes": 0,
+            }
+        else:
+            if self.metadata["output"] != utils.get_names(self.output_var) or self.metadata[
+                "action"
+            ] != [prop.name_jsbsim for prop in self.action_var]:
+                raise ValueError(f"{directory} holds a recording of other output or action properties")
+        self.episode = self.metadata["episodes"] - 1
+        self.step_count = 0
+
+    def reset(self, **kwargs):
+        observation = self.env.reset(**kwargs)
+        self.episode += 1
+        self.step_count = 0
+        self._record(None, np.nan, False)
+        return observation
+
+    def step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        self.step_count += 1
+        self._record(action, reward, done)
+        return observation, reward, done, info
+
+    def _record(self, action, reward, done):
+        row, buffers = self._row, self._buffers
+        sim = self.env.unwrapped.sim
+        buffers["episode"][row] = self.episode
+        buffers["step"][row] = self.step_count
+        buffers["sim_time"][row] = sim.get_sim_time()
+        sim.get_property_values(self.output_var, out=buffers["output"][row])
+        buffers["action"][row] = np.nan if action is None else np.ravel(action)
+        buffers["reward"][row] = reward
+        buffers["done"][row] = done
+
+        self._row += 1
+        if self._row == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """ Saves the buffered rows in a new chunk. """
+        if self._row == 0:
+            return
+        chunk = len(self.metadata["chunks"])
+        for name, buffer in self._buffers.items():
+            np.save(os.path.join(self.directory, f"{name}-{chunk:05d}.npy"), buffer[: self._row])
+        self.metadata["chunks"].append(self._row)
+        self.metadata["episodes"] = self.episode + 1
+        self._row = 0
+
+        # the metadata is replaced at once, so that a reader never sees a partial chunk list
+        tmp_file = os.path.join(self.directory, f"{METADATA_FILE}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(self.metadata, f, indent=1)
+        os.replace(tmp_file, os.path.join(self.directory, METADATA_FILE))
+
+    def close(self):
+        self.flush()
+        return super().close()
+
+
+class FlightDataset:
+
+    """
+    A class reading the flights recorded by FlightRecorder.
+
+    The chunks are memory-mapped: reading a column of a chunk does not copy it, and
+    only the pages actually used are loaded from disk.
+    """
+
+    def __init__(self, directory):
+        """
+
+        :param directory: directory of the recording
+
+        """
+        self.directory = directory
+        with open(os.path.join(directory, METADATA_FILE)) as f:
+            self.metadata = json.load(f)
+        self.output = self.metadata["output"]
+        self.action = self.metadata["action"]
+        self.chunks = [
+            {
+                name: np.load(os.path.join(directory, f"{name}-{chunk:05d}.npy"), mmap_mode="r")
+                for name in self.metadata["columns"]
+            }
+            for chunk in range(len(self.metadata["chunks"]))
+        ]
+
+    def __len__(self):
+        return sum(self.metadata["chunks"])
+
+    def column(self, name):
+        """
+
+        :param name: name of the column, one of FlightRecorder.columns
+
+        :return: np.array of the column over all the chunks, a memory map when there is a single chunk
+
+        """
+        arrays = [chunk[name] for chunk in self.chunks]
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.concatenate(arrays)
+
+    def episodes(self):
+        """
+
+        Iterates over the recorded episodes.
+
+        :return: generator of dicts mapping the column names to the rows of an episode,
+
+            memory maps when the episode is in a single chunk
+
+        """
+        pending = []
+        for chunk in self.chunks:
+            episode = chunk["episode"]
+            # first row of each episode in the chunk
+            starts = np.flatnonzero(np.diff(episode, prepend=episode[0] - 1))
+            for start, stop in zip(starts, np.append(starts[1:], len(episode))):
+                rows = {name: column[start:stop] for name, column in chunk.items()}
+                if pending and pending[-1]["episode"][0] != rows["episode"][0]:
+                    yield _concatenate(pending)
+                    pending = []
+                pending.append(rows)
+        if pending:
+            yield _concatenate(pending)
+
+    def get_output(self, name):
+        """
+
+        :param name: JSBSim name of an output property, "name_jsbsim[i]" for the i-th value of a vector property
+
+        :return: np.array of the property values over all the chunks
+
+        """
+        return self.column("output")[:, self.output.index(name)]
+
+
+def _concatenate(parts):
+    if len(parts) == 1:
+        return parts[0]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
@@ -1,9 +1,45 @@
-from collections import namedtuple
+from collections import namedtuple, Counter
+import math
 import re
 from os import environ
+import numpy as np
 import jsbsim
-from gym_jsbsim.catalogs.catalog import Catalog
-from gym_jsbsim.catalogs.property import Property, CustomProperty
+from gym_jsbsim.catalogs.catalog import Catalog, DynamicCatalog, get_jsbsim_props
+from gym_jsbsim.catalogs.property import Property, CustomProperty, VectorProperty
+from gym_jsbsim.catalogs import utils
+from gym_jsbsim.cache import get_aircraft_manifest
+
+"""
+
+A snapshot of a simulation: its time, the snapshot properties and their values as a float array
+
+"""
+SimSnapshot = namedtuple("SimSnapshot", "sim_time props values")
+
+# kinematic state restored through the initial conditions: (ic property, state property, scale to the ic unit)
+SNAPSHOT_IC = (
+    ("ic_lat_geod_rad", "position_lat_geod_rad", 1.0),
+    ("ic_long_gc_rad", "position_long_gc_rad", 1.0),
+    ("ic_h_sl_ft", "position_h_sl_ft", 1.0),
+    ("ic_u_fps", "velocities_u_fps", 1.0),
+    ("ic_v_fps", "velocities_v_fps", 1.0),
+    ("ic_w_fps", "velocities_w_fps", 1.0),
+    ("ic_p_rad_sec", "velocities_p_rad_sec", 1.0),
+    ("ic_q_rad_sec", "velocities_q_rad_sec", 1.0),
+    ("ic_r_rad_sec", "velocities_r_rad_sec", 1.0),
+    ("ic_phi_rad", "attitude_phi_rad", 1.0),
+    ("ic_theta_rad", "attitude_theta_rad", 1.0),
+    ("ic_psi_true_rad", "attitude_psi_rad", 1.0),
+    ("ic_vw_dir_deg", "atmosphere_psiw_rad", 180 / math.pi),
+    ("ic_vw_mag_fps", "atmosphere_wind_mag_fps", 1.0),
+)
+
+# writable jsbsim properties which are settings, commands or outputs of the kinematic state rather than model state
+SNAPSHOT_EXCLUDED = re.compile(
+    r"^(simulation|ic|orbital|position|velocities|metrics|contact)/"
+    r"|^atmosphere/(delta-T|SL-graded-delta-T|P-sl-psf|dew-point-R|vapor|RH|randomseed)"
+    r"|^propulsion/(refuel|fuel_dump)"
+)
 
 
 class Simulation:
@@ -13,7 +49,15 @@ class Simulation:
 
     """
 
-    def __init__(self, aircraft_name="A320", init_conditions=None, jsbsim_freq=60, agent_interaction_steps=5):
+    def __init__(
+        self,
+        aircraft_name="A320",
+        init_conditions=None,
+        jsbsim_freq=60,
+        agent_interaction_steps=5,
+        catalog=None,
+        start=True,
+    ):
         """
 
         Constructor. Creates an instance of JSBSim, loads an aircraft and sets initial conditions.
@@ -31,15 +75,48 @@ class Simulation:
 
         :param agent_interaction_steps: simulation steps before the agent interact
 
+        :param catalog: dict mapping names to the properties used by the task, copied in the simulation catalog
+
+        :param start: if False, the aircraft is loaded but the initial conditions are not set, and start must be
+
+            called before running the simulation, see SimulationPool
+
         """
 
+        self.aircraft_name = aircraft_name
+        self.jsbsim_freq = jsbsim_freq
+        # hash of the aircraft files, see SimulationPool
+        self.aircraft_digest = get_aircraft_manifest(environ["JSBSIM_ROOT_DIR"], aircraft_name).digest
+
         self.jsbsim_exec = jsbsim.FGFDMExec(environ["JSBSIM_ROOT_DIR"])
         self.jsbsim_exec.set_debug_level(0)  # requests JSBSim not to output any messages whatsoever
 
         self.jsbsim_exec.load_model(aircraft_name)
 
-        # collect all jsbsim properties in Catalog
-        Catalog.add_jsbsim_props(self.jsbsim_exec.query_property_catalog(""))
+        # jsbsim properties of the aircraft, parsed once per aircraft model and created on first use
+        self.jsbsim_props = get_jsbsim_props(
+            f"{self.aircraft_digest}-{jsbsim.__version__}", lambda: self.jsbsim_exec.query_property_catalog("")
+        )
+        self.catalog = DynamicCatalog(catalog or {})
+        self.catalog.add_jsbsim_props(self.jsbsim_props)
+
+        # resolve the property nodes of the task properties once
+        self._nodes = {}
+        self.compile_properties((catalog or {}).values())
+
+        # derived properties evaluation state, see update_derived
+        self._derived_orders = {}
+        self._derived_inputs = {}
+        self.update_counts = Counter()
+
+        # StepProfiler timing the update functions, or None, see JSBSimEnv.enable_profiling
+        self.profiler = None
+
+        # values of the vector properties: name_jsbsim -> (values, low, high), see VectorProperty
+        self._vectors = {}
+
+        # properties saved in the snapshots, see get_snapshot
+        self._snapshot_props = None
 
         # set jsbsim integration time step
         dt = 1 / jsbsim_freq
@@ -47,9 +124,62 @@ class Simulation:
 
         self.agent_interaction_steps = agent_interaction_steps
 
+        # properties recorded after every integration step, see record_substeps
+        self.substep_props = ()
+        self._substep_getters = ()
+        self.substep_values = np.zeros((agent_interaction_steps, 0))
+
+        self.started = False
+        if start:
+            self.start(init_conditions)
+
+    def start(self, init_conditions=None):
+        """
+
+        Sets the initial conditions of a simulation created with start=False, as the constructor does.
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        """
+        self.initialise(init_conditions)
+        self.started = True
+
+    def can_reset(self, aircraft_name, jsbsim_freq):
+        """
+
+        Checks whether this simulation can be warm reset for a new episode.
+
+        The loaded aircraft model is reused only if the aircraft and the integration frequency are unchanged.
+
+        :param aircraft_name: name of the aircraft of the new episode
+
+        :param jsbsim_freq: JSBSim integration frequency of the new episode
+
+        :return: bool
+
+        """
+        return (
+            self.jsbsim_exec is not None and self.aircraft_name == aircraft_name and self.jsbsim_freq == jsbsim_freq
+        )
+
+    def reset(self, init_conditions=None, agent_interaction_steps=None):
+        """
+
+        Warm reset: restores initial conditions while keeping the loaded aircraft model.
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        :param agent_interaction_steps: simulation steps before the agent interact, unchanged if None
+
+        """
+        if agent_interaction_steps is not None:
+            self.agent_interaction_steps = agent_interaction_steps
+        self.jsbsim_exec.reset_to_initial_conditions(0)
         self.initialise(init_conditions)
 
     def initialise(self, init_conditions):
+        self._derived_inputs.clear()
+        self.update_counts.clear()
         self.set_initial_conditions(init_conditions)
         success = self.jsbsim_exec.run_ic()
         self.propulsion_init_running(-1)
@@ -69,6 +199,21 @@ class Simulation:
                 propulsion.get_engine(j).init_running()
             propulsion.get_steady_state()
 
+    def trim(self, mode=1):
+        """
+
+        Trims the aircraft with the JSBSim simple trim: the controls and the attitude are solved for
+
+        steady flight in the current conditions, e.g. just after a reset.
+
+        :param mode: JSBSim trim mode: 0 longitudinal, 1 full, 2 ground...
+
+        :raise RuntimeError: jsbsim.TrimFailureError if the trim did not converge
+
+        """
+        self.jsbsim_exec.set_property_value("simulation/do_simple_trim", mode)
+        self._derived_inputs.clear()
+
     def set_initial_conditions(self, init_conditions=None):
         """
 
@@ -94,16 +239,80 @@ class Simulation:
 
         if JSBSim termination criteria are met.
 
+        The values of the properties given to record_substeps after every integration step are
+
+        kept in substep_values.
+
 
 
         :return: bool, False if sim has met JSBSim termination criteria else True.
 
         """
-        for _ in range(self.agent_interaction_steps):
-            result = self.jsbsim_exec.run()
-            if not result:
-                raise RuntimeError("JSBSim failed.")
-        return result
+        getters = self._substep_getters
+        if not getters:
+            for _ in range(self.agent_interaction_steps):
+                result = self.jsbsim_exec.run()
+                if not result:
+                    raise RuntimeError("JSBSim failed.")
+        else:
+            steps = self.agent_interaction_steps
+            if self.substep_values.shape[0] != steps:
+                self.substep_values = np.zeros((steps, len(getters)))
+            values = self.substep_values
+            for i in range(steps):
+                if not self.jsbsim_exec.run():
+                    raise RuntimeError("JSBSim failed.")
+                values[i] = [get() for get in getters]
+
+        # derived properties are computed again in the new agent step
+        self._derived_inputs.clear()
+        self.update_counts.clear()
+        return True
+
+    def record_substeps(self, props=()):
+        """
+
+        Records the values of props after every integration step of run, e.g. to reward on the
+
+        maximum load factor or the minimum altitude reached between two agent steps.
+
+        The values of the last run are in substep_values, an np.array of shape
+
+        (agent_interaction_steps, len(props)), see get_substep_values.
+
+        :param props: list of JSBSim Properties, derived and custom properties are not supported
+
+        """
+        for prop in props:
+            if not isinstance(prop, Property) or prop.update:
+                raise ValueError(f"{prop} can not be recorded at every integration step")
+        self.substep_props = tuple(props)
+        self._substep_getters = tuple(
+            self._get_node(prop.name_jsbsim, create=True).get_double_value for prop in self.substep_props
+        )
+        self.substep_values = np.zeros((self.agent_interaction_steps, len(self.substep_props)))
+
+    def get_substep_values(self, prop):
+        """
+
+        Get the values of a recorded property after every integration step of the last run.
+
+        :param prop: Property given to record_substeps
+
+        :return: np.array of shape (agent_interaction_steps,), a view of substep_values
+
+        """
+        return self.substep_values[:, self.substep_props.index(prop)]
+
+    def set_random_seed(self, seed):
+        """
+
+        Seeds the JSBSim random number generator, which drives the atmospheric turbulence.
+
+        :param seed: int in [0, 2**31)
+
+        """
+        self.jsbsim_exec.set_property_value("simulation/randomseed", seed)
 
     def get_sim_time(self):
         """ Gets the simulation time from JSBSim, a float. """
@@ -115,20 +324,96 @@ class Simulation:
 
         if self.jsbsim_exec:
             self.jsbsim_exec = None
+            self._nodes = {}
 
-    def get_property_values(self, props):
+    def compile_properties(self, props):
+        """
+
+        Resolves the JSBSim property nodes of props, so that reading and writing them
+
+        do not look up the property tree by name any more.
+
+        :param props: list of Properties
+
+        """
+        for prop in props:
+            if isinstance(prop, Property):
+                self._get_node(prop.name_jsbsim, create=True)
+
+    def get_properties(self):
+        """
+
+        Gets all the properties of the simulation: those of its catalog and every jsbsim property of the aircraft,
+
+        which are added to the catalog.
+
+        :return: list of properties
+
+        """
+        for name in self.jsbsim_props:
+            self.catalog[name]
+        return list(self.catalog.values())
+
+    def add_catalog(self, catalog):
+        """
+
+        Adds properties to the simulation catalog, e.g. those of the task of a reused simulation.
+
+        :param catalog: dict mapping names to properties
+
+        """
+        self.catalog.update(catalog)
+        self.compile_properties(catalog.values())
+        self._snapshot_props = None
+
+    def _get_node(self, name_jsbsim, create=False):
+        """
+        Get the cached JSBSim property node of name_jsbsim.
+
+        :param name_jsbsim: JSBSim name of the property
+
+        :param create: whether to create the property if it does not exist yet in JSBSim
+
+        :return: FGPropertyNode, or None if the property does not exist
+        """
+        try:
+            return self._nodes[name_jsbsim]
+        except KeyError:
+            try:
+                node = self.jsbsim_exec.get_property_manager().get_node(name_jsbsim, create)
+            except AttributeError:  # jsbsim without property manager bindings
+                node = None
+            if node is not None:
+                self._nodes[name_jsbsim] = node
+            return node
+
+    def get_property_values(self, props, out=None):
         """
 
         Get the values of the specified properties
 
         :param props: list of Properties
 
-        : return: NamedTuple with properties name and their values
+        :param out: optional preallocated float array, or list, of utils.get_size(props) filled in place, the
+
+            values of a vector property being copied in a slice of its size
+
+        : return: list of the properties values, or out if given
 
         """
-        return [self.get_property_value(prop) for prop in props]
+        if out is None:
+            return [self.get_property_value(prop) for prop in props]
+        i = 0
+        for prop in props:
+            if isinstance(prop, VectorProperty):
+                out[i : i + prop.size] = self.get_property_value(prop)
+                i += prop.size
+            else:
+                out[i] = self.get_property_value(prop)
+                i += 1
+        return out
 
-    def set_property_values(self, props, values):
+    def set_property_values(self, props, values, clamped=False):
         """
 
         Set the values of the specified properties
@@ -137,11 +422,22 @@ class Simulation:
 
         :param values: list of float
 
+        :param clamped: whether the values are already within the bounds of props, e.g. clamped at once by
+
+            Task.clip_action: they are then written without checking the bounds of each property
+
         """
         if not len(props) == len(values):
             raise ValueError("mismatch between properties and values size")
+        if not clamped:
+            for prop, value in zip(props, values):
+                self.set_property_value(prop, value)
+            return
         for prop, value in zip(props, values):
-            self.set_property_value(prop, value)
+            if isinstance(prop, Property):
+                self._write_value(prop, value)
+            else:
+                self.set_property_value(prop, value)
 
     def get_property_value(self, prop):
         """
@@ -149,28 +445,95 @@ class Simulation:
 
         :param prop: Property
 
-        :return : float
+        :return : float, or the float array of the values of a VectorProperty, which is updated in place
         """
         if isinstance(prop, Property):
             if prop.access == "R":
                 if prop.update:
-                    prop.update(self)
-            return self.jsbsim_exec.get_property_value(prop.name_jsbsim)
+                    self.update_derived(prop)
+            return self._get_raw_value(prop)
         elif isinstance(prop, CustomProperty):
             if "R" in prop.access and prop.read:
                 return prop.read(self)
             else:
                 raise RuntimeError(f"{prop} is not readable")
+        elif isinstance(prop, VectorProperty):
+            if prop.update:
+                self.update_derived(prop)
+            return self._get_vector(prop)[0]
         else:
             raise ValueError(f"prop type unhandled: {type(prop)} ({prop})")
 
+    def _get_raw_value(self, prop):
+        """ Get the value of the Property prop from JSBSim, without calling its update function. """
+        node = self._get_node(prop.name_jsbsim)
+        if node is None:
+            return self.jsbsim_exec.get_property_value(prop.name_jsbsim)
+        return node.get_double_value()
+
+    def _get_vector(self, prop):
+        """ Get the (values, low, high) arrays of the VectorProperty prop, the values starting within bounds at 0. """
+        try:
+            return self._vectors[prop.name_jsbsim]
+        except KeyError:
+            low, high = np.array(prop.min, dtype=np.float64), np.array(prop.max, dtype=np.float64)
+            vector = self._vectors[prop.name_jsbsim] = (np.clip(np.zeros(prop.size), low, high), low, high)
+            return vector
+
+    def _call_update(self, update):
+        profiler = self.profiler
+        if profiler is None:
+            update(self)
+        else:
+            profiler.push(update.__name__)
+            try:
+                update(self)
+            finally:
+                profiler.pop()
+        self.update_counts[update.__name__] += 1
+
+    def update_derived(self, prop):
+        """
+
+        Computes the derived Property prop, after the derived properties it depends on.
+
+        The derived properties are evaluated along the topologically sorted graph of their
+
+        declared dependencies, and an update function is called at most once per agent step:
+
+        only again if one of its inputs was written in the meantime. A derived property
+
+        without declared dependencies is computed at every read.
+
+        The number of calls of each update function since the last run is kept in update_counts.
+
+        :param prop: Property with "R" access and an update function
+
+        """
+        if prop.depends is None:
+            self._call_update(prop.update)
+            return
+        try:
+            order = self._derived_orders[prop.name_jsbsim]
+        except KeyError:
+            order = self._derived_orders[prop.name_jsbsim] = utils.derived_update_order(prop)
+        for derived in order:
+            if derived.depends is None:
+                self._call_update(derived.update)
+                continue
+            inputs = tuple(self._get_raw_value(dep) for dep in derived.depends)
+            if self._derived_inputs.get(derived.update) != inputs:
+                self._call_update(derived.update)
+                # the update function may write its own inputs (e.g. id_path)
+                self._derived_inputs[derived.update] = tuple(self._get_raw_value(dep) for dep in derived.depends)
+
     def set_property_value(self, prop, value):
         """
         Set the values of the specified property
 
         :param prop: Property
 
-        :param value: float
+        :param value: float, or the array of the values of a VectorProperty
 
         """
         # set value in property bounds
@@ -179,22 +542,114 @@ class Simulation:
                 value = prop.min
             elif value > prop.max:
                 value = prop.max
-
-            self.jsbsim_exec.set_property_value(prop.name_jsbsim, value)
-
-            if "W" in prop.access:
-                if prop.update:
-                    prop.update(self)
+            self._write_value(prop, value)
         elif isinstance(prop, CustomProperty):
             if "W" in prop.access and prop.write:
                 return prop.write(self, value)
             else:
                 raise RuntimeError(f"{prop} is not readable")
+        elif isinstance(prop, VectorProperty):
+            values, low, high = self._get_vector(prop)
+            np.clip(value, low, high, out=values)
         else:
             raise ValueError(f"prop type unhandled: {type(prop)} ({prop})")
 
+    def _write_value(self, prop, value):
+        """ Set the value of the Property prop in JSBSim, calling its update function if it is writable. """
+        node = self._get_node(prop.name_jsbsim)
+        if node is None:
+            self.jsbsim_exec.set_property_value(prop.name_jsbsim, value)
+        else:
+            node.set_double_value(value)
+
+        if "W" in prop.access:
+            if prop.update:
+                self._call_update(prop.update)
+
+    def _set_raw_value(self, prop, value):
+        """ Set the value of the Property prop in JSBSim, without bounds nor update function. """
+        node = self._get_node(prop.name_jsbsim, create=True)
+        if node is None:
+            self.jsbsim_exec.set_property_value(prop.name_jsbsim, value)
+        else:
+            node.set_double_value(value)
+
+    def get_snapshot(self):
+        """
+
+        Captures the state of the simulation in a compact SimSnapshot.
+
+        The snapshot holds the kinematic state (position, attitude, velocities, wind) and the values of all
+
+        the writable model properties: FCS, propulsion, gear, autopilot and the custom properties of the catalog.
+
+        :return: SimSnapshot
+
+        """
+        if self._snapshot_props is None:
+            ic = tuple(self.catalog[state] for _, state, _ in SNAPSHOT_IC)
+            model = (
+                prop
+                for prop in self.get_properties()
+                if isinstance(prop, Property)
+                and "R" in prop.access
+                and "W" in prop.access
+                and not SNAPSHOT_EXCLUDED.match(prop.name_jsbsim)
+            )
+            self._snapshot_props = ic + tuple(dict.fromkeys(model))
+
+        props = self._snapshot_props
+        values = np.fromiter((self._get_raw_value(prop) for prop in props), dtype=np.float64, count=len(props))
+        return SimSnapshot(self.get_sim_time(), props, values)
+
+    def reset_to_snapshot(self, snapshot):
+        """
+
+        Resets the simulation to the state captured by get_snapshot, possibly in another simulation of the
+
+        same aircraft.
+
+        The restore is approximate. JSBSim does not expose the integrator histories, the memories of the FCS
+
+        filters nor a setter of its state vector: the models are reset, the model properties written back and
+
+        the kinematic state given as initial conditions, as at the beginning of an episode. The kinematic state
+
+        is then within a few ulps of the snapshot (the geodetic conversions of the initial conditions are not
+
+        exact), while the integrator histories and the memories of the FCS filters restart, e.g. the output of
+
+        the yaw damper of the A320 may then differ by a percent.
+
+        The reset is deterministic, the initial conditions being written from a fixed state: in flight, the
+
+        same snapshot and actions give bit for bit the same trajectory, whatever happened before the reset.
+
+        :param snapshot: SimSnapshot
+
+        """
+        nb_ic = len(SNAPSHOT_IC)
+        ic_values, model, model_values = snapshot.values[:nb_ic], snapshot.props[nb_ic:], snapshot.values[nb_ic:]
+
+        self.jsbsim_exec.reset_to_initial_conditions(0)
+        for prop, value in zip(model, model_values):
+            self._set_raw_value(prop, value)
+        ic_props = [self.catalog[ic] for ic, _, _ in SNAPSHOT_IC]
+        for prop in ic_props:
+            self._set_raw_value(prop, 0.0)
+        for prop, (_, _, scale), value in zip(ic_props, SNAPSHOT_IC, ic_values):
+            self._set_raw_value(prop, value * scale)
+        success = self.jsbsim_exec.run_ic()
+        self.propulsion_init_running(-1)
+        if not success:
+            raise RuntimeError("JSBSim failed to init simulation conditions.")
+        self.jsbsim_exec.set_sim_time(snapshot.sim_time)
+
+        self._derived_inputs.clear()
+        self.update_counts.clear()
+
     def get_sim_state(self):
-        return {prop: self.get_property_value(prop) for prop in Catalog.values()}
+        return {prop: self.get_property_value(prop) for prop in self.get_properties()}
 
     def state_to_ic(self, state):
         init_conditions = {}
@@ -226,5 +681,4 @@ class Simulation:
 
     def set_sim_state(self, state):
         init_conditions = self.state_to_ic(state)
-        self.jsbsim_exec.reset_to_initial_conditions(0)
-        self.initialise(init_conditions)
+        self.reset(init_conditions)
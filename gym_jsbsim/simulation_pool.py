@@ -0,0 +1,145 @@
+from collections import defaultdict
+from os import environ
+from gym_jsbsim.cache import get_aircraft_manifest
+from gym_jsbsim.simulation import Simulation
+
+
+class SimulationPool:
+
+    """
+    A pool of idle simulations, handed out without loading an aircraft model again.
+
+    Loading the aircraft is most of the cost of a new Simulation. The pool keeps two kinds
+    of simulations per aircraft configuration and jsbsim_freq:
+
+    - templates, loaded by prewarm and whose initial conditions are not set yet: an acquired
+      template behaves exactly as a new Simulation, so environments take one at a cold reset;
+    - released simulations, in the state they were released in unless initial conditions are
+      given, so they must be reset or restored from a snapshot before being used, see
+      JSBSimEnv.clone.
+
+    An aircraft configuration is identified by the hash of its files, see
+    get_aircraft_manifest: different aircraft directories never share simulations.
+    """
+
+    def __init__(self, max_idle=64):
+        """
+
+        :param max_idle: maximum number of idle simulations kept per aircraft and frequency, the others are closed
+
+        """
+        self.max_idle = max_idle
+        self._idle = defaultdict(list)
+        self._templates = defaultdict(list)
+
+    def _key(self, aircraft_name, jsbsim_freq):
+        return get_aircraft_manifest(environ["JSBSIM_ROOT_DIR"], aircraft_name).digest, jsbsim_freq
+
+    def acquire(
+        self,
+        aircraft_name="A320",
+        jsbsim_freq=60,
+        agent_interaction_steps=5,
+        catalog=None,
+        init_conditions=None,
+        fresh=False,
+    ):
+        """
+
+        Get an idle simulation, or a new one if there is none.
+
+        :param aircraft_name: name of aircraft to be loaded
+
+        :param jsbsim_freq: JSBSim integration frequency
+
+        :param agent_interaction_steps: simulation steps before the agent interact
+
+        :param catalog: dict mapping names to the properties used by the task
+
+        :param init_conditions: dict mapping properties to their initial values, a released simulation
+
+            being warm reset with them if not None
+
+        :param fresh: if True, only a template or a new simulation is returned, in the same state as
+
+            Simulation(aircraft_name, init_conditions, ...)
+
+        :return: Simulation
+
+        """
+        key = self._key(aircraft_name, jsbsim_freq)
+        idle, templates = self._idle[key], self._templates[key]
+        if idle and not fresh:
+            sim = idle.pop()
+            if init_conditions is not None:
+                sim.reset(init_conditions)
+        elif templates:
+            sim = templates.pop()
+            sim.start(init_conditions)
+        else:
+            return Simulation(
+                aircraft_name=aircraft_name,
+                init_conditions=init_conditions,
+                jsbsim_freq=jsbsim_freq,
+                agent_interaction_steps=agent_interaction_steps,
+                catalog=catalog,
+            )
+        sim.agent_interaction_steps = agent_interaction_steps
+        if catalog:
+            sim.add_catalog(catalog)
+        return sim
+
+    def release(self, sim):
+        """
+
+        Give back a simulation to the pool.
+
+        :param sim: Simulation, closed if the pool is full
+
+        """
+        if sim.jsbsim_exec is None:
+            return
+        idle = (self._idle if sim.started else self._templates)[(sim.aircraft_digest, sim.jsbsim_freq)]
+        if len(idle) < self.max_idle:
+            idle.append(sim)
+        else:
+            sim.close()
+
+    def prewarm(self, n, aircraft_name="A320", jsbsim_freq=60, catalog=None):
+        """
+
+        Loads templates in advance, so that the next n acquire calls do not load the aircraft,
+
+        e.g. before creating many environments or switching aircraft.
+
+        :param n: number of templates wanted
+
+        :param aircraft_name: name of aircraft to be loaded
+
+        :param jsbsim_freq: JSBSim integration frequency
+
+        :param catalog: dict mapping names to the properties used by the task
+
+        """
+        templates = self._templates[self._key(aircraft_name, jsbsim_freq)]
+        for _ in range(min(n, self.max_idle) - len(templates)):
+            templates.append(
+                Simulation(aircraft_name=aircraft_name, jsbsim_freq=jsbsim_freq, catalog=catalog, start=False)
+            )
+
+    def size(self, aircraft_name="A320", jsbsim_freq=60):
+        """ Gets the number of idle simulations and templates of an aircraft and frequency, an int. """
+        key = self._key(aircraft_name, jsbsim_freq)
+        return len(self._idle[key]) + len(self._templates[key])
+
+    def clear(self):
+        """ Closes all the idle simulations and templates. """
+        for pool in (self._idle, self._templates):
+            for idle in pool.values():
+                for sim in idle:
+                    sim.close()
+            pool.clear()
+
+
+# the pool shared by the environments of the process
+simulation_pool = SimulationPool()
@@ -0,0 +1,317 @@
+import math
+from collections import namedtuple
+from itertools import chain
+import numpy as np
+from gym_jsbsim.catalogs.property import VectorProperty
+
+"""
+
+Declarative reward terms and termination predicates over properties, see Task.define_reward_spec and
+
+Task.define_terminal_spec. A spec is compiled once by compile_spec into a function of the property values
+
+of a batch of environments.
+
+"""
+
+# reward terms, in [0, 1]
+
+"""
+
+exp(-((value - target) / scale) ** 2)
+
+"""
+Gaussian = namedtuple("Gaussian", "prop scale target")
+Gaussian.__new__.__defaults__ = (0.0,)
+
+"""
+
+exp(-|value - target| / scale)
+
+"""
+Laplacian = namedtuple("Laplacian", "prop scale target")
+Laplacian.__new__.__defaults__ = (0.0,)
+
+"""
+
+Product of the terms
+
+"""
+Product = namedtuple("Product", "terms")
+
+"""
+
+Geometric mean of the terms: their product to the power 1 / len(terms)
+
+"""
+GeometricMean = namedtuple("GeometricMean", "terms")
+
+"""
+
+Sum of the terms weighted by weights
+
+"""
+WeightedSum = namedtuple("WeightedSum", "terms weights")
+
+# termination predicates
+
+"""
+
+Whether the value of prop, plus offset, in absolute value if absolute, is above limit, or below it if not above.
+
+The comparison is strict unless inclusive.
+
+"""
+Threshold = namedtuple("Threshold", "prop limit above offset absolute inclusive")
+Threshold.__new__.__defaults__ = (True, 0.0, False, False)
+
+"""
+
+Whether any of the predicates is true
+
+"""
+AnyOf = namedtuple("AnyOf", "predicates")
+
+"""
+
+Whether all the predicates are true
+
+"""
+AllOf = namedtuple("AllOf", "predicates")
+
+# batches of fewer environments are evaluated one environment at a time, faster than the array operations
+SCALAR_BATCH_SIZE = 4
+
+
+class CompiledSpec:
+
+    """
+    A reward or termination spec compiled into NumPy operations on the columns of an array of property values.
+
+    Calling it with an array of shape (n, len(props)), the values of props in n environments, returns the n
+
+    rewards, or the n booleans telling the terminal environments. A single environment is evaluated with the
+
+    same operations on Python floats, see evaluate, and so are the batches of fewer than SCALAR_BATCH_SIZE
+
+    environments.
+    """
+
+    def __init__(self, spec):
+        """
+
+        :param spec: a reward term or a termination predicate
+
+        """
+        self.spec = spec
+        columns = {}
+        self._evaluate, self._evaluate_scalar = _compile(spec, columns)
+        self.props = tuple(columns)
+        # the values read by evaluate, a list for the arithmetic on Python floats
+        self._values = [0.0] * len(self.props)
+
+    def __call__(self, values):
+        if len(values) < SCALAR_BATCH_SIZE:
+            return np.array([self._evaluate_scalar(row) for row in values.tolist()])
+        return self._evaluate(values)
+
+    def read(self, sim, out):
+        """
+
+        Reads the values of props in a simulation.
+
+        :param sim: Simulation
+
+        :param out: float array of len(props) filled in place
+
+        """
+        sim.get_property_values(self.props, out=out)
+
+    def evaluate(self, sim):
+        """
+
+        Evaluates the spec in a single simulation.
+
+        :param sim: Simulation
+
+        :return: float reward or bool
+
+        """
+        return self._evaluate_scalar(sim.get_property_values(self.props, out=self._values))
+
+
+def compile_spec(spec):
+    """
+
+    Compiles a reward term or a termination predicate.
+
+    :param spec: a reward term or a termination predicate, e.g. GeometricMean((Gaussian(c.delta_heading, 5), ...))
+
+    :return: CompiledSpec
+
+    """
+    return CompiledSpec(spec)
+
+
+def _compile(spec, columns):
+    """
+    Compiles spec into a function of the values array and a function of the list of the values of a single
+
+    environment, columns mapping the properties to their column.
+    """
+    if isinstance(spec, (Gaussian, Laplacian, Product, GeometricMean)):
+        return _compile_factors(_get_factors(spec, 1.0), columns)
+    if isinstance(spec, WeightedSum):
+        if not spec.terms:
+            raise ValueError(f"empty sum: {spec}")
+        if len(spec.terms) != len(spec.weights):
+            raise ValueError("mismatch between terms and weights size")
+        terms = [(_compile(term, columns), weight) for term, weight in zip(spec.terms, spec.weights)]
+        return (
+            lambda values: sum(weight * term[0](values) for term, weight in terms),
+            lambda values: sum(weight * term[1](values) for term, weight in terms),
+        )
+    if isinstance(spec, (Threshold, AnyOf, AllOf)):
+        thresholds = []
+        combine, combine_scalar = _compile_predicate(spec, thresholds)
+        compare, compare_scalar = _compile_thresholds(thresholds, columns)
+        return lambda values: combine(compare(values)), lambda values: combine_scalar(compare_scalar(values))
+    raise ValueError(f"spec type unhandled: {type(spec)} ({spec})")
+
+
+def _get_column(prop, columns):
+    if isinstance(prop, VectorProperty):
+        raise ValueError(f"vector property {prop.name_jsbsim} in a spec")
+    return columns.setdefault(prop, len(columns))
+
+
+def _get_factors(spec, power):
+    """ The Gaussian and Laplacian terms of a product of terms, each with its power, a list of (term, power). """
+    if isinstance(spec, (Gaussian, Laplacian)):
+        return [(spec, power)]
+    if isinstance(spec, (Product, GeometricMean)):
+        if not spec.terms:
+            raise ValueError(f"empty product: {spec}")
+        if isinstance(spec, GeometricMean):
+            power /= len(spec.terms)
+        return [factor for term in spec.terms for factor in _get_factors(term, power)]
+    raise ValueError(f"spec type unhandled in a product: {type(spec)} ({spec})")
+
+
+def _compile_factors(factors, columns):
+    """
+    A product of Gaussian and Laplacian terms to some powers is the exponential of a weighted sum of the squared
+
+    and of the absolute errors: it is computed with a few array operations, whatever the number of terms.
+    """
+    terms = [(_get_column(term.prop, columns), term.target, term.scale, power) for term, power in factors]
+    gaussians = [term for term, (factor, _) in zip(terms, factors) if isinstance(factor, Gaussian)]
+    laplacians = [term for term, (factor, _) in zip(terms, factors) if isinstance(factor, Laplacian)]
+
+    def arrays(terms):
+        cols, targets, scales, powers = zip(*terms)
+        return np.array(cols), np.array(targets, dtype=np.float64), np.array(scales, dtype=np.float64), np.array(powers)
+
+    gaussian_arrays = arrays(gaussians) if gaussians else None
+    laplacian_arrays = arrays(laplacians) if laplacians else None
+
+    def product(values):
+        exponent = 0
+        if gaussian_arrays is not None:
+            cols, targets, scales, powers = gaussian_arrays
+            exponent = (((values[:, cols] - targets) / scales) ** 2) @ powers
+        if laplacian_arrays is not None:
+            cols, targets, scales, powers = laplacian_arrays
+            exponent = exponent + (np.abs(values[:, cols] - targets) / scales) @ powers
+        return np.exp(-exponent)
+
+    def product_scalar(values):
+        exponent = sum(power * ((values[i] - target) / scale) ** 2 for i, target, scale, power in gaussians)
+        exponent += sum(power * abs(values[i] - target) / scale for i, target, scale, power in laplacians)
+        return math.exp(-exponent)
+
+    return product, product_scalar
+
+
+def _compile_predicate(spec, thresholds):
+    """
+    Compiles a predicate into a function of the boolean array of the results of thresholds and a function of the
+
+    list of these results in a single environment, its Threshold leaves being appended to thresholds.
+    """
+    if isinstance(spec, Threshold):
+        thresholds.append(spec)
+        index = len(thresholds) - 1
+        return lambda results: results[:, index], lambda results: results[index]
+    if isinstance(spec, (AnyOf, AllOf)):
+        if not spec.predicates:
+            raise ValueError(f"empty predicate: {spec}")
+        any_of = isinstance(spec, AnyOf)
+        reduce = np.logical_or if any_of else np.logical_and
+        reduce_scalar = any if any_of else all
+        # the Threshold leaves of the node are appended first, their results are then reduced as a slice
+        start = len(thresholds)
+        thresholds.extend(predicate for predicate in spec.predicates if isinstance(predicate, Threshold))
+        stop = len(thresholds)
+        nodes = [
+            _compile_predicate(predicate, thresholds)
+            for predicate in spec.predicates
+            if not isinstance(predicate, Threshold)
+        ]
+
+        def combine(results):
+            if stop > start:
+                result, others = reduce.reduce(results[:, start:stop], axis=1), nodes
+            else:
+                result, others = nodes[0][0](results), nodes[1:]
+            for node, _ in others:
+                result = reduce(result, node(results))
+            return result
+
+        def combine_scalar(results):
+            # any and all stop at the first result deciding the node
+            return reduce_scalar(chain(results[start:stop], (node(results) for _, node in nodes)))
+
+        return combine, combine_scalar
+    raise ValueError(f"spec type unhandled in a predicate: {type(spec)} ({spec})")
+
+
+def _compile_thresholds(thresholds, columns):
+    """
+    Compiles the comparisons of thresholds into a function returning their results, a boolean array of shape
+
+    (n, len(thresholds)), and a function returning the list of their results in a single environment.
+
+    A comparison below a limit is a comparison above it of the opposite values.
+    """
+    cols = [_get_column(threshold.prop, columns) for threshold in thresholds]
+    offsets = [float(threshold.offset) for threshold in thresholds]
+    signs = [1.0 if threshold.above else -1.0 for threshold in thresholds]
+    limits = [sign * threshold.limit for sign, threshold in zip(signs, thresholds)]
+    absolute = [bool(threshold.absolute) for threshold in thresholds]
+    inclusive = [bool(threshold.inclusive) for threshold in thresholds]
+    scalar = list(zip(cols, offsets, signs, limits, absolute, inclusive))
+
+    any_absolute, any_inclusive = any(absolute), any(inclusive)
+    cols, offsets, signs, limits = (np.array(array) for array in (cols, offsets, signs, limits))
+    absolute, inclusive = np.array(absolute), np.array(inclusive)
+
+    def compare(values):
+        x = values[:, cols] + offsets
+        if any_absolute:
+            np.abs(x, out=x, where=absolute)
+        x *= signs
+        results = x > limits
+        if any_inclusive:
+            np.greater_equal(x, limits, out=results, where=inclusive)
+        return results
+
+    def compare_scalar(values):
+        results = []
+        for i, offset, sign, limit, is_absolute, is_inclusive in scalar:
+            x = values[i] + offset
+            x = sign * (abs(x) if is_absolute else x)
+            results.append(x >= limit if is_inclusive else x > limit)
+        return results
+
+    return compare, compare_scalar
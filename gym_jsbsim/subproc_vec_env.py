@@ -0,0 +1,214 @@
+import os
+import traceback
+import multiprocessing as mp
+import numpy as np
+from gym_jsbsim.vec_env import VecJSBSimEnv, get_env_seeds
+
+
+def _worker(remote, parent_remote, task, start, stop, buffers, shapes):
+    """
+    Run a VecJSBSimEnv over the environments [start, stop) and exchange
+    actions/observations with the parent process through shared buffers.
+
+    Every command is answered with ("ok", result), or ("error", traceback)
+    if it raised, the parent re-raising it, see SubprocVecJSBSimEnv._recv.
+    """
+    parent_remote.close()
+    actions, observations, rewards, dones = [
+        np.frombuffer(buffer, dtype=np.float64).reshape(shape)[start:stop] for buffer, shape in zip(buffers, shapes)
+    ]
+    env = VecJSBSimEnv(task, stop - start)
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "close":
+                break
+            try:
+                if cmd == "step":
+                    obs, reward, done, infos = env.step(actions if data else None)
+                    observations[:] = obs
+                    rewards[:] = reward
+                    dones[:] = done
+                    # only the infos of reset environments are sent back
+                    result = [(start + i, info) for i, info in enumerate(infos) if info] or None
+                elif cmd == "reset":
+                    observations[:] = env.reset()
+                    result = None
+                elif cmd == "seed":
+                    result = env.seed(data)
+                elif cmd == "get_sim_time":
+                    result = env.get_sim_time()
+                else:
+                    raise ValueError(f"unknown command: {cmd}")
+            except Exception:
+                remote.send(("error", traceback.format_exc()))
+            else:
+                remote.send(("ok", result))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+        remote.close()
+
+
+class SubprocVecJSBSimEnv:
+
+    """
+    A class with the VecJSBSimEnv API running the simulations in a pool of
+    worker processes, to use all the cores of the machine.
+
+    The environments are split between the workers, each one stepping its
+    share with a VecJSBSimEnv. Actions, observations, rewards and dones are
+    exchanged through preallocated shared-memory arrays, so only short
+    commands are sent through the pipes at every step.
+    """
+
+    metadata = {"render.modes": []}
+
+    def __init__(self, task, num_envs, num_workers=None, workers_per_core=1, start_method=None):
+        """
+
+        Constructor. Starts the worker processes, but SubprocVecJSBSimEnv.reset() must be
+
+        called first before interacting with environment.
+
+        :param task: the Task class the agents are to perform
+
+        :param num_envs: number of simulations stepped together
+
+        :param num_workers: number of worker processes, defaults to workers_per_core per core available to the process
+
+        :param workers_per_core: number of worker processes per core when num_workers is None
+
+        :param start_method: multiprocessing start method, defaults to the platform default
+
+        """
+        if num_envs < 1:
+            raise ValueError("num_envs must be positive")
+        if num_workers is None:
+            # the cores the process may run on, fewer than os.cpu_count() under taskset or in a container
+            num_cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+            num_workers = max(1, int(num_cores * workers_per_core))
+        num_workers = min(num_workers, num_envs)
+
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+
+        # spaces are read from a local task, no simulation is built here
+        spaces = VecJSBSimEnv(task, 1)
+        self.observation_var = spaces.observation_var
+        self.action_var = spaces.action_var
+        self.observation_space = spaces.observation_space
+        self.action_space = spaces.action_space
+
+        ctx = mp.get_context(start_method)
+        shapes = [
+            (num_envs, len(self.action_var)),
+            (num_envs, self.observation_space.shape[0]),
+            (num_envs,),
+            (num_envs,),
+        ]
+        buffers = [ctx.RawArray("d", int(np.prod(shape))) for shape in shapes]
+        self.actions, self.observations, self.rewards, self.dones = [
+            np.frombuffer(buffer, dtype=np.float64).reshape(shape) for buffer, shape in zip(buffers, shapes)
+        ]
+
+        # environments [bounds[k], bounds[k + 1]) are run by worker k
+        self._bounds = bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self.remotes, self.processes = [], []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            remote, work_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker, args=(work_remote, remote, task, start, stop, buffers, shapes), daemon=True
+            )
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.closed = False
+
+    def step(self, actions=None):
+        """
+
+        Run one timestep of every environment's dynamics.
+
+        :param actions: np.array of shape (num_envs, n_actions), or None to take no action
+
+        :return: observations, rewards, dones and infos as in VecJSBSimEnv.step
+
+        """
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.float64)
+            if not actions.shape == self.actions.shape:
+                raise ValueError("mismatch between actions and (num_envs, action space size)")
+            self.actions[:] = actions
+
+        for remote in self.remotes:
+            remote.send(("step", actions is not None))
+        infos = [{} for _ in range(self.num_envs)]
+        for reset_infos in self._recv():
+            if reset_infos:
+                for i, info in reset_infos:
+                    infos[i] = info
+
+        return self.observations.copy(), self.rewards.copy(), self.dones.astype(bool), infos
+
+    def seed(self, seed=None):
+        """
+
+        Seeds the random number generators of every environment, see VecJSBSimEnv.seed.
+
+        :param seed: int, None for a seed taken from the OS entropy, or list of num_envs int seeds used as they are
+
+        :return: seeds, list of the num_envs int seeds of the environments
+
+        """
+        seeds = get_env_seeds(seed, self.num_envs)
+        for remote, start, stop in zip(self.remotes, self._bounds[:-1], self._bounds[1:]):
+            remote.send(("seed", seeds[start:stop]))
+        self._recv()
+        return seeds
+
+    def reset(self):
+        """
+
+        Resets the state of every environment and returns the initial observations.
+
+        :return: np.array of shape (num_envs, n_obs)
+
+        """
+        for remote in self.remotes:
+            remote.send(("reset", None))
+        self._recv()
+        return self.observations.copy()
+
+    def get_sim_time(self):
+        """ Gets the simulation time of every environment, a np.array of shape (num_envs,). """
+        for remote in self.remotes:
+            remote.send(("get_sim_time", None))
+        return np.concatenate(self._recv())
+
+    def _recv(self):
+        """
+        Receives the results of the last command from every worker.
+
+        :return: list of the results of the workers
+
+        :raise RuntimeError: with the traceback of the worker, if the command raised in one of them
+        """
+        # every worker answers, so that the pipes stay in sync when one of them fails
+        replies = [remote.recv() for remote in self.remotes]
+        for status, data in replies:
+            if status == "error":
+                raise RuntimeError(f"command failed in a worker process:\n{data}")
+        return [data for _, data in replies]
+
+    def close(self):
+        """ Stops the worker processes. """
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
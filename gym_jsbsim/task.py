@@ -2,7 +2,10 @@ from types import MethodType
 import numpy as np
 import gym
 from gym.spaces import Box, Discrete
-from gym_jsbsim.catalogs.catalog import Catalog
+from gym_jsbsim.catalogs.catalog import Catalog, DynamicCatalog
+from gym_jsbsim.catalogs.property import VectorProperty
+from gym_jsbsim.catalogs import utils
+from gym_jsbsim.specs import compile_spec
 
 
 class Task:
@@ -18,35 +21,116 @@ class Task:
     state_var = None
     init_conditions = None
     output = state_var
+    substep_var = None
     jsbsim_freq = 60
     agent_interaction_steps = 5
     aircraft_name = "A320"
+    flat_observation = False
+    # JSBSim trim mode of the initial state, None not to trim, see define_trim_mode
+    trim_mode = None
+
+    # declarative reward term and termination predicate, see define_reward_spec and define_terminal_spec
+    reward_spec = None
+    terminal_spec = None
+
+    # bounds arrays of the observation and action values, see get_observation_bounds and get_action_bounds
+    _observation_arrays = None
+    _action_arrays = None
+    # compiled reward_spec and terminal_spec, see get_reward_evaluator and get_terminal_evaluator
+    _reward_compiled = None
+    _terminal_compiled = None
 
     def __init__(self):
 
+        # random number generator of the task, see seed
+        self.np_random = np.random.default_rng()
+
         # set default output to state_var
         if self.output is None:
             self.output = self.state_var
 
-        # modify Catalog to have only the current task properties
-        names_away = []
-        for name, prop in Catalog.items():
-            if not (
-                prop in self.action_var
-                or prop in self.state_var
-                or prop in self.init_conditions
-                or prop in self.output
-            ):
-                names_away.append(name)
-        for name in names_away:
-            Catalog.pop(name)
+        # catalog of the current task properties, the shared Catalog is left untouched
+        self.catalog = DynamicCatalog(
+            {
+                name: prop
+                for name, prop in Catalog.items()
+                if (
+                    prop in self.action_var
+                    or prop in self.state_var
+                    or prop in self.init_conditions
+                    or prop in self.output
+                )
+            }
+        )
+        # vector properties are built on demand, e.g. my_catalog.lookahead, and not in the shared Catalog
+        for prop in list(self.state_var) + list(self.output):
+            if isinstance(prop, VectorProperty):
+                self.catalog[prop.name_jsbsim] = prop
+
+    def seed(self, seed=None):
+        """
+        Seeds the random number generator of the task, np_random.
+
+        Tasks draw all their random values from np_random rather than from the global random state,
+
+        so that the environments of a process neither share nor contend on it.
+
+        :param seed: int, np.random.SeedSequence or None for a seed taken from the OS entropy
+        """
+        self.np_random = np.random.default_rng(seed)
+
+    def draw_jsbsim_seed(self):
+        """ Draws from np_random the seed of the JSBSim random number generator for a new episode, an int. """
+        return int(self.np_random.integers(2 ** 31))
 
     def get_reward(self, state, sim):
-        return 0
+        if self.reward_spec is None:
+            return 0
+        return self._compile_reward_spec().evaluate(sim)
 
     def is_terminal(self, state, sim):
         return False
 
+    def check_terminal_spec(self, sim):
+        """
+        Checks the termination predicate of terminal_spec, in addition to is_terminal.
+
+        :param sim: Simulation
+
+        :return: bool, False without terminal_spec
+        """
+        evaluator = self.get_terminal_evaluator()
+        return evaluator is not None and evaluator.evaluate(sim)
+
+    def _compile_reward_spec(self):
+        if self._reward_compiled is None or self._reward_compiled[0] is not self.reward_spec:
+            self._reward_compiled = (self.reward_spec, compile_spec(self.reward_spec))
+        return self._reward_compiled[1]
+
+    def get_reward_evaluator(self):
+        """
+        Get reward_spec compiled to compute the rewards of a batch of environments, see specs.CompiledSpec.
+
+        :return: CompiledSpec, or None without reward_spec or when get_reward is overridden, e.g. by define_reward,
+
+            the rewards are then computed by get_reward
+        """
+        if self.reward_spec is None or "get_reward" in vars(self) or type(self).get_reward is not Task.get_reward:
+            return None
+        return self._compile_reward_spec()
+
+    def get_terminal_evaluator(self):
+        """
+        Get terminal_spec compiled to check the termination of a batch of environments, see specs.CompiledSpec.
+
+        :return: CompiledSpec, or None without terminal_spec
+        """
+        if self.terminal_spec is None:
+            return None
+        if self._terminal_compiled is None or self._terminal_compiled[0] is not self.terminal_spec:
+            self._terminal_compiled = (self.terminal_spec, compile_spec(self.terminal_spec))
+        return self._terminal_compiled[1]
+
     def get_observation_var(self):
         return self.state_var
 
@@ -56,20 +140,122 @@ class Task:
     def get_initial_conditions(self):
         return self.init_conditions
 
+    def get_catalog(self):
+        return self.catalog
+
     def get_output(self):
         return self.output
 
+    def get_observation_bounds(self):
+        """
+        Get the bounds of the observation values, computed once for the current state_var.
+
+        :return: (low, high, clipped) read-only arrays of utils.get_size(state_var) values, clipped telling
+
+            the values clipped to their bounds in the terminal observations
+        """
+        if self._observation_arrays is None or self._observation_arrays[0] is not self.state_var:
+            low, high = utils.get_bounds(self.state_var)
+            clipped = utils.get_clipped(self.state_var)
+            sizes = [prop.size if isinstance(prop, VectorProperty) else 1 for prop in self.state_var]
+            splits = np.cumsum(sizes)[:-1] if any(size != 1 for size in sizes) else None
+            for array in (low, high, clipped):
+                array.flags.writeable = False
+            self._observation_arrays = (self.state_var, low, high, clipped, splits)
+        return self._observation_arrays[1:4]
+
+    def get_action_bounds(self):
+        """
+        Get the bounds of the action values, computed once for the current action_var.
+
+        :return: (low, high) read-only arrays
+        """
+        if self._action_arrays is None or self._action_arrays[0] is not self.action_var:
+            low, high = utils.get_bounds(self.action_var)
+            low.flags.writeable = high.flags.writeable = False
+            self._action_arrays = (self.action_var, low, high)
+        return self._action_arrays[1:]
+
+    def contains(self, observation):
+        """
+        Checks whether a flat observation is within the observation bounds.
+
+        :param observation: float array of utils.get_size(state_var) values
+
+        :return: bool, False if a value is NaN
+        """
+        low, high, _ = self.get_observation_bounds()
+        return bool((observation >= low).all() and (observation <= high).all())
+
+    def clip_observation(self, observation):
+        """
+        Clips the values of a flat observation whose property is clipped, see Property.clipped.
+
+        :param observation: float array of utils.get_size(state_var) values
+
+        :return: a new float array
+        """
+        low, high, clipped = self.get_observation_bounds()
+        return np.where(clipped, np.minimum(np.maximum(observation, low), high), observation)
+
+    def clip_action(self, action):
+        """
+        Clamps the values of an action to the bounds of the action properties.
+
+        :param action: sequence of len(action_var) values, e.g. the tuple of 1-element arrays of
+
+            the action space
+
+        :return: a new float array of shape (len(action_var),)
+        """
+        low, high = self.get_action_bounds()
+        action = np.asarray(action, dtype=np.float64).reshape(len(low))
+        # np.minimum and np.maximum are faster than np.clip on a few values
+        return np.minimum(np.maximum(action, low), high)
+
+    def clip_actions(self, actions):
+        """
+        Clamps the values of the actions of several environments to the bounds of the action properties.
+
+        :param actions: array of shape (n, len(action_var))
+
+        :return: a new float array of shape (n, len(action_var))
+        """
+        low, high = self.get_action_bounds()
+        return np.minimum(np.maximum(np.asarray(actions, dtype=np.float64), low), high)
+
+    def split_observation(self, observation):
+        """
+        Splits a flat observation in the tuple of arrays of the tuple observation space.
+
+        :param observation: float array of utils.get_size(state_var) values
+
+        :return: tuple of 1-element arrays, and of arrays of the values of the vector properties, copied
+        """
+        self.get_observation_bounds()
+        splits = self._observation_arrays[4]
+        if splits is None:
+            return tuple(observation.reshape(-1, 1).copy())
+        return tuple(np.split(observation.copy(), splits))
+
     def get_observation_space(self):
         """
         Get the task's observation Space object
 
-        :return : spaces.Tuple composed by spaces of each property.
+        :return : spaces.Tuple composed by spaces of each property,
+
+            or a flat Box bounded by the properties limits in flat observation mode.
         """
+        if self.flat_observation:
+            low, high, _ = self.get_observation_bounds()
+            return Box(low=low, high=high, dtype=np.float64)
 
         space_tuple = ()
 
         for prop in self.state_var:
-            if prop.spaces is Box:
+            if isinstance(prop, VectorProperty):
+                space_tuple += (Box(low=np.array(prop.min), high=np.array(prop.max), dtype="float"),)
+            elif prop.spaces is Box:
                 space_tuple += (Box(low=np.array([prop.min]), high=np.array([prop.max]), dtype="float"),)
             elif prop.spaces is Discrete:
                 space_tuple += (Discrete(prop.max - prop.min + 1),)
@@ -108,14 +294,52 @@ class Task:
     def define_output(self, output=None):
         self.output = output
 
+    def define_flat_observation(self, flat=True):
+        self.flat_observation = flat
+
+    def define_substep_var(self, substeps=None):
+        self.substep_var = substeps
+
     def define_jsbsim_freq(self, freq=60):
         self.jsbsim_freq = freq
 
     def define_agent_interaction_steps(self, steps=5):
         self.agent_interaction_steps = steps
 
+    def define_trim_mode(self, mode=1):
+        """
+        Trims the aircraft at every reset, the trimmed states being cached by flight condition, see TrimCache.
+
+        :param mode: JSBSim trim mode, see Simulation.trim, or None not to trim
+        """
+        self.trim_mode = mode
+
     def define_reward(self, func):
         self.get_reward = MethodType(func, self)
 
     def define_is_terminal(self, func):
         self.is_terminal = MethodType(func, self)
+
+    def define_reward_spec(self, spec=None):
+        """
+        Defines the reward as a declarative term of gym_jsbsim.specs, compiled once and evaluated
+
+        with NumPy for a batch of environments, e.g. GeometricMean((Gaussian(c.delta_heading, 5), ...)).
+
+        A function given to define_reward takes precedence over it.
+
+        :param spec: reward term, None to remove it
+        """
+        self.reward_spec = spec
+
+    def define_terminal_spec(self, spec=None):
+        """
+        Defines a termination predicate of gym_jsbsim.specs, e.g. AnyOf((Threshold(c.position_h_sl_ft, 3000,
+
+        above=False), ...)), compiled once and evaluated with NumPy for a batch of environments.
+
+        An episode ends when the predicate or is_terminal is true.
+
+        :param spec: termination predicate, None to remove it
+        """
+        self.terminal_spec = spec
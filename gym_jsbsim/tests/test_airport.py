@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from gym_jsbsim.envs.airport import AirportGraph, get_airport, taxi_route_init_conditions
+from gym_jsbsim.envs.taxi_control_task import TaxiControlTask
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.catalogs.catalog import Catalog as c
+
+
+class TestAirportGraph(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache(self):
+        graph = AirportGraph.load(cache_dir=self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        cached = AirportGraph.load(cache_dir=self.cache_dir)
+        for name, array in graph.to_arrays().items():
+            np.testing.assert_array_equal(array, getattr(cached, name))
+
+    def test_route(self):
+        graph = AirportGraph.load(cache_dir=self.cache_dir)
+        start, goal = graph.node_ids[0], graph.node_ids[500]
+        length, path = graph.shortest_path(start, goal)
+        self.assertEqual(graph.node_ids[path[0][0]], start)
+        self.assertEqual(graph.node_ids[path[-1][0]], goal)
+        self.assertAlmostEqual(length, sum(graph.edge_lengths[edge] for _, edge in path[1:]))
+
+        # the centerline goes from the start node to the goal node
+        route = graph.route(start, goal)
+        np.testing.assert_allclose(route[0], graph.node_points[path[0][0]])
+        np.testing.assert_allclose(route[-1], graph.node_points[path[-1][0]])
+
+        # the edges are traversable in both directions
+        reverse_length, _ = graph.shortest_path(goal, start)
+        self.assertAlmostEqual(length, reverse_length)
+
+
+class TestTaxiRoute(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        environ = mock.patch.dict(os.environ, {"GYM_JSBSIM_CACHE_DIR": self.cache_dir})
+        environ.start()
+        self.addCleanup(environ.stop)
+        get_airport.cache_clear()
+        self.addCleanup(get_airport.cache_clear)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_taxi_route(self):
+        graph = get_airport()
+        env = JSBSimEnv(TaxiControlTask)
+        env.task.define_taxi_route(graph.node_ids[0], graph.node_ids[500])
+        env.reset()
+        env.step(np.array([0, 0, 0.5]))
+        # the aircraft starts on the route centerline
+        self.assertNotEqual(env.sim.get_property_value(c.id_route), 0)
+        self.assertLess(env.sim.get_property_value(c.shortest_dist), 1)
+        env.close()
+
+    def test_single_point_route(self):
+        graph = get_airport()
+        with self.assertRaises(ValueError):
+            taxi_route_init_conditions(graph.node_ids[0], graph.node_ids[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
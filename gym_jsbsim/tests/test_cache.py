@@ -0,0 +1,207 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from gym_jsbsim import cache
+from gym_jsbsim.cache import get_aircraft_manifest, resolve_aircraft_files
+from gym_jsbsim.catalogs import catalog
+from gym_jsbsim.catalogs.catalog import Catalog, get_jsbsim_props
+from gym_jsbsim.envs.heading_control_task import HeadingControlTask
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.simulation import Simulation, SNAPSHOT_IC
+from gym_jsbsim.trim_cache import TrimCache, trim_cache
+
+AIRCRAFT_XML = """<?xml version="1.0"?>
+<fdm_config name="test">
+  <propulsion>
+    <engine file="test_engine">
+      <thruster file="direct"/>
+    </engine>
+  </propulsion>
+  <system file="test_system"/>
+</fdm_config>
+"""
+
+
+class TestAircraftManifest(unittest.TestCase):
+    def setUp(self):
+        self.root_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.files = {
+            "aircraft/test/test.xml": AIRCRAFT_XML,
+            "engine/test_engine.xml": "<turbine_engine/>",
+            "engine/direct.xml": "<direct/>",
+            "aircraft/test/Systems/test_system.xml": "<system/>",
+        }
+        for name, content in self.files.items():
+            self.write(name, content)
+        cache._manifests.clear()
+
+    def tearDown(self):
+        cache._manifests.clear()
+        shutil.rmtree(self.root_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.root_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def test_resolve(self):
+        files = resolve_aircraft_files(self.root_dir, "test")
+        self.assertEqual([os.path.relpath(path, self.root_dir) for path in files], list(self.files))
+
+    def test_cache(self):
+        manifest = get_aircraft_manifest(self.root_dir, "test", self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertIs(get_aircraft_manifest(self.root_dir, "test", self.cache_dir), manifest)
+
+        # read from the disk by a new process
+        cache._manifests.clear()
+        self.assertEqual(get_aircraft_manifest(self.root_dir, "test", self.cache_dir), manifest)
+
+        # a modified file changes the digest
+        cache._manifests.clear()
+        self.write("engine/test_engine.xml", "<turbine_engine></turbine_engine>")
+        modified = get_aircraft_manifest(self.root_dir, "test", self.cache_dir)
+        self.assertNotEqual(modified.digest, manifest.digest)
+        self.assertEqual(modified.files, manifest.files)
+
+
+    def test_read_only_cache(self):
+        # a directory can not be created below a file
+        cache_file = os.path.join(self.cache_dir, "file")
+        open(cache_file, "w").close()
+        environ = {"GYM_JSBSIM_CACHE_DIR": os.path.join(cache_file, "cache")}
+        with mock.patch.dict(os.environ, environ):
+            manifest = get_aircraft_manifest(self.root_dir, "test")
+        self.assertEqual(manifest.files, resolve_aircraft_files(self.root_dir, "test"))
+        self.assertEqual(os.listdir(self.cache_dir), ["file"])
+
+
+class TestJsbsimProps(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.queries = 0
+
+    def tearDown(self):
+        catalog._parsed_props.pop("test", None)
+        catalog._jsbsim_names.pop("test_lazy_prop_1", None)
+        Catalog.pop("test_lazy_prop_1", None)
+        shutil.rmtree(self.cache_dir)
+
+    def query(self):
+        self.queries += 1
+        return "test/lazy-prop[1] (RW)\nfcs/throttle-cmd-norm (RW)"
+
+    def test_cache(self):
+        props = get_jsbsim_props("test", self.query, self.cache_dir)
+        self.assertEqual(props["test_lazy_prop_1"], ("test/lazy-prop[1]", "RW"))
+        self.assertIs(get_jsbsim_props("test", self.query, self.cache_dir), props)
+
+        # read from the disk by a new process
+        catalog._parsed_props.clear()
+        self.assertEqual(get_jsbsim_props("test", self.query, self.cache_dir), props)
+        self.assertEqual(self.queries, 1)
+
+    def test_persist(self):
+        # kept in memory only by default
+        with mock.patch.dict(os.environ, {"GYM_JSBSIM_CACHE_DIR": self.cache_dir}):
+            props = get_jsbsim_props("test", self.query)
+            self.assertEqual(os.listdir(self.cache_dir), [])
+            catalog._parsed_props.clear()
+            with mock.patch.object(catalog, "persist_jsbsim_props", True):
+                self.assertEqual(get_jsbsim_props("test", self.query), props)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # a cache directory which can not be written
+        catalog._parsed_props.clear()
+        cache_file = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        self.assertEqual(get_jsbsim_props("test", self.query, os.path.join(cache_file, "cache")), props)
+        self.assertEqual(self.queries, 3)
+
+    def test_read_only_cache(self):
+        cache_file = os.path.join(self.cache_dir, "file")
+        open(cache_file, "w").close()
+        cache._manifests.clear()
+        with mock.patch.dict(os.environ, {"GYM_JSBSIM_CACHE_DIR": os.path.join(cache_file, "cache")}):
+            with mock.patch.object(catalog, "persist_jsbsim_props", True):
+                env = JSBSimEnv(HeadingControlTask)
+                env.reset()
+                env.close()
+        self.assertEqual(os.listdir(self.cache_dir), ["file"])
+
+    def test_lazy(self):
+        Catalog.add_jsbsim_props(get_jsbsim_props("test", self.query, self.cache_dir))
+        self.assertNotIn("test_lazy_prop_1", Catalog, "The property is created before being used")
+        prop = Catalog.test_lazy_prop_1
+        self.assertEqual((prop.name_jsbsim, prop.access), ("test/lazy-prop[1]", "RW"))
+        self.assertIs(Catalog.test_lazy_prop_1, prop)
+
+
+class TestTrimCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.task = HeadingControlTask()
+        trim_cache.clear()
+
+    def tearDown(self):
+        trim_cache.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def make_sim(self, init_conditions):
+        return Simulation(init_conditions=init_conditions, catalog=self.task.catalog)
+
+    def test_reset(self):
+        env = JSBSimEnv(HeadingControlTask)
+        env.task.define_trim_mode(1)
+        first = np.array(env.reset(seed=0))
+        self.assertEqual((trim_cache.misses, trim_cache.hits), (1, 0))
+        self.assertNotEqual(env.sim.get_property_value(Catalog.fcs_throttle_cmd_norm), 0.8, "Not trimmed")
+        for _ in range(10):
+            env.step(np.array([0.0, 0.0, 0.0, 0.5]))
+
+        # the trimmed state is restored without reset nor trim, within a few ulps of the trimmed one
+        with mock.patch.object(Simulation, "reset", side_effect=AssertionError("reset on a cache hit")):
+            np.testing.assert_allclose(env.reset(seed=0), first, rtol=1e-9, atol=1e-9)
+        self.assertEqual((trim_cache.misses, trim_cache.hits), (1, 1))
+        env.close()
+
+    def test_eviction(self):
+        cache = TrimCache(max_size=1)
+        higher = {**self.task.init_conditions, Catalog.ic_h_sl_ft: 12000}
+        for init_conditions in (self.task.init_conditions, higher, self.task.init_conditions):
+            cache.trim(self.make_sim(init_conditions), init_conditions)
+        self.assertEqual((len(cache), cache.misses, cache.hits), (1, 3, 0))
+
+        # conditions within the quantum of the cached one share its trimmed state
+        cache = TrimCache(quanta={Catalog.ic_h_sl_ft: 100})
+        cache.trim(self.make_sim(higher), higher)
+        nearby = {**higher, Catalog.ic_h_sl_ft: 12020}
+        cache.trim(self.make_sim(nearby), nearby)
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+
+    def test_persist(self):
+        init_conditions = self.task.init_conditions
+        cache = TrimCache(persist=True, cache_dir=self.cache_dir)
+        trimmed = self.make_sim(init_conditions)
+        cache.trim(trimmed, init_conditions)
+
+        # read from the disk by a new process
+        cache = TrimCache(persist=True, cache_dir=self.cache_dir)
+        restored = self.make_sim(init_conditions)
+        cache.trim(restored, init_conditions)
+        self.assertEqual((cache.misses, cache.hits), (0, 1))
+        # the kinematic state, but the wind, and the trimmed controls
+        nb_ic = len(SNAPSHOT_IC) - 2
+        restored, trimmed = restored.get_snapshot(), trimmed.get_snapshot()
+        np.testing.assert_allclose(restored.values[:nb_ic], trimmed.values[:nb_ic], rtol=1e-9, atol=1e-9)
+        controls = [i for i, prop in enumerate(trimmed.props) if prop.name_jsbsim.endswith("cmd-norm")]
+        np.testing.assert_array_equal(restored.values[controls], trimmed.values[controls])
+
+
+if __name__ == "__main__":
+    unittest.main()
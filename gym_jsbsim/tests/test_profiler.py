@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim.profiler import StepProfiler
+
+
+class TestStepProfiler(unittest.TestCase):
+    def test_nested_sections(self):
+        profiler = StepProfiler()
+        for _ in range(3):
+            profiler.push("step")
+            profiler.push("reward")
+            profiler.pop()
+            profiler.pop()
+        profiler.record("step", 2e-3)
+
+        report = profiler.report()
+        self.assertEqual(report["step"]["count"], 4)
+        self.assertEqual(report["reward"]["count"], 3)
+        self.assertEqual(report["step"]["max"], 2e-3)
+        self.assertLessEqual(report["step"]["p50"], report["step"]["p99"])
+        self.assertEqual(report["step"]["histogram"].sum(), 4)
+        self.assertEqual(len(profiler.bin_edges), len(report["step"]["histogram"]) + 1)
+
+        # the flame graph stacks hold the time spent outside of the nested sections
+        stacks = [line.rsplit(" ", 1)[0] for line in profiler.collapsed().splitlines()]
+        self.assertEqual(stacks, ["step", "step;reward"])
+
+    def test_unwind(self):
+        profiler = StepProfiler()
+        profiler.push("step")
+        profiler.push("reward")
+        profiler.unwind(0)
+        self.assertEqual(profiler.depth, 0)
+
+
+class TestProfiledEnv(unittest.TestCase):
+    def test_profile_report(self):
+        env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0").unwrapped
+        env.reset()
+        with self.assertRaises(RuntimeError):
+            env.profile_report()
+
+        action = np.array([0.1, -0.1, 0.2, 0.5])
+        state, reward, _, _ = env.step(action)
+        env.enable_profiling()
+        for _ in range(10):
+            env.step(action)
+        report = env.profile_report()
+        for phase in ("step", "action", "integration", "observation", "reward", "contains", "is_terminal"):
+            self.assertEqual(report[phase]["count"], 10, f"Wrong count of {phase}")
+        # the property update functions are timed in the phases calling them
+        self.assertEqual(report["update_delta_heading"]["count"], 10)
+        self.assertIn("step;observation;update_delta_heading", env.profiler.collapsed())
+
+        # the profiled steps give the same results
+        env.enable_profiling(False)
+        env.reset()
+        self.assertAlmostEqual(env.step(action)[1], reward)
+        env.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
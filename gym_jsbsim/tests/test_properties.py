@@ -1,8 +1,15 @@
 import unittest
 import random
+from unittest import mock
+import numpy as np
 import gym_jsbsim
 from gym_jsbsim import Catalog as c
+from shapely.geometry import Point
+from gym_jsbsim.catalogs.my_catalog import lookahead, get_taxi_path
 from gym_jsbsim.catalogs.utils import reduce_reflex_angle_deg
+from gym_jsbsim.envs.taxi_control_task import TaxiControlTask
+from gym_jsbsim.envs.taxi_utils import get_bearing
+from gym_jsbsim.jsbsim_env import JSBSimEnv
 
 
 class TestPropertyUpdates(unittest.TestCase):
@@ -65,3 +72,83 @@ class TestPropertyUpdates(unittest.TestCase):
         self.assertEqual(
             new_brake_cmd, self.env.sim.get_property_value(c.fcs_right_brake_cmd_norm), "Right brake was not updated"
         )
+
+    def test_derived_properties_once_per_step(self):
+        self.env.step([0, 0, 0, 0.5])
+        for _ in range(3):
+            self.env.sim.get_property_value(c.delta_heading)
+            self.env.unwrapped.task.get_reward(None, self.env.sim)
+        self.assertEqual(self.env.sim.update_counts["update_delta_heading"], 1, "Delta heading computed twice")
+        # writing an input computes the derived property again
+        self.env.sim.set_property_value(c.target_heading_deg, 200)
+        self.env.sim.get_property_value(c.delta_heading)
+        self.assertEqual(self.env.sim.update_counts["update_delta_heading"], 2, "Delta heading not updated")
+        self.env.step([0, 0, 0, 0.5])
+        self.assertEqual(self.env.sim.update_counts["update_delta_heading"], 1, "Delta heading not updated")
+
+
+class TestLookahead(unittest.TestCase):
+    def make_env(self, state_var, flat_observation=True):
+        task = type("LookaheadTask", (TaxiControlTask,), {"state_var": state_var})
+        env = JSBSimEnv(task, flat_observation=flat_observation)
+        env.seed(0)
+        return env
+
+    def test_same_as_scalars(self):
+        scalar_env = self.make_env(TaxiControlTask.state_var)
+        vector_env = self.make_env([c.velocities_vc_fps, c.shortest_dist, lookahead(4)])
+        states = [scalar_env.reset(), vector_env.reset()]
+        np.testing.assert_array_equal(states[0], states[1])
+        for _ in range(50):
+            states = [env.step([0.1, 0, 0.3])[0] for env in (scalar_env, vector_env)]
+            np.testing.assert_array_equal(states[0], states[1])
+        self.assertEqual(vector_env.sim.update_counts["update_lookahead"], 1)
+        self.assertNotIn("update_da", vector_env.sim.update_counts)
+
+    def test_long_horizon(self):
+        env = self.make_env([c.shortest_dist, lookahead(32)])
+        self.assertEqual(env.observation_space.shape, (65,))
+        state = env.reset()
+        self.assertEqual(state.shape, (65,))
+        self.assertTrue(env.observation_space.contains(state))
+        self.assertTrue(np.all(state[1:33] > 0), "Missing distances")
+
+        # one array per vector property in tuple observations
+        env = self.make_env([c.shortest_dist, lookahead(32)], flat_observation=False)
+        state = env.reset()
+        self.assertEqual(state[1].shape, (64,))
+        self.assertTrue(env.observation_space.contains(state))
+
+    def test_shared_centerline(self):
+        # two aircraft on the default loop, at its 2nd and 60th points
+        points = get_taxi_path(0).centerlinepoints
+        envs = []
+        for i in (2, 60):
+            env = self.make_env(TaxiControlTask.state_var)
+            env.task.define_init_conditions(
+                {
+                    **env.task.init_conditions,
+                    c.ic_long_gc_deg: points[i][0],
+                    c.ic_lat_geod_deg: points[i][1],
+                    c.ic_psi_true_deg: get_bearing(points[i], points[i + 1]),
+                    c.id_path: i + 1,
+                }
+            )
+            envs.append(env)
+        tracker = get_taxi_path(0).tracker
+        for env in envs:
+            env.reset()
+        with mock.patch.object(tracker, "_nearest_segment", wraps=tracker._nearest_segment) as relocalize:
+            for _ in range(50):
+                for env in envs:
+                    env.step([0.1, 0, 0.3])
+            # each simulation keeps its own cursor on the shared tracker
+            self.assertEqual(relocalize.call_count, 0, "Cursor shared by the simulations")
+        cursors = [env.sim.get_property_value(c.centerline_cursor) for env in envs]
+        self.assertLess(cursors[0], 10)
+        self.assertGreaterEqual(cursors[1], 55)
+        for env in envs:
+            loc = env.sim.get_property_values([c.position_long_gc_deg, c.position_lat_geod_deg])
+            expected = get_taxi_path(0).centerline.distance(Point(loc)) * 100000
+            self.assertAlmostEqual(env.sim.get_property_value(c.shortest_dist), expected, places=6)
+            env.close()
@@ -0,0 +1,58 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim import FlightRecorder, FlightDataset
+
+
+class TestFlightRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, nb_episodes, nb_steps, chunk_size=7):
+        env = FlightRecorder(gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0"), self.directory, chunk_size)
+        states, rewards = [], []
+        for _ in range(nb_episodes):
+            states.append(env.reset())
+            for _ in range(nb_steps):
+                state, reward, done, _ = env.step(np.array([0.1, -0.1, 0.2, 0.5]))
+                states.append(state)
+                rewards.append(reward)
+        env.close()
+        return np.array(states).reshape(len(states), -1), np.array(rewards)
+
+    def test_record(self):
+        states, rewards = self.record(nb_episodes=3, nb_steps=4)
+        dataset = FlightDataset(self.directory)
+        self.assertEqual(len(dataset), 15)
+        self.assertEqual(len(dataset.chunks), 3)
+        self.assertIsInstance(dataset.chunks[0]["output"], np.memmap)
+
+        # the outputs of the heading task are its state variables
+        np.testing.assert_allclose(dataset.column("output"), states)
+        reward = dataset.column("reward")
+        np.testing.assert_array_equal(reward[dataset.column("step") > 0], rewards)
+        self.assertTrue(np.all(np.isnan(reward[dataset.column("step") == 0])))
+
+        episodes = list(dataset.episodes())
+        self.assertEqual(len(episodes), 3)
+        for i, episode in enumerate(episodes):
+            np.testing.assert_array_equal(episode["episode"], i)
+            np.testing.assert_array_equal(episode["step"], np.arange(5))
+            self.assertTrue(np.all(np.diff(episode["sim_time"]) > 0))
+            np.testing.assert_allclose(episode["action"][1:], [[0.1, -0.1, 0.2, 0.5]] * 4)
+
+    def test_append(self):
+        self.record(nb_episodes=1, nb_steps=3)
+        self.record(nb_episodes=2, nb_steps=3)
+        dataset = FlightDataset(self.directory)
+        self.assertEqual(len(dataset), 12)
+        self.assertEqual([episode["episode"][0] for episode in dataset.episodes()], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
 import math
+import numpy as np
 import gym_jsbsim
 from gym_jsbsim import Catalog as c
+from gym_jsbsim.simulation import SNAPSHOT_IC
+from gym_jsbsim.simulation_pool import simulation_pool
 
 
 class TestSimulation(unittest.TestCase):
@@ -163,3 +166,222 @@ class TestSimulation(unittest.TestCase):
             else:
                 error = math.fabs(p2 - p1) / max(math.fabs(p1), math.fabs(p2))
             self.assertLess(error, self.error_max, "The two simulations have diverged")
+
+    def test_snapshot_constant_action(self):
+        constant_action = [1, 1, 1, 1]
+
+        self.env.reset()
+        for _ in range(60):
+            self.env.step(constant_action)
+        snapshot = self.env.get_snapshot()
+        for _ in range(60):
+            self.env.step(constant_action)
+        end_state_1 = self.env.get_state()
+
+        # second flight from the snapshot
+        self.env.reset_to_snapshot(snapshot)
+        self.assertEqual(self.env.get_sim_time(), snapshot.sim_time, "Simulation time not restored")
+        for _ in range(60):
+            self.env.step(constant_action)
+        end_state_2 = self.env.get_state()
+
+        for prop in self.state_properties:
+            p1 = end_state_1[prop]
+            p2 = end_state_2[prop]
+            error = 0 if p1 == p2 else math.fabs(p2 - p1) / max(math.fabs(p1), math.fabs(p2))
+            self.assertLess(error, self.error_max, "The two simulations have diverged")
+
+    def test_snapshot_determinism(self):
+        rng = np.random.RandomState(0)
+        actions = rng.uniform(-1, 1, size=(80, 4))
+
+        self.env.reset()
+        for action in actions[:20]:
+            self.env.step(action)
+        snapshot = self.env.get_snapshot()
+
+        # branches restored from the same snapshot are identical, whatever happened before the restore
+        branches = []
+        for _ in range(3):
+            states = [self.env.reset_to_snapshot(snapshot)]
+            for action in actions[20:]:
+                state, _, _, _ = self.env.step(action)
+                states.append(state)
+            branches.append(np.array(states))
+        np.testing.assert_array_equal(branches[0], branches[1])
+        np.testing.assert_array_equal(branches[0], branches[2])
+
+    def test_snapshot_kinematic_state(self):
+        self.env.reset()
+        for _ in range(60):
+            self.env.step([0.3, -0.2, 0.1, 0.8])
+        snapshot = self.env.get_snapshot()
+        self.env.reset_to_snapshot(snapshot)
+
+        # the kinematic state is restored through the initial conditions, within a few ulps
+        nb_ic = len(SNAPSHOT_IC)
+        kinematic = [c[state] for _, state, _ in SNAPSHOT_IC if not state.startswith("atmosphere")]
+        values = dict(zip(snapshot.props[:nb_ic], snapshot.values[:nb_ic]))
+        np.testing.assert_allclose(
+            self.env.unwrapped.sim.get_property_values(kinematic), [values[prop] for prop in kinematic], rtol=1e-12
+        )
+
+    def test_clone(self):
+        constant_action = [0.1, -0.1, 0.2, 0.5]
+        env = self.env.unwrapped
+
+        env.reset()
+        for _ in range(20):
+            env.step(constant_action)
+        clone_1, clone_2 = env.clone(), env.clone()
+        self.assertIsNot(clone_1.sim.jsbsim_exec, env.sim.jsbsim_exec, "The clone shares the simulation")
+
+        # the clones are independent and follow the original environment
+        for _ in range(20):
+            state, _, _, _ = env.step(constant_action)
+            state_1, _, _, _ = clone_1.step(constant_action)
+        for _ in range(20):
+            state_2, _, _, _ = clone_2.step(constant_action)
+        self.assertEqual(clone_1.get_sim_time(), env.get_sim_time(), "The clone time differs")
+        np.testing.assert_array_equal(state_1, state_2)
+        np.testing.assert_allclose(state_1, state, rtol=self.error_max, atol=1e-4)
+
+        # closed clones give back their simulation to the pool
+        jsbsim_exec = clone_1.sim.jsbsim_exec
+        clone_1.close()
+        clone_2.close()
+        clones = [env.clone(), env.clone()]
+        self.assertIn(jsbsim_exec, [clone.sim.jsbsim_exec for clone in clones], "No simulation reused")
+        for clone in clones:
+            clone.close()
+
+    def test_seed(self):
+        constant_action = [0.1, -0.1, 0.2, 0.5]
+        self.assertEqual(self.env.unwrapped.seed(7), [7])
+
+        def run_episodes(seed):
+            # JSBSim keeps some turbulence state across warm resets: episodes are reproduced
+            # by environments seeded alike and running the same sequence of episodes
+            env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0").unwrapped
+            env.seed(seed)
+            states = []
+            for _ in range(2):
+                env.reset()
+                # the turbulence is drawn from the JSBSim random number generator
+                env.sim.jsbsim_exec.set_property_value("atmosphere/turb-type", 3)
+                env.sim.jsbsim_exec.set_property_value("atmosphere/turbulence/milspec/severity", 4)
+                env.sim.jsbsim_exec.set_property_value("atmosphere/turbulence/milspec/windspeed_at_20ft_AGL-fps", 30)
+                for _ in range(20):
+                    state, _, _, _ = env.step(constant_action)
+                states.append(np.array(state).ravel())
+            draw = env.task.np_random.random()
+            env.close()
+            return np.array(states), draw
+
+        states_1, draw_1 = run_episodes(7)
+        states_2, draw_2 = run_episodes(7)
+        states_3, draw_3 = run_episodes(8)
+        np.testing.assert_array_equal(states_1, states_2)
+        self.assertEqual(draw_1, draw_2)
+        self.assertFalse(np.array_equal(states_1, states_3), "The seed has no effect on the turbulence")
+        self.assertNotEqual(draw_1, draw_3)
+
+    def test_prewarm(self):
+        constant_action = [0.1, -0.1, 0.2, 0.5]
+
+        def run_episode(env):
+            env.seed(3)
+            env.reset()
+            for _ in range(20):
+                state, _, _, _ = env.step(constant_action)
+            return state
+
+        env = self.env.unwrapped
+        state = run_episode(env)
+
+        # a prewarmed template behaves as a new simulation
+        task = env.task
+        simulation_pool.clear()
+        simulation_pool.prewarm(1, task.aircraft_name, task.jsbsim_freq)
+        self.assertEqual(simulation_pool.size(task.aircraft_name, task.jsbsim_freq), 1)
+        prewarmed = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0").unwrapped
+        prewarmed_state = run_episode(prewarmed)
+        self.assertEqual(simulation_pool.size(task.aircraft_name, task.jsbsim_freq), 0, "The template is not used")
+        np.testing.assert_array_equal(prewarmed_state, state)
+        prewarmed.close()
+
+    def test_substeps(self):
+        env = self.env.unwrapped
+        env.task.define_substep_var([c.position_h_sl_ft, c.simulation_sim_time_sec])
+        env.reset()
+        env.step([0.1, -0.1, 0.2, 0.5])
+        self.assertEqual(env.sim.substep_values.shape, (env.task.agent_interaction_steps, 2))
+
+        # one row per integration step, the last one being the current state
+        times = env.sim.get_substep_values(c.simulation_sim_time_sec)
+        np.testing.assert_allclose(np.diff(times), 1 / env.task.jsbsim_freq)
+        self.assertEqual(times[-1], env.get_sim_time())
+        altitudes = env.sim.get_substep_values(c.position_h_sl_ft)
+        self.assertEqual(altitudes[-1], env.sim.get_property_value(c.position_h_sl_ft))
+
+        # derived properties are not computed between the agent steps
+        with self.assertRaises(ValueError):
+            env.sim.record_substeps([c.delta_heading])
+
+    def test_warm_reset(self):
+        constant_action = [1, 1, 1, 1]
+
+        self.env.reset()
+        jsbsim_exec = self.env.sim.jsbsim_exec
+        for _ in range(100):
+            self.env.step(constant_action)
+        end_state_1 = self.env.get_state()
+
+        # the second episode reuses the loaded aircraft model
+        self.env.reset()
+        self.assertIs(jsbsim_exec, self.env.sim.jsbsim_exec, "The aircraft model was reloaded")
+        for _ in range(100):
+            self.env.step(constant_action)
+        end_state_2 = self.env.get_state()
+
+        for prop in self.state_properties:
+            self.assertAlmostEqual(end_state_1[prop], end_state_2[prop], msg="Warm reset diverged from first episode")
+
+    def test_heterogeneous_tasks(self):
+        taxi_env = gym_jsbsim.make("GymJsbsim-TaxiControlTask-v0")
+        self.env.reset()
+        taxi_env.reset()
+        # each simulation state holds the properties of its own task
+        state = self.env.get_state()
+        taxi_state = taxi_env.get_state()
+        self.assertIn(c.delta_heading, state, "Task property missing in simulation state")
+        self.assertIn(c.shortest_dist, taxi_state, "Task property missing in simulation state")
+        self.assertNotIn(c.delta_heading, taxi_state, "Property of another task in simulation state")
+        self.env.set_state(state)
+        taxi_env.close()
+
+    def test_flat_observation(self):
+        flat_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0", flat_observation=True)
+        state = self.env.reset()
+        flat_state = flat_env.reset()
+        self.assertEqual(flat_env.observation_space.shape, (len(state),), "Wrong flat observation space")
+        self.assertEqual(flat_state.dtype, "float64", "Wrong flat observation type")
+        action = [0.1, -0.1, 0.2, 0.5]
+        for _ in range(10):
+            state, _, _, _ = self.env.step(action)
+            flat_state, _, _, _ = flat_env.step(action)
+            self.assertTrue(flat_env.observation_space.contains(flat_state), "Observation not in observation space")
+            for value, flat_value in zip(state, flat_state):
+                self.assertEqual(value[0], flat_value, "Flat observation differs from tuple observation")
+        flat_env.close()
+
+    def test_sampled_action(self):
+        self.env.reset()
+        self.env.action_space.seed(0)
+        for _ in range(10):
+            # a tuple of 1-element arrays
+            action = self.env.action_space.sample()
+            state, _, _, _ = self.env.step(action)
+            for value, prop in zip(action, self.env.task.action_var):
+                expected = min(max(value[0], prop.min), prop.max)
+                self.assertAlmostEqual(self.env.sim.get_property_value(prop), expected)
@@ -1,5 +1,13 @@
+import math
+import subprocess
+import sys
 import unittest
+import numpy as np
 import gym_jsbsim
+from gym_jsbsim import Catalog as c
+from gym_jsbsim.catalogs.my_catalog import lookahead
+from gym_jsbsim.jsbsim_env import JSBSimEnv
+from gym_jsbsim.specs import Gaussian, Laplacian, GeometricMean, WeightedSum, Threshold, AnyOf, AllOf, compile_spec
 
 
 class TestValidTasks(unittest.TestCase):
@@ -27,3 +35,133 @@ class TestValidTasks(unittest.TestCase):
                 for prop, value in task.init_conditions.items():
                     self.assertGreaterEqual(value, prop.min, f"Initial value of {prop} out of bounds in {name}")
                     self.assertLessEqual(value, prop.max, f"Initial value of {prop} out of bounds in {name}")
+
+    def test_bounds_arrays(self):
+        rng = np.random.default_rng(0)
+        for name, task_class in gym_jsbsim.TASKS.items():
+            task = task_class()
+            space = task.get_observation_space()
+            low, high, _ = task.get_observation_bounds()
+            for _ in range(20):
+                # values inside and outside of the bounds
+                observation = rng.uniform(low - (high - low) / 10, high + (high - low) / 10)
+                self.assertEqual(
+                    task.contains(observation),
+                    space.contains(task.split_observation(observation)),
+                    f"Containment differs from the observation space in {name}",
+                )
+                expected = [
+                    np.clip(observation[i], prop.min, prop.max) if prop.clipped else observation[i]
+                    for i, prop in enumerate(task.state_var)
+                ]
+                np.testing.assert_array_equal(task.clip_observation(observation), expected)
+
+                action = rng.uniform(-2, 2, len(task.action_var))
+                expected = [min(max(value, prop.min), prop.max) for value, prop in zip(action, task.action_var)]
+                np.testing.assert_array_equal(task.clip_action(action), expected)
+            self.assertFalse(task.contains(np.full(len(low), np.nan)), "NaN observation contained")
+
+    def test_independent_catalogs(self):
+        heading_task = gym_jsbsim.TASKS["HeadingControlTask"]()
+        taxi_task = gym_jsbsim.TASKS["TaxiControlTask"]()
+        for name, task in [("HeadingControlTask", heading_task), ("TaxiControlTask", taxi_task)]:
+            for prop in task.state_var + task.action_var:
+                self.assertIn(prop, task.catalog.values(), f"Property {prop} missing in {name} catalog")
+        # building a task does not prune the properties of the other tasks
+        for prop in heading_task.state_var:
+            self.assertIn(prop, gym_jsbsim.Catalog.values(), f"Property {prop} removed from Catalog")
+        self.assertNotIn(c.d1, heading_task.catalog.values(), "Taxi property in heading task catalog")
+        self.assertNotIn(c.delta_heading, taxi_task.catalog.values(), "Heading property in taxi task catalog")
+
+
+class TestSpecs(unittest.TestCase):
+    def test_heading_reward(self):
+        env = JSBSimEnv("HeadingControlTask")
+        env.seed(0)
+        env.reset()
+        for _ in range(20):
+            _, reward, _, _ = env.step(np.array([0.1, -0.2, 0.0, 0.8]))
+            value = env.sim.get_property_value
+            # the hand-written reward the spec replaced
+            expected = (
+                math.exp(-((value(c.delta_heading) / 5.0) ** 2))
+                * math.exp(-((value(c.delta_altitude) / 50.0) ** 2))
+                * math.exp(
+                    -(
+                        (value(c.accelerations_n_pilot_x_norm) / 0.1) ** 2
+                        + (value(c.accelerations_n_pilot_y_norm) / 0.1) ** 2
+                        + ((value(c.accelerations_n_pilot_z_norm) + 1) / 0.5) ** 2
+                    )
+                )
+                ** (1 / 3)
+                * math.exp(-((value(c.attitude_roll_rad) / 0.35) ** 2))
+                * math.exp(-(((value(c.velocities_u_fps) - 800) / 16) ** 2))
+            ) ** (1 / 5)
+            self.assertAlmostEqual(reward, expected, places=12)
+        env.close()
+
+    def test_batch(self):
+        spec = compile_spec(
+            WeightedSum((Gaussian(c.delta_heading, 5), GeometricMean((Gaussian(c.delta_altitude, 50),))), (0.3, 0.7))
+        )
+        self.assertEqual(spec.props, (c.delta_heading, c.delta_altitude))
+        values = np.random.default_rng(0).normal(0, 20, (8, 2))
+        expected = 0.3 * np.exp(-((values[:, 0] / 5) ** 2)) + 0.7 * np.exp(-((values[:, 1] / 50) ** 2))
+        np.testing.assert_allclose(spec(values), expected)
+        # the evaluation of a single environment, and of small batches
+        np.testing.assert_allclose([spec._evaluate_scalar(list(row)) for row in values], expected)
+        np.testing.assert_allclose(spec(values[:2]), expected[:2])
+
+        predicate = compile_spec(
+            AnyOf(
+                (
+                    AllOf((Threshold(c.delta_heading, 10), Threshold(c.delta_altitude, 5, inclusive=True))),
+                    Threshold(c.delta_altitude, 20, above=False, offset=-40, absolute=True),
+                )
+            )
+        )
+        values = {
+            c.delta_heading: [11, 11, 10, 0, 0, 0, np.nan],
+            c.delta_altitude: [5, 4, 5, 30, 59, 61, np.nan],
+        }
+        values = np.array([values[prop] for prop in predicate.props]).T
+        expected = [True, False, False, True, True, False, False]
+        np.testing.assert_array_equal(predicate(values), expected)
+        self.assertEqual([predicate._evaluate_scalar(list(row)) for row in values], expected)
+        np.testing.assert_array_equal(predicate(values[:2]), expected[:2])
+
+        with self.assertRaises(ValueError):
+            compile_spec(Gaussian(lookahead(2), 1.0))
+        for spec in [AnyOf(()), AllOf((Threshold(c.delta_heading, 10), AnyOf(()))), GeometricMean(())]:
+            with self.assertRaises(ValueError):
+                compile_spec(spec)
+        # the scale of the terms is required
+        with self.assertRaises(TypeError):
+            Laplacian(c.delta_heading)
+
+    def test_define_reward_fallback(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]()
+        self.assertIsNotNone(task.get_reward_evaluator())
+        self.assertIsNotNone(task.get_terminal_evaluator())
+
+        # a function given to define_reward takes precedence over the reward spec
+        task.define_reward(lambda self, state, sim: 42)
+        self.assertIsNone(task.get_reward_evaluator())
+        self.assertEqual(task.get_reward(None, None), 42)
+
+
+class TestLazyTasks(unittest.TestCase):
+    def test_lazy_import(self):
+        # importing gym_jsbsim registers the tasks without importing them
+        code = (
+            "import sys, gym_jsbsim; "
+            "print(sorted(m for m in sys.modules if m.startswith(('jsbsim', 'shapely', 'gym_jsbsim.catalogs'))))"
+        )
+        loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(loaded.splitlines()[-1], "[]")
+
+    def test_make_by_name(self):
+        self.assertIn("HeadingControlTask", gym_jsbsim.TASKS)
+        env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        self.assertIs(type(env.unwrapped.task), gym_jsbsim.TASKS["HeadingControlTask"])
+        env.close()
@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from shapely.geometry import Point
+from geographiclib.geodesic import Geodesic
+from gym_jsbsim.envs.taxi_utils import taxi_path, CenterlineTracker, geodesic_inverse, geodesic_bearings
+
+
+class TestCenterlineTracker(unittest.TestCase):
+    def setUp(self):
+        self.path = taxi_path()
+        # a noisy trajectory along the centerline
+        rng = np.random.RandomState(0)
+        points = np.array(self.path.centerlinepoints)
+        t = np.linspace(0, len(points) - 1, 2000)
+        self.trajectory = np.stack(
+            [np.interp(t, np.arange(len(points)), points[:, k]) for k in range(2)], axis=1
+        ) + rng.normal(scale=2e-5, size=(len(t), 2))
+
+    def test_same_distance_as_shapely(self):
+        tracker = CenterlineTracker(self.path.centerlinepoints)
+        cursor = 0
+        for loc in self.trajectory:
+            expected = self.path.centerline.distance(Point(loc)) * 100000
+            dist, cursor = tracker.distance(loc, cursor)
+            self.assertAlmostEqual(dist, expected, places=6)
+
+    def test_relocalization(self):
+        tracker = CenterlineTracker(self.path.centerlinepoints)
+        cursor = 0
+        # jump from the end of the trajectory back to its middle and start
+        for loc in [self.trajectory[-1], self.trajectory[1000], self.trajectory[0], (1.36, 43.62)]:
+            expected = self.path.centerline.distance(Point(loc)) * 100000
+            dist, cursor = tracker.distance(loc, cursor)
+            self.assertAlmostEqual(dist, expected, places=6)
+
+
+class TestGeodesicInverse(unittest.TestCase):
+    def test_accuracy(self):
+        rng = np.random.RandomState(0)
+        for lat in [0, 43.6, -70]:
+            p = (1.37, lat)
+            bearings = rng.uniform(0, 360, 200)
+            distances = rng.uniform(1, 10000, 200)
+            points = []
+            for bearing, distance in zip(bearings, distances):
+                g = Geodesic.WGS84.Direct(p[1], p[0], bearing, distance)
+                points.append((g["lon2"], g["lat2"]))
+
+            dist, brng = geodesic_inverse(p, np.array(points))
+            np.testing.assert_allclose(dist, distances, atol=1e-2, rtol=0)
+            np.testing.assert_allclose((brng - bearings + 180) % 360 - 180, 0, atol=1e-4)
+            np.testing.assert_array_equal(geodesic_bearings(p, np.array(points)), brng)
+
+    def test_lookahead_points(self):
+        path = taxi_path()
+        output, _ = path.update_path2((1.3700, 43.6250), 323, 3, 32)
+        self.assertEqual([p for p, _, _ in output], path.centerlinepoints[3:35])
+        for p, distance, bearing in output:
+            g = Geodesic.WGS84.Inverse(43.6250, 1.3700, p[1], p[0])
+            self.assertAlmostEqual(distance, Point(1.3700, 43.6250).distance(Point(p)) * 100000, places=6)
+            self.assertAlmostEqual((bearing - g["azi1"] + 180) % 360 - 180, 0, places=5)
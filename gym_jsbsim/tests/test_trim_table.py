@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from gym_jsbsim import Catalog as c
+from gym_jsbsim.simulation import Simulation
+from gym_jsbsim.trim_table import DEFAULT_INIT_CONDITIONS, TrimTable, generate_trim_table
+
+GRID = ([8000, 12000], [700, 800], [140000])
+
+
+class TestTrimTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.path = tempfile.mkdtemp()
+        cls.table = generate_trim_table(cls.path, *GRID, num_workers=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.path)
+
+    def test_table(self):
+        table = TrimTable(self.path)
+        self.assertIsInstance(table.values, np.memmap)
+        self.assertEqual(table.values.shape, (2, 2, 1, len(table.outputs)))
+        self.assertTrue(table.success.all(), "Trim failed")
+        np.testing.assert_allclose(table.values[..., table.outputs.index("inertia/weight-lbs")], 140000)
+
+    def test_parallel(self):
+        path = tempfile.mkdtemp()
+        try:
+            table = generate_trim_table(path, *GRID, num_workers=2)
+            # the simulations of the workers trim the grid points in another order, up to rounding errors
+            np.testing.assert_allclose(table.values, self.table.values, rtol=1e-9, atol=1e-12)
+        finally:
+            shutil.rmtree(path)
+
+    def test_interpolate(self):
+        table, values = self.table, self.table.values
+        np.testing.assert_array_equal(list(table.interpolate(8000, 800, 140000).values()), values[0, 1, 0])
+        np.testing.assert_allclose(
+            list(table.interpolate(10000, 750, 140000).values()), values[:, :, 0].mean(axis=(0, 1))
+        )
+        # clamped to the grid
+        np.testing.assert_array_equal(list(table.interpolate(2000, 900, 150000).values()), values[0, 1, 0])
+
+    def test_init_conditions(self):
+        init_conditions = {**DEFAULT_INIT_CONDITIONS, **self.table.get_init_conditions(12000, 700, 140000)}
+        sim = Simulation(init_conditions=init_conditions)
+        for _ in range(120):
+            sim.run()
+        self.assertLess(abs(sim.get_property_value(c.position_h_sl_ft) - 12000), 20, "Not in steady flight")
+        sim.close()
+
+    def test_weight_range(self):
+        empty_weight = self.table.metadata["empty_weight_lbs"]
+        full_weight = empty_weight + sum(self.table.metadata["tank_capacities_lbs"])
+        for weight_lbs in (empty_weight - 1, full_weight + 1):
+            with self.assertRaises(ValueError):
+                generate_trim_table(self.path, [8000], [700], [weight_lbs], num_workers=1)
+            with self.assertRaises(ValueError):
+                self.table.get_init_conditions(8000, 700, weight_lbs)
+
+
+if __name__ == "__main__":
+    unittest.main()
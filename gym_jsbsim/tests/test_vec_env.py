@@ -0,0 +1,128 @@
+import unittest
+import numpy as np
+import gym_jsbsim
+from gym_jsbsim import VecJSBSimEnv, SubprocVecJSBSimEnv
+from gym_jsbsim import Catalog as c
+from gym_jsbsim.specs import SCALAR_BATCH_SIZE
+
+
+class FailingRewardTask(gym_jsbsim.TASKS["HeadingControlTask"]):
+    def get_reward(self, state, sim):
+        raise ZeroDivisionError("reward failed")
+
+
+class TestVecJSBSimEnv(unittest.TestCase):
+
+    num_envs = 3
+
+    def test_all_tasks(self):
+        for name, task in gym_jsbsim.TASKS.items():
+            env = VecJSBSimEnv(task, self.num_envs)
+            obs = env.reset()
+            self.assertEqual(obs.shape, (self.num_envs, len(task.state_var)), f"Wrong observation shape in {name}")
+            actions = np.stack([env.action_space.sample() for _ in range(self.num_envs)])
+            obs, rewards, dones, infos = env.step(actions)
+            self.assertEqual(obs.shape, (self.num_envs, len(task.state_var)), f"Wrong observation shape in {name}")
+            self.assertEqual(rewards.shape, (self.num_envs,), f"Wrong reward shape in {name}")
+            self.assertEqual(dones.shape, (self.num_envs,), f"Wrong done shape in {name}")
+            self.assertEqual(len(infos), self.num_envs, f"Wrong infos size in {name}")
+            env.close()
+
+    def test_same_as_single_env(self):
+        env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0")
+        vec_env = VecJSBSimEnv(env.unwrapped.task.__class__, self.num_envs)
+        state = env.reset()
+        obs = vec_env.reset()
+        action = [0.1, -0.1, 0.2, 0.5]
+        for _ in range(10):
+            state, reward, _, _ = env.step(action)
+            obs, rewards, _, _ = vec_env.step(np.tile(action, (self.num_envs, 1)))
+        for i in range(self.num_envs):
+            np.testing.assert_allclose(obs[i], np.concatenate(state))
+            self.assertAlmostEqual(rewards[i], reward)
+        env.close()
+        vec_env.close()
+
+    def test_auto_reset(self):
+        env = VecJSBSimEnv(gym_jsbsim.TASKS["HeadingControlTask"], self.num_envs)
+        first_obs = env.reset()
+        # bring the first aircraft below the minimum altitude of the task
+        env.sims[0].set_property_value(c.position_h_sl_ft, 2000)
+        obs, _, dones, infos = env.step()
+        self.assertTrue(dones[0], "Terminal state not detected")
+        self.assertFalse(dones[1:].any(), "Unexpected terminal state")
+        self.assertIn("terminal_observation", infos[0])
+        self.assertEqual(env.get_sim_time()[0], 0, "Environment not reset")
+        np.testing.assert_allclose(obs[0], first_obs[0])
+        env.close()
+
+    def test_seed(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]
+        env = VecJSBSimEnv(task, self.num_envs)
+        seeds = env.seed(123)
+        self.assertEqual(len(set(seeds)), self.num_envs)
+        self.assertEqual(env.seed(123), seeds)
+        env.reset()
+
+        # environment i is seeded as a single environment seeded with seeds[i]
+        single_env = gym_jsbsim.make("GymJsbsim-HeadingControlTask-v0").unwrapped
+        single_env.reset(seed=seeds[1])
+        self.assertEqual(
+            single_env.sim.jsbsim_exec.get_property_value("simulation/randomseed"),
+            env.sims[1].jsbsim_exec.get_property_value("simulation/randomseed"),
+        )
+        self.assertEqual(single_env.task.np_random.random(), env.tasks[1].np_random.random())
+        single_env.close()
+        env.close()
+
+    def test_wrong_action_shape(self):
+        env = VecJSBSimEnv(gym_jsbsim.TASKS["HeadingControlTask"], self.num_envs)
+        env.reset()
+        with self.assertRaises(ValueError):
+            env.step(np.zeros((self.num_envs, 1)))
+        env.close()
+
+
+
+class TestBatchedVecJSBSimEnv(TestVecJSBSimEnv):
+
+    # the specs of the task are evaluated for all the environments at once
+    num_envs = SCALAR_BATCH_SIZE
+
+
+class TestSubprocVecJSBSimEnv(unittest.TestCase):
+
+    num_envs = 4
+
+    def test_same_as_vec_env(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]
+        env = SubprocVecJSBSimEnv(task, self.num_envs, num_workers=2)
+        vec_env = VecJSBSimEnv(task, self.num_envs)
+        np.testing.assert_allclose(env.reset(), vec_env.reset())
+        actions = np.tile([0.1, -0.1, 0.2, 0.5], (self.num_envs, 1))
+        for _ in range(10):
+            obs, rewards, dones, _ = env.step(actions)
+            vec_obs, vec_rewards, vec_dones, _ = vec_env.step(actions)
+            np.testing.assert_allclose(obs, vec_obs)
+            np.testing.assert_allclose(rewards, vec_rewards)
+            np.testing.assert_array_equal(dones, vec_dones)
+        np.testing.assert_allclose(env.get_sim_time(), vec_env.get_sim_time())
+        env.close()
+        vec_env.close()
+
+    def test_seed(self):
+        task = gym_jsbsim.TASKS["HeadingControlTask"]
+        env = SubprocVecJSBSimEnv(task, self.num_envs, num_workers=2)
+        vec_env = VecJSBSimEnv(task, self.num_envs)
+        self.assertEqual(env.seed(123), vec_env.seed(123))
+        env.close()
+        vec_env.close()
+
+    def test_worker_error(self):
+        env = SubprocVecJSBSimEnv(FailingRewardTask, self.num_envs, num_workers=2)
+        env.reset()
+        with self.assertRaisesRegex(RuntimeError, "reward failed"):
+            env.step()
+        # the workers are still running after the error
+        self.assertEqual(len(env.get_sim_time()), self.num_envs)
+        env.close()
@@ -0,0 +1,209 @@
+import os
+import json
+from collections import OrderedDict
+import numpy as np
+import jsbsim
+from gym_jsbsim.cache import get_cache_dir
+from gym_jsbsim.catalogs.property import Property
+from gym_jsbsim.simulation import SimSnapshot
+
+# version of the trim cache files, to be increased when their content changes
+TRIM_CACHE_VERSION = 1
+
+
+class TrimCache:
+
+    """
+    A cache of the trimmed states of the simulations, keyed by flight condition.
+
+    Trimming solves iteratively for the controls and the attitude in which the aircraft is in
+    steady flight, which costs about fifty resets. The first reset with a flight condition
+    trims the simulation and keeps a snapshot of the trimmed state: the next resets with the
+    same condition restore this snapshot in place of the reset and the trim, see reset and
+    Simulation.reset_to_snapshot.
+
+    A flight condition is the aircraft configuration, the integration frequency, the trim mode
+    and the initial conditions, each value rounded to a multiple of quantum: conditions closer
+    than quantum share the trimmed state of the first one. The least recently used conditions
+    are evicted beyond max_size.
+
+    The episode which trims starts from the trimmed state itself, the next ones from its restore:
+    the kinematic state is then within a few ulps of the trimmed one, while the FCS filters restart.
+    """
+
+    def __init__(self, max_size=256, quantum=1e-6, quanta=None, persist=False, cache_dir=None):
+        """
+
+        :param max_size: maximum number of flight conditions kept
+
+        :param quantum: step of the initial conditions values in the keys
+
+        :param quanta: dict mapping properties to their own step, e.g. {Catalog.ic_h_sl_ft: 100}
+
+        :param persist: if True, the trimmed states are saved and read back by the next processes
+
+        :param cache_dir: directory of the saved trimmed states, defaults to get_cache_dir()
+
+        """
+        self.max_size = max_size
+        self.quantum = quantum
+        self.quanta = {prop.name_jsbsim: step for prop, step in (quanta or {}).items()}
+        self.persist = persist
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._snapshots = OrderedDict()
+        # aircraft digests whose saved trimmed states were read, see _load
+        self._loaded = set()
+
+    def key(self, sim, init_conditions, mode=1):
+        """
+
+        Get the flight condition of a simulation and initial conditions.
+
+        :param sim: Simulation
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        :param mode: JSBSim trim mode
+
+        :return: hashable tuple
+
+        """
+        values = []
+        for prop, value in (init_conditions or {}).items():
+            step = self.quanta.get(prop.name_jsbsim, self.quantum)
+            values.append((prop.name_jsbsim, int(round(value / step))))
+        return sim.aircraft_digest, sim.jsbsim_freq, mode, tuple(sorted(values))
+
+    def reset(self, sim, init_conditions, mode=1, agent_interaction_steps=None):
+        """
+
+        Warm resets a simulation with init_conditions in its trimmed state: the trimmed state is restored
+
+        from the cache if the flight condition was already trimmed, else the simulation is reset and trimmed.
+
+        :param sim: Simulation
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        :param mode: JSBSim trim mode, see Simulation.trim
+
+        :param agent_interaction_steps: simulation steps before the agent interact, unchanged if None
+
+        """
+        key, snapshot = self._get(sim, init_conditions, mode)
+        if snapshot is not None:
+            if agent_interaction_steps is not None:
+                sim.agent_interaction_steps = agent_interaction_steps
+            sim.reset_to_snapshot(snapshot)
+            return
+        sim.reset(init_conditions, agent_interaction_steps)
+        self._trim(key, sim, mode)
+
+    def trim(self, sim, init_conditions, mode=1):
+        """
+
+        Brings a simulation just reset with init_conditions in its trimmed state, restored from the cache
+
+        if the flight condition was already trimmed.
+
+        :param sim: Simulation
+
+        :param init_conditions: dict mapping properties to their initial values
+
+        :param mode: JSBSim trim mode, see Simulation.trim
+
+        """
+        key, snapshot = self._get(sim, init_conditions, mode)
+        if snapshot is not None:
+            sim.reset_to_snapshot(snapshot)
+        else:
+            self._trim(key, sim, mode)
+
+    def _get(self, sim, init_conditions, mode):
+        """ The key of a flight condition and its trimmed state, None if it is not cached. """
+        key = self.key(sim, init_conditions, mode)
+        if self.persist and sim.aircraft_digest not in self._loaded:
+            self._load(sim.aircraft_digest)
+
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            self.hits += 1
+            self._snapshots.move_to_end(key)
+        else:
+            self.misses += 1
+        return key, snapshot
+
+    def _trim(self, key, sim, mode):
+        sim.trim(mode)
+        snapshot = sim.get_snapshot()._replace(sim_time=0.0)
+        self._put(key, snapshot)
+        if self.persist:
+            self._save(key, snapshot)
+
+    def _put(self, key, snapshot):
+        self._snapshots[key] = snapshot
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_size:
+            self._snapshots.popitem(last=False)
+
+    def _get_file(self, digest):
+        cache_dir = self.cache_dir or get_cache_dir()
+        return os.path.join(cache_dir, f"trim-{digest}-{jsbsim.__version__}.json")
+
+    def _read(self, digest):
+        try:
+            with open(self._get_file(digest)) as f:
+                cached = json.load(f)
+            if cached["version"] != TRIM_CACHE_VERSION:
+                return []
+            return cached["entries"]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def _load(self, digest):
+        """ Reads the trimmed states of an aircraft saved by the previous processes. """
+        self._loaded.add(digest)
+        props = {}
+        for key, names, values in self._read(digest):
+            key = _from_json(key)
+            if key in self._snapshots:
+                continue
+            names = tuple(names)
+            # only the names of the properties are needed to restore a snapshot
+            if names not in props:
+                props[names] = tuple(Property(name) for name in names)
+            self._put(key, SimSnapshot(0.0, props[names], np.array(values, dtype=np.float64)))
+
+    def _save(self, key, snapshot):
+        """ Adds a trimmed state to the saved ones, the file being written by a single replace. """
+        entries = [entry for entry in self._read(key[0]) if _from_json(entry[0]) != key]
+        entries.append([key, [prop.name_jsbsim for prop in snapshot.props], snapshot.values.tolist()])
+        entries = entries[-self.max_size :]
+
+        cache_file = self._get_file(key[0])
+        # write then rename, so that concurrent workers never read a partial file
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"version": TRIM_CACHE_VERSION, "entries": entries}, f)
+        os.replace(tmp_file, cache_file)
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    def clear(self):
+        """ Forgets the trimmed states kept in memory, the saved ones are read again at the next trim. """
+        self._snapshots.clear()
+        self._loaded.clear()
+        self.hits = self.misses = 0
+
+
+def _from_json(key):
+    """ The key of a flight condition read from JSON, where its tuples are lists. """
+    digest, jsbsim_freq, mode, values = key
+    return digest, jsbsim_freq, mode, tuple((name, value) for name, value in values)
+
+
+# the trimmed states shared by the environments of the process
+trim_cache = TrimCache()
@@ -0,0 +1,350 @@
+import os
+import re
+import json
+import bisect
+import functools
+import multiprocessing as mp
+import numpy as np
+import jsbsim
+from gym_jsbsim.catalogs.catalog import Catalog
+from gym_jsbsim.catalogs.property import Property
+from gym_jsbsim.simulation import Simulation
+
+"""
+
+Tables of the trimmed states of an aircraft over a grid of altitudes, true airspeeds and weights, generated in
+
+parallel by generate_trim_table and read back, memory-mapped, by TrimTable to seed initial conditions.
+
+A table is a directory holding values.npy, the trimmed outputs of shape (altitudes, airspeeds, weights, outputs),
+
+success.npy, whether the trim of each grid point converged, and metadata.json.
+
+"""
+
+# version of the trim tables, to be increased when their content changes
+TRIM_TABLE_VERSION = 2
+
+# properties solved by the trim and their initial condition, None for the outputs only informative
+TRIM_OUTPUTS = (
+    ("aero/alpha-rad", "ic/alpha-rad"),
+    ("aero/beta-rad", "ic/beta-rad"),
+    ("attitude/phi-rad", "ic/phi-rad"),
+    ("attitude/theta-rad", None),
+    ("fcs/pitch-trim-cmd-norm", "fcs/pitch-trim-cmd-norm"),
+    ("fcs/aileron-cmd-norm", "fcs/aileron-cmd-norm"),
+    ("fcs/rudder-cmd-norm", "fcs/rudder-cmd-norm"),
+    ("inertia/weight-lbs", None),
+)
+
+# initial conditions of the level flight trimmed at each grid point when none is given
+DEFAULT_INIT_CONDITIONS = {
+    Catalog.ic_terrain_elevation_ft: 0,
+    Catalog.ic_long_gc_deg: 1.442031,
+    Catalog.ic_lat_geod_deg: 43.607181,
+    Catalog.ic_psi_true_deg: 100,
+    Catalog.ic_roc_fpm: 0,
+    Catalog.gear_gear_pos_norm: 0,
+    Catalog.gear_gear_cmd_norm: 0,
+}
+
+# simulation of a worker process, see _init_worker
+_worker_sim = None
+
+
+def _get_prop(name_jsbsim):
+    """ The Property of the catalog named name_jsbsim, or a new one if the catalog has none. """
+    try:
+        return Catalog[re.sub(r"_$", "", re.sub(r"[\-/\]\[]+", "_", name_jsbsim))]
+    except KeyError:
+        return Property(name_jsbsim)
+
+
+def _get_layout(sim):
+    """ The fuel tanks of a simulation, its weight without fuel, the trim outputs names and the tank capacities. """
+    names = [name_jsbsim for name_jsbsim, _ in sim.jsbsim_props.values()]
+    tanks = [name for name in names if re.match(r"^propulsion/tank(\[\d+\])?/contents-lbs$", name)]
+    throttles = [name for name in names if re.match(r"^fcs/throttle-cmd-norm(\[\d+\])?$", name)]
+    contents = [sim.jsbsim_exec.get_property_value(tank) for tank in tanks]
+    # JSBSim has no capacity property: the contents of a tank are clamped to its capacity
+    capacities = []
+    for tank, fuel in zip(tanks, contents):
+        sim.jsbsim_exec.set_property_value(tank, 1e12)
+        capacities.append(sim.jsbsim_exec.get_property_value(tank))
+        sim.jsbsim_exec.set_property_value(tank, fuel)
+    outputs = [name for name, _ in TRIM_OUTPUTS] + throttles
+    return tanks, sim.jsbsim_exec.get_property_value("inertia/weight-lbs") - sum(contents), outputs, capacities
+
+
+def _get_tanks_contents(capacities, empty_weight, weight_lbs):
+    """
+
+    The fuel of each tank for a total weight, shared between the tanks in proportion to their capacities.
+
+    :raise ValueError: if the weight is below the weight without fuel or above the weight with full tanks
+
+    """
+    capacity = sum(capacities)
+    if not empty_weight <= weight_lbs <= empty_weight + capacity:
+        raise ValueError(
+            f"weight {weight_lbs} lbs out of the aircraft range [{empty_weight}, {empty_weight + capacity}] lbs"
+        )
+    return [(weight_lbs - empty_weight) * tank_capacity / capacity if capacity else 0.0 for tank_capacity in capacities]
+
+
+def _get_point_conditions(layout, init_conditions, altitude_ft, airspeed_fps, weight_lbs):
+    """ The initial conditions of a grid point, the weight being set by sharing the fuel between the tanks. """
+    tanks, empty_weight, outputs, capacities = layout
+    contents = _get_tanks_contents(capacities, empty_weight, weight_lbs)
+    # the controls solved by the trim are kept by the resets: the trims start from the same controls whatever
+    # the grid points trimmed before by the simulation
+    conditions = {_get_prop(name): 0.0 for name in outputs if name.startswith("fcs/")}
+    conditions.update(init_conditions)
+    conditions[Catalog.ic_h_sl_ft] = altitude_ft
+    conditions[Catalog.ic_vt_fps] = airspeed_fps
+    for tank, fuel in zip(tanks, contents):
+        conditions[_get_prop(tank)] = fuel
+    return conditions
+
+
+def _trim_point(sim, layout, init_conditions, point, mode):
+    """
+
+    Trims a simulation at a grid point.
+
+    :param init_conditions: dict mapping the names of properties to their initial values
+
+    :return: (outputs values, success), the values being NaN if the trim failed
+
+    """
+    outputs = layout[2]
+    init_conditions = {_get_prop(name): value for name, value in init_conditions.items()}
+    sim.reset(_get_point_conditions(layout, init_conditions, *point))
+    try:
+        sim.trim(mode)
+    except RuntimeError:  # jsbsim.TrimFailureError
+        return np.full(len(outputs), np.nan), False
+    return np.array([sim.jsbsim_exec.get_property_value(name) for name in outputs]), True
+
+
+def _init_worker(aircraft_name, jsbsim_freq):
+    global _worker_sim
+    _worker_sim = Simulation(aircraft_name=aircraft_name, jsbsim_freq=jsbsim_freq)
+
+
+def _trim_worker(task):
+    index, point, layout, init_conditions, mode = task
+    return (index,) + _trim_point(_worker_sim, layout, init_conditions, point, mode)
+
+
+def generate_trim_table(
+    path,
+    altitudes_ft,
+    airspeeds_fps,
+    weights_lbs,
+    aircraft_name="A320",
+    init_conditions=None,
+    mode=1,
+    jsbsim_freq=60,
+    num_workers=None,
+    start_method=None,
+):
+    """
+
+    Trims an aircraft at every point of a grid of altitudes, true airspeeds and weights, in a pool of processes
+
+    each loading the aircraft once, and writes the table in the directory path.
+
+    :param path: directory of the table, created if needed
+
+    :param altitudes_ft: increasing altitudes above mean sea level [ft]
+
+    :param airspeeds_fps: increasing true airspeeds [ft/s]
+
+    :param weights_lbs: increasing total weights [lbs], set through the fuel of the tanks, between the weights
+
+        of the aircraft without fuel and with full tanks
+
+    :param aircraft_name: name of the aircraft
+
+    :param init_conditions: dict mapping properties to the initial values shared by the grid points,
+
+        defaults to DEFAULT_INIT_CONDITIONS, a level flight
+
+    :param mode: JSBSim trim mode, see Simulation.trim
+
+    :param jsbsim_freq: JSBSim integration frequency
+
+    :param num_workers: number of processes, defaults to os.cpu_count(), 1 to trim in this process
+
+    :param start_method: multiprocessing start method, defaults to the platform default
+
+    :return: TrimTable
+
+    """
+    axes = [np.asarray(axis, dtype=np.float64) for axis in (altitudes_ft, airspeeds_fps, weights_lbs)]
+    for axis in axes:
+        if axis.ndim != 1 or not len(axis) or (np.diff(axis) <= 0).any():
+            raise ValueError("grid axes must be non-empty increasing sequences")
+    # the properties are sent to the workers by name
+    init_conditions = {
+        prop.name_jsbsim: value for prop, value in (init_conditions or DEFAULT_INIT_CONDITIONS).items()
+    }
+    num_workers = num_workers or os.cpu_count()
+
+    sim = Simulation(aircraft_name=aircraft_name, jsbsim_freq=jsbsim_freq)
+    layout, aircraft_digest = _get_layout(sim), sim.aircraft_digest
+    try:
+        for weight_lbs in (axes[2][0], axes[2][-1]):
+            _get_tanks_contents(layout[3], layout[1], weight_lbs)
+    except ValueError:
+        sim.close()
+        raise
+    shape = tuple(len(axis) for axis in axes)
+    values = np.full(shape + (len(layout[2]),), np.nan)
+    success = np.zeros(shape, dtype=bool)
+    tasks = [
+        (index, tuple(axis[i] for axis, i in zip(axes, index)), layout, init_conditions, mode)
+        for index in np.ndindex(*shape)
+    ]
+
+    if num_workers == 1:
+        for index, point, _, _, _ in tasks:
+            values[index], success[index] = _trim_point(sim, layout, init_conditions, point, mode)
+        sim.close()
+    else:
+        sim.close()
+        ctx = mp.get_context(start_method)
+        with ctx.Pool(num_workers, initializer=_init_worker, initargs=(aircraft_name, jsbsim_freq)) as pool:
+            # chunks of neighbouring grid points, trimmed one after the other by a worker
+            chunksize = max(1, len(tasks) // (num_workers * 4))
+            for index, point_values, point_success in pool.imap_unordered(_trim_worker, tasks, chunksize):
+                values[index], success[index] = point_values, point_success
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "values.npy"), values)
+    np.save(os.path.join(path, "success.npy"), success)
+    metadata = {
+        "version": TRIM_TABLE_VERSION,
+        "aircraft_name": aircraft_name,
+        "aircraft_digest": aircraft_digest,
+        "jsbsim_version": jsbsim.__version__,
+        "jsbsim_freq": jsbsim_freq,
+        "mode": mode,
+        "axes": {"altitude_ft": axes[0].tolist(), "airspeed_fps": axes[1].tolist(), "weight_lbs": axes[2].tolist()},
+        "outputs": layout[2],
+        "tanks": layout[0],
+        "empty_weight_lbs": layout[1],
+        "tank_capacities_lbs": layout[3],
+        "init_conditions": init_conditions,
+    }
+    with open(os.path.join(path, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+    return TrimTable(path)
+
+
+class TrimTable:
+
+    """
+    A trim table written by generate_trim_table, its arrays memory-mapped: the pages of the grid points
+
+    used are read on demand and shared by the processes reading the same table.
+    """
+
+    def __init__(self, path, mmap=True):
+        """
+
+        :param path: directory of the table
+
+        :param mmap: if False, the arrays are read in memory
+
+        """
+        with open(os.path.join(path, "metadata.json")) as f:
+            self.metadata = json.load(f)
+        if self.metadata["version"] != TRIM_TABLE_VERSION:
+            raise ValueError(f"trim table version {self.metadata['version']}, {TRIM_TABLE_VERSION} expected")
+        mmap_mode = "r" if mmap else None
+        self.values = np.load(os.path.join(path, "values.npy"), mmap_mode=mmap_mode)
+        self.success = np.load(os.path.join(path, "success.npy"), mmap_mode=mmap_mode)
+        self.axes = tuple(np.array(axis) for axis in self.metadata["axes"].values())
+        self._axes = tuple(axis.tolist() for axis in self.axes)
+        self.outputs = tuple(self.metadata["outputs"])
+
+    def interpolate(self, altitude_ft, airspeed_fps, weight_lbs):
+        """
+
+        Interpolates linearly the trimmed outputs between the grid points around a flight condition,
+
+        the condition being clamped to the grid.
+
+        :return: dict mapping the names of the outputs to their values, NaN next to a failed trim
+
+        """
+        slices, weights = [], []
+        for axis, x in zip(self._axes, (altitude_ft, airspeed_fps, weight_lbs)):
+            i = min(max(bisect.bisect_left(axis, x) - 1, 0), max(len(axis) - 2, 0))
+            fraction = min(max((x - axis[i]) / (axis[i + 1] - axis[i]), 0.0), 1.0) if len(axis) > 1 else 0.0
+            # a condition on a grid line only reads the grid points of the line, possibly next to failed trims
+            if fraction == 0.0 or fraction == 1.0:
+                slices.append(slice(i + int(fraction), i + int(fraction) + 1))
+                weights.append((1.0,))
+            else:
+                slices.append(slice(i, i + 2))
+                weights.append((1.0 - fraction, fraction))
+        block = np.asarray(self.values[tuple(slices)])
+        result = np.tensordot(functools.reduce(np.multiply.outer, weights), block, axes=len(weights))
+        return dict(zip(self.outputs, result.tolist()))
+
+    def get_init_conditions(self, altitude_ft, airspeed_fps, weight_lbs):
+        """
+
+        Initial conditions of a flight condition in the trimmed state interpolated from the table.
+
+        :return: dict mapping properties to their initial values: altitude, airspeed, fuel, attitude and controls
+
+        :raise ValueError: if the weight is out of the range of the aircraft, see generate_trim_table
+
+        """
+        tanks, capacities = self.metadata["tanks"], self.metadata["tank_capacities_lbs"]
+        contents = _get_tanks_contents(capacities, self.metadata["empty_weight_lbs"], weight_lbs)
+        trimmed = self.interpolate(altitude_ft, airspeed_fps, weight_lbs)
+        init_conditions = {Catalog.ic_h_sl_ft: altitude_ft, Catalog.ic_vt_fps: airspeed_fps}
+        for tank, fuel in zip(tanks, contents):
+            init_conditions[_get_prop(tank)] = fuel
+        ic_names = dict(TRIM_OUTPUTS)
+        for name, value in trimmed.items():
+            ic_name = ic_names.get(name, name)
+            if ic_name is not None:
+                init_conditions[_get_prop(ic_name)] = value
+        return init_conditions
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generates the trim table of an aircraft over a grid of altitudes, airspeeds and weights."
+    )
+    parser.add_argument("output", help="directory of the table")
+    parser.add_argument("--altitudes", type=float, nargs="+", required=True, help="altitudes [ft]")
+    parser.add_argument("--airspeeds", type=float, nargs="+", required=True, help="true airspeeds [ft/s]")
+    parser.add_argument("--weights", type=float, nargs="+", required=True, help="total weights [lbs]")
+    parser.add_argument("--aircraft", default="A320")
+    parser.add_argument("--mode", type=int, default=1, help="JSBSim trim mode")
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of CPUs")
+    args = parser.parse_args()
+
+    table = generate_trim_table(
+        args.output,
+        args.altitudes,
+        args.airspeeds,
+        args.weights,
+        aircraft_name=args.aircraft,
+        mode=args.mode,
+        num_workers=args.workers,
+    )
+    print(f"{table.success.sum()}/{table.success.size} grid points trimmed, table written in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import numpy as np
+from gym.spaces import Box
+from gym_jsbsim.simulation_pool import simulation_pool
+from gym_jsbsim.specs import SCALAR_BATCH_SIZE
+from gym_jsbsim.trim_cache import trim_cache
+from gym_jsbsim.catalogs import utils
+
+
+def get_env_seeds(seed, num_envs):
+    """
+    Derives independent seeds for num_envs environments.
+
+    :param seed: int, None for a seed taken from the OS entropy, or list of num_envs int seeds returned as they are
+    :param num_envs: number of environments
+    :return: list of num_envs int seeds
+    """
+    if isinstance(seed, (list, tuple, np.ndarray)):
+        if len(seed) != num_envs:
+            raise ValueError("mismatch between seeds and num_envs")
+        return [int(env_seed) for env_seed in seed]
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(num_envs)]
+
+
+class VecJSBSimEnv:
+
+    """
+    A class stepping several JSBSim simulations of the same Task in lockstep
+    with a batched NumPy API.
+
+    Each of the num_envs environments owns its own Simulation and Task
+    instance, so the existing Task definitions (state_var, action_var,
+    get_reward, is_terminal) are used unchanged, while the reward_spec and
+    terminal_spec of the task are evaluated for all the environments at
+    once. Observations are packed in a (num_envs, n_obs) float array, and an
+    environment reaching a terminal state is automatically reset: its row
+    then holds the first observation of the next episode, while the last
+    observation of the finished episode is returned in
+    info["terminal_observation"].
+    """
+
+    metadata = {"render.modes": []}
+
+    def __init__(self, task, num_envs):
+        """
+
+        Constructor. Init some internal state, but VecJSBSimEnv.reset() must be
+
+        called first before interacting with environment.
+
+        :param task: the Task class the agents are to perform
+
+        :param num_envs: number of simulations stepped together
+
+        """
+        if num_envs < 1:
+            raise ValueError("num_envs must be positive")
+
+        self.num_envs = num_envs
+        self.tasks = [task() for _ in range(num_envs)]
+        self.sims = [None] * num_envs
+
+        self.observation_var = self.tasks[0].get_observation_var()
+        self.action_var = self.tasks[0].get_action_var()
+
+        self.observation_space = self._get_box(self.observation_var)
+        self.action_space = self._get_box(self.action_var)
+
+        self.observations = np.zeros((num_envs, utils.get_size(self.observation_var)))
+        self.rewards = np.zeros(num_envs)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        # property values read for the specs of the task, see _get_spec_values
+        self._spec_values = {}
+
+    @staticmethod
+    def _get_box(props):
+        """
+        Get a flat Box space bounded by the properties limits.
+
+        :param props: list of Properties
+
+        :return: Box of shape (utils.get_size(props),)
+        """
+        low, high = utils.get_bounds(props)
+        return Box(low=low, high=high, dtype=np.float64)
+
+    def step(self, actions=None):
+        """
+
+        Run one timestep of every environment's dynamics.
+
+        :param actions: np.array of shape (num_envs, n_actions), or None to take no action
+
+        :return:
+
+            observations: np.array of shape (num_envs, n_obs)
+
+            rewards: np.array of shape (num_envs,)
+
+            dones: np.array of shape (num_envs,), environments with a True value have been reset
+
+            infos: list of num_envs dicts
+
+        """
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.float64)
+            if not actions.shape == (self.num_envs, len(self.action_var)):
+                raise ValueError("mismatch between actions and (num_envs, action space size)")
+            # the actions of all the environments are clamped to their bounds at once
+            actions = self.tasks[0].clip_actions(actions)
+
+        # the rewards and the termination predicates of the specs of the task are evaluated for all the
+        # environments at once, see Task.define_reward_spec and Task.define_terminal_spec, unless they are too few
+        reward_spec = self.tasks[0].get_reward_evaluator()
+        terminal_spec = self.tasks[0].get_terminal_evaluator()
+        batched = self.num_envs >= SCALAR_BATCH_SIZE
+
+        for i in range(self.num_envs):
+            sim, task = self.sims[i], self.tasks[i]
+
+            # take actions
+            if actions is not None:
+                sim.set_property_values(self.action_var, actions[i], clamped=True)
+
+            # run simulation
+            sim.run()
+
+            state = self.observations[i]
+            sim.get_property_values(self.observation_var, out=state)
+
+            if reward_spec is None:
+                self.rewards[i] = task.get_reward(state, sim)
+            elif batched:
+                reward_spec.read(sim, self._get_spec_values(reward_spec)[i])
+            else:
+                self.rewards[i] = reward_spec.evaluate(sim)
+        if reward_spec is not None and batched:
+            self.rewards[:] = reward_spec(self._get_spec_values(reward_spec))
+
+        for i in range(self.num_envs):
+            self.dones[i] = self._is_terminal(i)
+            if terminal_spec is None:
+                continue
+            if batched:
+                terminal_spec.read(self.sims[i], self._get_spec_values(terminal_spec)[i])
+            elif not self.dones[i]:
+                self.dones[i] = terminal_spec.evaluate(self.sims[i])
+        if terminal_spec is not None and batched:
+            self.dones |= terminal_spec(self._get_spec_values(terminal_spec))
+
+        infos = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(self.dones):
+            # returned state should be in observation_space
+            infos[i]["terminal_observation"] = self.tasks[i].clip_observation(self.observations[i])
+            self._reset_env(i)
+
+        return self.observations.copy(), self.rewards.copy(), self.dones.copy(), infos
+
+    def _get_spec_values(self, spec):
+        """
+
+        Get the array of the values of the properties of a compiled spec in every environment.
+
+        :param spec: specs.CompiledSpec
+
+        :return: np.array of shape (num_envs, len(spec.props)), allocated once per spec
+
+        """
+        try:
+            return self._spec_values[spec]
+        except KeyError:
+            values = self._spec_values[spec] = np.zeros((self.num_envs, len(spec.props)))
+            return values
+
+    def seed(self, seed=None):
+        """
+
+        Seeds the random number generators of every environment.
+
+        The seeds of the environments are derived from seed with np.random.SeedSequence.spawn,
+
+        environment i then draws the same random values as a JSBSimEnv seeded with seeds[i].
+
+        :param seed: int, None for a seed taken from the OS entropy, or list of num_envs int seeds used as they are
+
+        :return: seeds, list of the num_envs int seeds of the environments
+
+        """
+        seeds = get_env_seeds(seed, self.num_envs)
+        for task, env_seed in zip(self.tasks, seeds):
+            task.seed(env_seed)
+        return seeds
+
+    def reset(self):
+        """
+
+        Resets the state of every environment and returns the initial observations.
+
+        :return: np.array of shape (num_envs, n_obs)
+
+        """
+        for i in range(self.num_envs):
+            self._reset_env(i)
+        return self.observations.copy()
+
+    def _reset_env(self, i):
+        sim, task = self.sims[i], self.tasks[i]
+
+        if sim and sim.can_reset(task.aircraft_name, task.jsbsim_freq):
+            # warm reset: keep the loaded aircraft model
+            if task.trim_mode is None:
+                sim.reset(task.init_conditions, task.agent_interaction_steps)
+            else:
+                trim_cache.reset(sim, task.init_conditions, task.trim_mode, task.agent_interaction_steps)
+        else:
+            if sim:
+                sim.close()
+
+            # a template of simulation_pool is used if prewarmed, see SimulationPool.prewarm
+            sim = self.sims[i] = simulation_pool.acquire(
+                aircraft_name=task.aircraft_name,
+                jsbsim_freq=task.jsbsim_freq,
+                agent_interaction_steps=task.agent_interaction_steps,
+                catalog=task.catalog,
+                init_conditions=task.init_conditions,
+                fresh=True,
+            )
+            if task.trim_mode is not None:
+                trim_cache.trim(sim, task.init_conditions, task.trim_mode)
+        sim.set_random_seed(task.draw_jsbsim_seed())
+        sim.record_substeps(task.substep_var or ())
+
+        sim.get_property_values(self.observation_var, out=self.observations[i])
+
+    def _is_terminal(self, i):
+        """
+
+        Checks if the state of environment i is terminal.
+
+        :return: bool
+
+        """
+        state, task = self.observations[i], self.tasks[i]
+        is_not_contained = not task.contains(state)
+
+        return is_not_contained or task.is_terminal(state, self.sims[i])
+
+    def get_sim_time(self):
+        """ Gets the simulation time of every environment, a np.array of shape (num_envs,). """
+        return np.array([sim.get_sim_time() for sim in self.sims])
+
+    def close(self):
+        """ Cleans up the simulations. """
+        for sim in self.sims:
+            if sim:
+                sim.close()